@@ -0,0 +1,95 @@
+"""add binary uuid shadow columns
+
+Revision ID: 1b3679c4107d
+Revises: 848c8a4f8bc3
+Create Date: 2026-10-18 10:02:17.481326
+
+Online step of the CHAR(36) -> BINARY(16) uuid migration. Adds a <column>_bin
+shadow for every uuid column, keeps it in sync with triggers while the previous
+release keeps writing CHAR(36) ids, and backfills existing rows in primary key
+batches so no statement holds locks on a whole table. The swap itself happens
+in 98dbec1ccf6b.
+
+The release that ships these migrations writes BINARY(16) ids, so it must not
+serve traffic until the swap is done. Deploy in this order:
+
+    1. with the previous release still serving: alembic upgrade 1b3679c4107d
+    2. pause writes (stop the previous release): alembic upgrade 98dbec1ccf6b
+    3. alembic upgrade head, then start this release
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '1b3679c4107d'
+down_revision: Union[str, Sequence[str], None] = '848c8a4f8bc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_COLUMNS = {
+    'users': ['id'],
+    'profiles': ['id', 'user_id'],
+    'products': ['id'],
+    'stock_entries': ['id', 'product_id'],
+    'sales': ['id', 'customer_id'],
+    'sale_items': ['id', 'sale_id', 'product_id'],
+}
+BATCH_SIZE = 5000
+
+
+def _to_binary(column: str, prefix: str = '') -> str:
+    return f"UNHEX(REPLACE({prefix}{column}, '-', ''))"
+
+
+def _create_triggers(table: str, columns) -> None:
+    assignments = ', '.join(f"NEW.{column}_bin = {_to_binary(column, 'NEW.')}" for column in columns)
+    for event in ('INSERT', 'UPDATE'):
+        op.execute(f"CREATE TRIGGER {table}_uuid_bin_{event.lower()} BEFORE {event} ON {table} FOR EACH ROW SET {assignments}")
+
+
+def _drop_triggers(table: str) -> None:
+    for event in ('insert', 'update'):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_uuid_bin_{event}")
+
+
+def _backfill(table: str, columns) -> None:
+    # walk the primary key in BATCH_SIZE ranges, each UPDATE commits on its own
+    bind = op.get_bind()
+    assignments = ', '.join(f"{column}_bin = {_to_binary(column)}" for column in columns)
+    last_id = ''
+    while True:
+        upper_id = bind.execute(
+            sa.text(f"SELECT id FROM {table} WHERE id > :last_id ORDER BY id LIMIT 1 OFFSET :offset"),
+            {'last_id': last_id, 'offset': BATCH_SIZE - 1},
+        ).scalar()
+        if upper_id is None:
+            bind.execute(sa.text(f"UPDATE {table} SET {assignments} WHERE id > :last_id"), {'last_id': last_id})
+            break
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {assignments} WHERE id > :last_id AND id <= :upper_id"),
+            {'last_id': last_id, 'upper_id': upper_id},
+        )
+        last_id = upper_id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(f'{column}_bin', mysql.BINARY(16), nullable=True))
+        # triggers go in before the backfill so rows written meanwhile are never missed
+        _create_triggers(table, columns)
+    with op.get_context().autocommit_block():
+        for table, columns in UUID_COLUMNS.items():
+            _backfill(table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in UUID_COLUMNS.items():
+        _drop_triggers(table)
+        for column in reversed(columns):
+            op.drop_column(table, f'{column}_bin')
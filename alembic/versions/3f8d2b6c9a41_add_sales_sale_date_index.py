@@ -0,0 +1,29 @@
+"""add sales sale_date index
+
+Revision ID: 3f8d2b6c9a41
+Revises: 75a415e1827c
+Create Date: 2026-10-18 14:02:37.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8d2b6c9a41'
+down_revision: Union[str, Sequence[str], None] = '75a415e1827c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the export walks sales by date regardless of paid, which ix_sales_paid_sale_date cannot serve
+    op.create_index('ix_sales_sale_date_id', 'sales', ['sale_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sales_sale_date_id', table_name='sales')
@@ -0,0 +1,35 @@
+"""add created_at keyset indexes
+
+Revision ID: 5c2e9a7d13f4
+Revises: 98dbec1ccf6b
+Create Date: 2026-10-18 11:26:04.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e9a7d13f4'
+down_revision: Union[str, Sequence[str], None] = '98dbec1ccf6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # list endpoints page on (created_at, id), so each page is a short index range scan
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_profiles_created_at_id', 'profiles', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+    op.create_index('ix_stock_entries_created_at_id', 'stock_entries', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_entries_created_at_id', table_name='stock_entries')
+    op.drop_index('ix_products_created_at_id', table_name='products')
+    op.drop_index('ix_profiles_created_at_id', table_name='profiles')
+    op.drop_index('ix_users_created_at_id', table_name='users')
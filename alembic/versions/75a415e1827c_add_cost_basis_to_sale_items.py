@@ -0,0 +1,93 @@
+"""add cost basis to sale items
+
+Revision ID: 75a415e1827c
+Revises: edc5dceff2f3
+Create Date: 2026-10-18 13:34:51.660418
+
+History did not record which batch a sale consumed. The backfill costs an
+existing item at the oldest batch of the product received before the sale,
+the way stock was taken first in first out, preferring one whose selling
+price matches the sale price (sales are priced per batch), and falls back
+to the quantity weighted average batch cost when none exists.
+That batch is a guess, so stock_entry_id stays NULL for existing items:
+stock release and the as-of inventory valuation only trust recorded batches.
+Items of a product that never had a batch keep a NULL cost rather than 0,
+which would count them as pure profit. The rollup keeps their revenue in
+uncosted_revenue, and profit and margin reports leave it out.
+Rerun infrastructure.commands.backfill_daily_sales afterwards so the rollup
+picks up the recorded costs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '75a415e1827c'
+down_revision: Union[str, Sequence[str], None] = 'edc5dceff2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+BATCH_COST = """
+    UPDATE sale_items si JOIN sales s ON s.id = si.sale_id
+    SET si.cost_price = (
+        SELECT se.cost_price FROM stock_entries se
+        WHERE se.product_id = si.product_id AND se.added_date <= s.sale_date
+        ORDER BY se.selling_price = si.sale_price DESC, se.added_date ASC
+        LIMIT 1
+    )
+    WHERE si.id > :last_id AND (:upper_id IS NULL OR si.id <= :upper_id)
+"""
+AVERAGE_COST = """
+    UPDATE sale_items si JOIN (
+        SELECT product_id, SUM(cost_price * quantity) / NULLIF(SUM(quantity), 0) AS unit_cost
+        FROM stock_entries GROUP BY product_id
+    ) c ON c.product_id = si.product_id
+    SET si.cost_price = c.unit_cost
+    WHERE si.cost_price IS NULL AND si.id > :last_id AND (:upper_id IS NULL OR si.id <= :upper_id)
+"""
+
+
+def _backfill() -> None:
+    # walk the primary key in BATCH_SIZE ranges, each batch commits on its own
+    bind = op.get_bind()
+    last_id = b''
+    while True:
+        upper_id = bind.execute(
+            sa.text("SELECT id FROM sale_items WHERE id > :last_id ORDER BY id LIMIT 1 OFFSET :offset"),
+            {'last_id': last_id, 'offset': BATCH_SIZE - 1},
+        ).scalar()
+        for statement in (BATCH_COST, AVERAGE_COST):
+            bind.execute(sa.text(statement), {'last_id': last_id, 'upper_id': upper_id})
+        if upper_id is None:
+            break
+        last_id = upper_id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sale_items', sa.Column('stock_entry_id', mysql.BINARY(16), nullable=True))
+    op.add_column('sale_items', sa.Column('cost_price', mysql.DECIMAL(precision=10, scale=2), nullable=True))
+    op.create_foreign_key('fk_sale_items_stock_entry_id', 'sale_items', 'stock_entries', ['stock_entry_id'], ['id'])
+    with op.get_context().autocommit_block():
+        _backfill()
+    for table in ('daily_sales_summary', 'daily_product_sales_summary'):
+        op.add_column(table, sa.Column('uncosted_revenue', mysql.DECIMAL(precision=14, scale=2), server_default='0', nullable=False))
+    # profit/loss reads cost_price next to sale_price, keep the sale_id index covering. The wider index
+    # goes in first: the old one backs the sale_id foreign key and MySQL refuses to drop it before (1553)
+    op.create_index('ix_sale_items_sale_id_cost_price', 'sale_items', ['sale_id', 'product_id', 'quantity', 'sale_price', 'cost_price'], unique=False)
+    op.drop_index('ix_sale_items_sale_id', table_name='sale_items')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_sale_items_sale_id', 'sale_items', ['sale_id', 'product_id', 'quantity', 'sale_price'], unique=False)
+    op.drop_index('ix_sale_items_sale_id_cost_price', table_name='sale_items')
+    for table in ('daily_sales_summary', 'daily_product_sales_summary'):
+        op.drop_column(table, 'uncosted_revenue')
+    op.drop_constraint('fk_sale_items_stock_entry_id', 'sale_items', type_='foreignkey')
+    op.drop_column('sale_items', 'cost_price')
+    op.drop_column('sale_items', 'stock_entry_id')
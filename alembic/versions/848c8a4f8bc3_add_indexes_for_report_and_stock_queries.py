@@ -0,0 +1,43 @@
+"""add indexes for report and stock queries
+
+Revision ID: 848c8a4f8bc3
+Revises: ff155aa2fa43
+Create Date: 2026-10-18 09:12:41.205113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '848c8a4f8bc3'
+down_revision: Union[str, Sequence[str], None] = 'ff155aa2fa43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FIFO reservation and the low stock report read (product_id, added_date, remaining_quantity)
+    op.create_index('ix_stock_entries_product_id_added_date', 'stock_entries', ['product_id', 'added_date', 'remaining_quantity'], unique=False)
+    # total sales sums total_amount over paid sales in a date range without touching the table
+    op.create_index('ix_sales_paid_sale_date', 'sales', ['paid', 'sale_date', 'total_amount'], unique=False)
+    # profit/loss and sale lookups join sale_items on sale_id and read price/quantity from the index
+    op.create_index('ix_sale_items_sale_id', 'sale_items', ['sale_id', 'product_id', 'quantity', 'sale_price'], unique=False)
+    # product performance groups by product_id summing quantity
+    op.create_index('ix_sale_items_product_id', 'sale_items', ['product_id', 'quantity'], unique=False)
+    # profiles.user_id and sales.payment_reference are already covered by their unique indexes
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the composites replaced the indexes MySQL created for the foreign keys, put those back first or the drops fail with 1553
+    op.create_index(op.f('product_id'), 'stock_entries', ['product_id'], unique=False)
+    op.create_index(op.f('sale_id'), 'sale_items', ['sale_id'], unique=False)
+    op.create_index(op.f('product_id'), 'sale_items', ['product_id'], unique=False)
+    op.drop_index('ix_sale_items_product_id', table_name='sale_items')
+    op.drop_index('ix_sale_items_sale_id', table_name='sale_items')
+    op.drop_index('ix_sales_paid_sale_date', table_name='sales')
+    op.drop_index('ix_stock_entries_product_id_added_date', table_name='stock_entries')
@@ -0,0 +1,96 @@
+"""swap uuid columns to binary
+
+Revision ID: 98dbec1ccf6b
+Revises: 1b3679c4107d
+Create Date: 2026-10-18 10:09:53.117604
+
+Cutover step of the CHAR(36) -> BINARY(16) uuid migration. Run it with writes
+paused: it rebuilds the primary keys, unique/secondary indexes and foreign keys
+on top of the backfilled <column>_bin shadows and drops the CHAR(36) columns.
+The previous release must be stopped before it runs, because it writes CHAR(36)
+ids. The release with BinaryUUID models is started only after it, see
+1b3679c4107d for the full deploy order.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '98dbec1ccf6b'
+down_revision: Union[str, Sequence[str], None] = '1b3679c4107d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_COLUMNS = {
+    'users': ['id'],
+    'profiles': ['id', 'user_id'],
+    'products': ['id'],
+    'stock_entries': ['id', 'product_id'],
+    'sales': ['id', 'customer_id'],
+    'sale_items': ['id', 'sale_id', 'product_id'],
+}
+
+
+def _drop_keys():
+    # foreign keys were created unnamed, so read the names MySQL generated
+    inspector = sa.inspect(op.get_bind())
+    foreign_keys = [(table, fk) for table in UUID_COLUMNS for fk in inspector.get_foreign_keys(table)]
+    indexes = [
+        (table, index) for table, columns in UUID_COLUMNS.items() for index in inspector.get_indexes(table)
+        if set(index['column_names']) & set(columns)
+    ]
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk['name'], table, type_='foreignkey')
+    for table, index in indexes:
+        op.drop_index(index['name'], table_name=table)
+    for table in UUID_COLUMNS:
+        op.execute(f"ALTER TABLE {table} DROP PRIMARY KEY")
+    return foreign_keys, indexes
+
+
+def _create_keys(foreign_keys, indexes) -> None:
+    for table in UUID_COLUMNS:
+        op.create_primary_key(f'pk_{table}', table, ['id'])
+    for table, index in indexes:
+        op.create_index(index['name'], table, index['column_names'], unique=bool(index['unique']))
+    for table, fk in foreign_keys:
+        op.create_foreign_key(fk['name'], table, fk['referred_table'], fk['constrained_columns'], fk['referred_columns'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    foreign_keys, indexes = _drop_keys()
+    for table, columns in UUID_COLUMNS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_uuid_bin_insert")
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_uuid_bin_update")
+        # pick up anything written between the backfill and the triggers being dropped
+        assignments = ', '.join(f"{column}_bin = UNHEX(REPLACE({column}, '-', ''))" for column in columns)
+        conditions = ' OR '.join(f"{column}_bin IS NULL" for column in columns)
+        op.execute(f"UPDATE {table} SET {assignments} WHERE {conditions}")
+        for column in columns:
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}_bin', new_column_name=column, existing_type=mysql.BINARY(16), nullable=False)
+    _create_keys(foreign_keys, indexes)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    foreign_keys, indexes = _drop_keys()
+    for table, columns in UUID_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, new_column_name=f'{column}_bin', existing_type=mysql.BINARY(16), nullable=True)
+            op.add_column(table, sa.Column(column, mysql.CHAR(36), nullable=True))
+        assignments = ', '.join(
+            f"{column} = LOWER(INSERT(INSERT(INSERT(INSERT(HEX({column}_bin), 9, 0, '-'), 14, 0, '-'), 19, 0, '-'), 24, 0, '-'))"
+            for column in columns
+        )
+        op.execute(f"UPDATE {table} SET {assignments}")
+        for column in columns:
+            op.alter_column(table, column, existing_type=mysql.CHAR(36), nullable=False)
+        # back to the state 1b3679c4107d leaves behind: shadows kept in sync by triggers
+        sync = ', '.join(f"NEW.{column}_bin = UNHEX(REPLACE(NEW.{column}, '-', ''))" for column in columns)
+        op.execute(f"CREATE TRIGGER {table}_uuid_bin_insert BEFORE INSERT ON {table} FOR EACH ROW SET {sync}")
+        op.execute(f"CREATE TRIGGER {table}_uuid_bin_update BEFORE UPDATE ON {table} FOR EACH ROW SET {sync}")
+    _create_keys(foreign_keys, indexes)
@@ -0,0 +1,52 @@
+"""add units_ordered to daily product summary
+
+Revision ID: a2d7c5e8f103
+Revises: f5c8d1e3a972
+Create Date: 2026-10-18 22:05:31.640218
+
+The product performance report counts every sale item, paid or not, and the
+status report counts every unpaid sale, cancelled ones included. The rollup
+now keeps units_ordered per product and day for the first, and unpaid_count
+goes back to counting cancelled sales for the second. Both are recomputed
+here from the sales tables.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2d7c5e8f103'
+down_revision: Union[str, Sequence[str], None] = 'f5c8d1e3a972'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UNITS_ORDERED = """
+INSERT INTO daily_product_sales_summary (day, product_id, units_ordered)
+SELECT DATE(s.sale_date), si.product_id, SUM(si.quantity)
+FROM sale_items si JOIN sales s ON s.id = si.sale_id
+GROUP BY DATE(s.sale_date), si.product_id
+ON DUPLICATE KEY UPDATE units_ordered = VALUES(units_ordered)
+"""
+
+UNPAID_COUNT = """
+UPDATE daily_sales_summary d
+JOIN (SELECT DATE(sale_date) AS day, SUM(paid = 0) AS unpaid FROM sales GROUP BY DATE(sale_date)) s ON s.day = d.day
+SET d.unpaid_count = s.unpaid
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('daily_product_sales_summary', sa.Column('units_ordered', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_daily_product_sales_summary_product_ordered', 'daily_product_sales_summary', ['product_id', 'units_ordered'], unique=False)
+    op.execute(UNITS_ORDERED)
+    op.execute(UNPAID_COUNT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_product_sales_summary_product_ordered', table_name='daily_product_sales_summary')
+    op.drop_column('daily_product_sales_summary', 'units_ordered')
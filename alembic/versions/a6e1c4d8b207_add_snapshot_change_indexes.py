@@ -0,0 +1,37 @@
+"""add snapshot change indexes
+
+Revision ID: a6e1c4d8b207
+Revises: 3f8d2b6c9a41
+Create Date: 2026-10-18 15:11:52.604317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e1c4d8b207'
+down_revision: Union[str, Sequence[str], None] = '3f8d2b6c9a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # incremental snapshots look rows up by created_at or modified_at past the last high-water mark
+    op.create_index('ix_sales_created_at_id', 'sales', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sales_modified_at', 'sales', ['modified_at'], unique=False)
+    op.create_index('ix_sale_items_created_at_id', 'sale_items', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sale_items_modified_at', 'sale_items', ['modified_at'], unique=False)
+    op.create_index('ix_stock_entries_modified_at', 'stock_entries', ['modified_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_entries_modified_at', table_name='stock_entries')
+    op.drop_index('ix_sale_items_modified_at', table_name='sale_items')
+    op.drop_index('ix_sale_items_created_at_id', table_name='sale_items')
+    op.drop_index('ix_sales_modified_at', table_name='sales')
+    op.drop_index('ix_sales_created_at_id', table_name='sales')
@@ -0,0 +1,40 @@
+"""add product reorder forecast
+
+Revision ID: c3f95e0a7b18
+Revises: a6e1c4d8b207
+Create Date: 2026-10-18 16:37:09.275113
+
+Seed velocities with python -m infrastructure.commands.rebuild_reorder_forecast
+after deploying; until then only sales verified after the deploy are counted.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f95e0a7b18'
+down_revision: Union[str, Sequence[str], None] = 'a6e1c4d8b207'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('product_reorder_forecast',
+    sa.Column('product_id', mysql.BINARY(16), nullable=False),
+    sa.Column('velocity_short', sa.Double(), server_default='0', nullable=False),
+    sa.Column('velocity_long', sa.Double(), server_default='0', nullable=False),
+    sa.Column('velocity_updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('lead_time_days', sa.Integer(), nullable=True),
+    sa.Column('cover_days', sa.Integer(), nullable=True),
+    sa.Column('min_stock', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_reorder_forecast')
@@ -0,0 +1,46 @@
+"""add payment outbox
+
+Revision ID: e41a9c6f2d80
+Revises: d7b2f4a91e35
+Create Date: 2026-10-18 19:11:05.730214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41a9c6f2d80'
+down_revision: Union[str, Sequence[str], None] = 'd7b2f4a91e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payment_outbox',
+    sa.Column('reference', sa.String(length=100), nullable=False),
+    sa.Column('sale_id', mysql.BINARY(16), nullable=False),
+    sa.Column('customer_id', mysql.BINARY(16), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('amount_in_kobo', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.Enum('Pending', 'Initialized', 'Failed', name='outboxstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('authorization_url', sa.String(length=500), nullable=True),
+    sa.Column('access_code', sa.String(length=100), nullable=True),
+    sa.Column('last_error', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('modified_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['customer_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('reference')
+    )
+    op.create_index('ix_payment_outbox_status_next_attempt_at', 'payment_outbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_payment_outbox_status_next_attempt_at', table_name='payment_outbox')
+    op.drop_table('payment_outbox')
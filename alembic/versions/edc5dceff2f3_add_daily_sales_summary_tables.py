@@ -0,0 +1,50 @@
+"""add daily sales summary tables
+
+Revision ID: edc5dceff2f3
+Revises: 5c2e9a7d13f4
+Create Date: 2026-10-18 12:41:18.902245
+
+Fill with python -m infrastructure.commands.backfill_daily_sales once the
+new code is serving traffic; sales made before then are only counted by it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'edc5dceff2f3'
+down_revision: Union[str, Sequence[str], None] = '5c2e9a7d13f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_sales_summary',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('revenue', mysql.DECIMAL(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('cost', mysql.DECIMAL(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('units', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('paid_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('unpaid_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_product_sales_summary',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', mysql.BINARY(16), nullable=False),
+    sa.Column('revenue', mysql.DECIMAL(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('cost', mysql.DECIMAL(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('units', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('day', 'product_id')
+    )
+    op.create_index('ix_daily_product_sales_summary_product_id', 'daily_product_sales_summary', ['product_id', 'day', 'units'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_daily_product_sales_summary_product_id', table_name='daily_product_sales_summary')
+    op.drop_table('daily_product_sales_summary')
+    op.drop_table('daily_sales_summary')
@@ -0,0 +1,30 @@
+"""add sales cancelled_at
+
+Revision ID: f5c8d1e3a972
+Revises: e41a9c6f2d80
+Create Date: 2026-10-18 20:24:57.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c8d1e3a972'
+down_revision: Union[str, Sequence[str], None] = 'e41a9c6f2d80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sales', sa.Column('cancelled_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_sales_paid_cancelled_at_sale_date', 'sales', ['paid', 'cancelled_at', 'sale_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sales_paid_cancelled_at_sale_date', table_name='sales')
+    op.drop_column('sales', 'cancelled_at')
@@ -15,13 +15,13 @@ router = APIRouter()
 
 
 @router.post("/token", response_model=TokenResponse)
-def token(tokenRequest: TokenRequest = Body(...)):
+async def token(tokenRequest: TokenRequest = Body(...)):
     user_service = Container.user_service()
-    response = user_service.authenticate(tokenRequest.email, tokenRequest.password)
+    response = await user_service.authenticate(tokenRequest.email, tokenRequest.password)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
 
-    response: UserResponse = Container.user_service().get_by_email(tokenRequest.email)
+    response: UserResponse = await Container.user_service().get_by_email(tokenRequest.email)
 
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
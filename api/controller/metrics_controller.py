@@ -0,0 +1,16 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException
+from api.token import allowed_roles
+from application.use_case.models.auth import TokenData
+from application.use_case.models.metrics import MetricsReport
+from infrastructure.dependency import Container
+
+router = APIRouter()
+
+@router.get("", response_model=MetricsReport)
+async def metrics(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+    metrics_service = Container.metrics_service()
+    response = await metrics_service.get_metrics()
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
@@ -1,17 +1,19 @@
 import os
 import shutil
 import uuid
-from fastapi import APIRouter, HTTPException, Form, UploadFile
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Form, UploadFile, Query
 from application.use_case.models.base_response import BaseResponse
 from application.use_case.models.product import CreateProductResponse, CreateProduct, UpdateProduct, GetResponse, List
 from infrastructure.dependency import Container
+from infrastructure.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 UPLOAD_DIR = "uploads"
 
 router = APIRouter()
 
 @router.post("", response_model=CreateProductResponse)
-def create(name: str = Form(), description: str = Form(), image: UploadFile = None) -> BaseResponse:
+async def create(name: str = Form(), description: str = Form(), image: UploadFile = None) -> BaseResponse:
     product_service = Container.product_service()
 
     os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -30,13 +32,13 @@ def create(name: str = Form(), description: str = Form(), image: UploadFile = No
             image=image_path
         )
 
-    response = product_service.create(product=request)
+    response = await product_service.create(product=request)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.put("", response_model=CreateProductResponse)
-def update(name: str = Form(), description: str = Form(), image: UploadFile = None) -> BaseResponse:
+async def update(name: str = Form(), description: str = Form(), image: UploadFile = None) -> BaseResponse:
     product_service = Container.product_service()
 
     os.makedirs(UPLOAD_DIR, exist_ok=True)
@@ -55,23 +57,23 @@ def update(name: str = Form(), description: str = Form(), image: UploadFile = No
         if image_path:
             request.image = image_path
 
-    response = product_service.update( name= name, product=request)
+    response = await product_service.update( name= name, product=request)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.get("/product", response_model=GetResponse)
-def get(name: str) -> BaseResponse:
+async def get(name: str) -> BaseResponse:
     product_service = Container.product_service()
-    response = product_service.get_by_name(name=name)
+    response = await product_service.get_by_name(name=name)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.get("", response_model=List)
-def list() -> BaseResponse:
+async def list(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None) -> BaseResponse:
     product_service = Container.product_service()
-    response = product_service.list()
+    response = await product_service.list(limit=limit, cursor=cursor)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
\ No newline at end of file
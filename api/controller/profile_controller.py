@@ -1,45 +1,46 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 from api.token import allowed_roles, get_current_user
 from application.use_case.models.auth import TokenData
 from application.use_case.models.profile import CreateProfile, CreateProfileResponse, Get, GetResponse, ListResponse, Update, UpdateResponse
 from infrastructure.dependency import Container
+from infrastructure.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 oauth2_token = OAuth2PasswordBearer(tokenUrl="token")
 
 router = APIRouter()
 
 @router.post("", response_model=CreateProfileResponse)
-def create(profile: CreateProfile ,current_user: TokenData = Depends(get_current_user)):
+async def create(profile: CreateProfile ,current_user: TokenData = Depends(get_current_user)):
     profile_service = Container.profile_service()
-    response = profile_service.create(user_id=current_user.user_id, profile=profile)
+    response = await profile_service.create(user_id=current_user.user_id, profile=profile)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.put("/{update}", response_model=UpdateResponse)
-def update(profile: Update, current_user: TokenData = Depends(get_current_user)):
+async def update(profile: Update, current_user: TokenData = Depends(get_current_user)):
     profile_service = Container.profile_service()
-    response = profile_service.update(current_user.user_id, profile=profile)
+    response = await profile_service.update(current_user.user_id, profile=profile)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.get("/{id}", response_model=GetResponse)
-def get(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin", "Customer"]))]):
+async def get(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin", "Customer"]))]):
     profile_service = Container.profile_service()
-    response = profile_service.get(user_id=current_user.user_id)
+    response = await profile_service.get(user_id=current_user.user_id)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 
 @router.get("", response_model=ListResponse)
-def list(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+async def list(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
     profile_service = Container.profile_service()
-    response = profile_service.list()
+    response = await profile_service.list(limit=limit, cursor=cursor)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
\ No newline at end of file
@@ -1,53 +1,147 @@
+from datetime import date
 from typing import Annotated, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from api.token import get_current_user, allowed_roles
 from application.use_case.models.auth import TokenData
 from application.use_case.models.report import SalesReport, ProfitLossReport, SalesStatusReport, \
-    ProductPerformanceReport, LowStockAlert, LowStockReport
+    ProductPerformanceReport, LowStockAlert, LowStockReport, TimeBucket, TimeSeriesReport, ExportFormat, \
+    MarginDistributionReport, SellThroughReport, AbcReport, InventoryValuationReport, ReorderForecastReport, ReorderSettings
+from application.use_case.models.base_response import BaseResponse
+from application.use_case.models.snapshot import SnapshotReport
 from infrastructure.dependency import Container
+from infrastructure.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from infrastructure.use_case.report_service import LOW_STOCK_THRESHOLD
 
 router = APIRouter()
 
 @router.get("", response_model=SalesReport)
-def sales_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))],year: int, month: Optional[int] = None, day: Optional[int] = None, ):
+async def sales_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))],year: int, month: Optional[int] = None, day: Optional[int] = None, ):
     report_service = Container.report_service()
-    response = report_service.get_sales_report(year=year, month=month, day=day)
+    response = await report_service.get_sales_report(year=year, month=month, day=day)
     if not response.status:
         raise HTTPException(status_code=response.status_code, detail=response.message)
     return response
 
 
+@router.get("/timeseries", response_model=TimeSeriesReport)
+async def sales_timeseries(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], start: date, end: date, bucket: TimeBucket = TimeBucket.day):
+    report_service = Container.report_service()
+    response = await report_service.get_sales_timeseries(start=start, end=end, bucket=bucket)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.get("/margin-distribution", response_model=MarginDistributionReport)
+async def margin_distribution(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], start: date, end: date, band_width: float = Query(10, gt=0, le=100)):
+    report_service = Container.report_service()
+    response = await report_service.get_margin_distribution(start=start, end=end, band_width=band_width)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.get("/sell-through", response_model=SellThroughReport)
+async def sell_through(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], start: date, end: date):
+    report_service = Container.report_service()
+    response = await report_service.get_sell_through(start=start, end=end)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.get("/abc", response_model=AbcReport)
+async def abc_classification(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], start: date, end: date):
+    report_service = Container.report_service()
+    response = await report_service.get_abc_classification(start=start, end=end)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.get("/inventory-valuation", response_model=InventoryValuationReport)
+async def inventory_valuation(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], as_of: Optional[date] = None):
+    report_service = Container.report_service()
+    response = await report_service.get_inventory_valuation(as_of=as_of)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.get("/export")
+async def export_sales(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], start: date, end: date, format: ExportFormat = ExportFormat.csv):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    report_service = Container.report_service()
+    media_type = "text/csv" if format == ExportFormat.csv else "application/x-ndjson"
+    filename = f"sales_{start}_{end}.{format.value}"
+    return StreamingResponse(
+        report_service.export_sales(start=start, end=end, format=format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/snapshot", response_model=SnapshotReport)
+async def export_snapshot(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+    snapshot_service = Container.snapshot_service()
+    response = await snapshot_service.export()
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
 @router.get("/profit-loss", response_model=ProfitLossReport)
-def profit_loss_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))],year: int, month: Optional[int] = None, day: Optional[int] = None ):
+async def profit_loss_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))],year: int, month: Optional[int] = None, day: Optional[int] = None ):
     report_service = Container.report_service()
-    response = report_service.get_profit_loss_report(year=year, month=month, day=day)
+    response = await report_service.get_profit_loss_report(year=year, month=month, day=day)
     if not response.status:
         raise HTTPException(status_code=response.status_code, detail=response.message)
     return response
 
 
 @router.get("/sales-status", response_model=SalesStatusReport)
-def Sales_status_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+async def Sales_status_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
     report_service = Container.report_service()
-    response = report_service.get_sales_status_report()
+    response = await report_service.get_sales_status_report()
     if not response.status:
         raise HTTPException(status_code=response.status_code, detail=response.message)
     return response
 
 
 @router.get("/product-performance", response_model=ProductPerformanceReport)
-def product_performance_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+async def product_performance_report(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
     report_service = Container.report_service()
-    response = report_service.get_product_performance_report()
+    response = await report_service.get_product_performance_report()
     if not response.status:
         raise HTTPException(status_code=response.status_code, detail=response.message)
     return response
 
 
 @router.get("/low-stock-alert", response_model=LowStockReport)
-def low_stock_alert(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+async def low_stock_alert(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], threshold: int = Query(LOW_STOCK_THRESHOLD, ge=0)):
     report_service = Container.report_service()
-    response = report_service.get_low_stock_alerts(threshold=5)
+    response = await report_service.get_low_stock_alerts(threshold=threshold)
     if not response.status:
         raise HTTPException(status_code=response.status_code, detail=response.message)
-    return response
\ No newline at end of file
+    return response
+
+
+@router.get("/reorder-forecast", response_model=ReorderForecastReport)
+async def reorder_forecast(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
+    report_service = Container.report_service()
+    response = await report_service.get_reorder_forecast(limit=limit, cursor=cursor)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.put("/reorder-forecast/{product_id}", response_model=BaseResponse)
+async def update_reorder_settings(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], product_id: UUID, settings: ReorderSettings):
+    report_service = Container.report_service()
+    response = await report_service.update_reorder_settings(product_id=product_id, settings=settings)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
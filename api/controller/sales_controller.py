@@ -1,27 +1,46 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from api.token import get_current_user
 from application.use_case.models.auth import TokenData
 from application.use_case.models.base_response import BaseResponse
-from application.use_case.models.sale import CreateSaleRequest, CreateSaleResponse, VerifySaleResponse
+from application.use_case.models.sale import CreateSaleRequest, CreateSaleResponse, PaymentStatusResponse, VerifySaleResponse
 from application.use_case.sales_service import SalesService
 from infrastructure.dependency import Container
 
 router = APIRouter()
 
-@router.post("", response_model=CreateSaleResponse)
-def create(sale: CreateSaleRequest, current_user: Annotated[TokenData, Depends(get_current_user)]) -> BaseResponse:
+@router.post("", response_model=CreateSaleResponse, status_code=202)
+async def create(sale: CreateSaleRequest, current_user: Annotated[TokenData, Depends(get_current_user)], idempotency_key: Annotated[Optional[str], Header()] = None) -> BaseResponse:
     sale_service = Container.sales_service()
-    response = sale_service.create(user_id=current_user.user_id, sale=sale, email=current_user.email)
+    response = await sale_service.create(user_id=current_user.user_id, sale=sale, email=current_user.email, idempotency_key=idempotency_key)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.get("/{reference}/payment", response_model=PaymentStatusResponse)
+async def get_payment_status(reference: str, current_user: Annotated[TokenData, Depends(get_current_user)]) -> BaseResponse:
+    sales_service = Container.sales_service()
+    response = await sales_service.get_payment_status(user_id=current_user.user_id, reference=reference)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 
 @router.get("/verify/{reference}", response_model=VerifySaleResponse)
-def verify_payment(reference: str) -> BaseResponse:
+async def verify_payment(reference: str) -> BaseResponse:
+    sales_service = Container.sales_service()
+    response = await sales_service.verify_payment(reference=reference)
+    if not response.status:
+        raise HTTPException(status_code=response._status_code, detail=response.message)
+    return response
+
+
+@router.post("/webhook", response_model=BaseResponse)
+async def paystack_webhook(request: Request, x_paystack_signature: Annotated[Optional[str], Header()] = None) -> BaseResponse:
     sales_service = Container.sales_service()
-    response = sales_service.verify_payment(reference=reference)
+    # the signature covers the exact bytes paystack sent, so the body is read raw
+    response = await sales_service.receive_webhook(body=await request.body(), signature=x_paystack_signature)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
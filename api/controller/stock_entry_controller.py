@@ -1,42 +1,44 @@
 from urllib import response
+from typing import Optional
 from uuid import UUID
 
 from application.use_case.models.base_response import BaseResponse
 from application.use_case.models.stock_entry import CreateStockResponse, CreateStock, UpdateStockResponse, UpdateStock, \
     GetStockResponse, ListStocks
 from infrastructure.dependency import Container
-from fastapi import APIRouter, HTTPException
+from infrastructure.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from fastapi import APIRouter, HTTPException, Query
 
 router = APIRouter()
 
 @router.post("", response_model=CreateStockResponse)
-def create(product_name: str, stock_entry: CreateStock) -> BaseResponse:
+async def create(product_name: str, stock_entry: CreateStock) -> BaseResponse:
     stock_entry_service = Container.stock_entry_service()
-    response = stock_entry_service.create(product_name=product_name, stock_entry=stock_entry)
+    response = await stock_entry_service.create(product_name=product_name, stock_entry=stock_entry)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.put("", response_model=UpdateStockResponse)
-def update(id: str, stock_entry: UpdateStock) -> BaseResponse:
+async def update(id: str, stock_entry: UpdateStock) -> BaseResponse:
     stock_entry_service = Container.stock_entry_service()
-    response = stock_entry_service.update(id=id, stock_entry=stock_entry)
+    response = await stock_entry_service.update(id=id, stock_entry=stock_entry)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.get("/{id}", response_model=GetStockResponse)
-def get(id: UUID) -> BaseResponse:
+async def get(id: UUID) -> BaseResponse:
     stock_entry_service = Container.stock_entry_service()
-    response = stock_entry_service.get(id=id)
+    response = await stock_entry_service.get(id=id)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.get("", response_model=ListStocks)
-def list() -> BaseResponse:
+async def list(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None) -> BaseResponse:
     stock_entry_service = Container.stock_entry_service()
-    response = stock_entry_service.list()
+    response = await stock_entry_service.list(limit=limit, cursor=cursor)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
\ No newline at end of file
@@ -1,9 +1,10 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.security import OAuth2PasswordBearer
 from application.use_case.models.auth import TokenData
 from api.token import get_current_user, allowed_roles
 from infrastructure.dependency import Container
+from infrastructure.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from application.use_case.models.user import CreateUser, GetResponse, UserResponse, ListUsers
 
 oauth2_token = OAuth2PasswordBearer(tokenUrl="token")
@@ -11,26 +12,26 @@ oauth2_token = OAuth2PasswordBearer(tokenUrl="token")
 router = APIRouter()
 
 @router.post("{admin}", response_model=UserResponse)
-def create_admin(request: CreateUser, current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+async def create_admin(request: CreateUser, current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
     user_service = Container.user_service()
-    response = user_service.create_admin(request)
+    response = await user_service.create_admin(request)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 @router.post("", response_model=UserResponse)
-def create(request: CreateUser):
+async def create(request: CreateUser):
     user_service = Container.user_service()
-    response = user_service.create(request)
+    response = await user_service.create(request)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
 
 
 @router.get("/filter", response_model=GetResponse)
-def get_by_email(current_user: TokenData = Depends(get_current_user)):
+async def get_by_email(current_user: TokenData = Depends(get_current_user)):
     user_service = Container.user_service()
-    response = user_service.get_by_email(current_user.email)
+    response = await user_service.get_by_email(current_user.email)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
@@ -40,9 +41,9 @@ def get_by_email(current_user: TokenData = Depends(get_current_user)):
 
 
 @router.get("/user", response_model=GetResponse)
-def get(current_user: TokenData = Depends(get_current_user)):
+async def get(current_user: TokenData = Depends(get_current_user)):
     user_service = Container.user_service()
-    response = user_service.get(current_user.user_id)
+    response = await user_service.get(current_user.user_id)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
@@ -52,10 +53,10 @@ def get(current_user: TokenData = Depends(get_current_user)):
 
 
 @router.get("", response_model=ListUsers)
-def list(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))]):
+async def list(current_user: Annotated[TokenData, Depends(allowed_roles(["Admin"]))], limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
     email = current_user.email
     user_service = Container.user_service()
-    response = user_service.list()
+    response = await user_service.list(limit=limit, cursor=cursor)
     if not response.status:
         raise HTTPException(status_code=response._status_code, detail=response.message)
     return response
\ No newline at end of file
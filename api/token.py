@@ -1,5 +1,6 @@
 from datetime import timedelta, datetime, timezone
 from typing import Annotated, Union
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
@@ -26,7 +27,7 @@ def create_token(data: dict, expires_delta: Union[timedelta, None] = None) -> tu
     encoded_refresh_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt, encoded_refresh_jwt, expire
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenData:
+async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -43,15 +44,18 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> TokenData
             username=payload.get("username"),
             roles=payload.get("roles", [])
         )
-    except InvalidTokenError:
+        user_id = UUID(token_data.user_id)
+    except (InvalidTokenError, ValueError):
         raise credentials_exception
-    user = Container.user_service().get_by_email(token_data.email)
-    if user is None:
+    role = await Container.user_service().get_role(user_id)
+    if role is None:
         raise credentials_exception
+    # the stored role wins over the one baked into the token, so role changes apply before it expires
+    token_data.roles = [role]
     return token_data
 
 def allowed_roles(required_roles: list[str]):
-    def role_checker(current_user: Annotated[TokenData, Depends(get_current_user)]):
+    async def role_checker(current_user: Annotated[TokenData, Depends(get_current_user)]):
         if required_roles == []:
             return current_user
         if not any(role in current_user.roles for role in required_roles):
@@ -0,0 +1,18 @@
+from abc import ABCMeta
+from datetime import datetime
+from typing import AsyncIterator, List, Tuple
+from uuid import UUID
+
+
+class AnalyticsRepository(metaclass=ABCMeta):
+    """
+        Default class for the in-memory analytics repository implementation
+    """
+
+    async def get_products(self) -> List[Tuple[UUID, str, int]]:
+        """get id, name and units on hand for every product"""
+        raise NotImplementedError
+
+    def stream_sale_items(self, start: datetime, end: datetime, batch_size: int) -> AsyncIterator[List[Tuple[UUID, int, int, int, int]]]:
+        """stream product id, quantity, unit price and unit cost in kobo, and sale time in epoch seconds for paid sales in [start, end)"""
+        raise NotImplementedError
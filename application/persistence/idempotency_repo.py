@@ -0,0 +1,31 @@
+from abc import ABCMeta
+from typing import Optional, Tuple
+from uuid import UUID
+
+from domain.models import IdempotencyKey
+
+
+class IdempotencyRepository(metaclass=ABCMeta):
+    """
+        Default class for the idempotency key repository implementation
+    """
+
+    async def claim(self, user_id: UUID, key: str, fingerprint: str) -> Optional[Tuple[IdempotencyKey, bool]]:
+        """store a new key for the user or load the one already stored, True when this call stored it. a claim left without a response past its lease is taken over"""
+        raise NotImplementedError
+
+    async def get(self, user_id: UUID, key: str) -> Optional[IdempotencyKey]:
+        """read the current state of a key from the primary"""
+        raise NotImplementedError
+
+    async def complete(self, record: IdempotencyKey, status_code: int, body: str) -> bool:
+        """save the response of the request that claimed the key, False once its claim was taken over"""
+        raise NotImplementedError
+
+    async def release(self, record: IdempotencyKey) -> bool:
+        """drop an unfinished key so the request can be sent again"""
+        raise NotImplementedError
+
+    async def purge_expired(self, batch_size: int) -> int:
+        """delete keys older than their time to live, returns how many were deleted"""
+        raise NotImplementedError
@@ -0,0 +1,42 @@
+from abc import ABCMeta
+from typing import List, Optional
+
+from domain.models import PaymentOutbox
+
+
+class PaymentOutboxRepository(metaclass=ABCMeta):
+    """
+        Default class for the payment outbox repository implementation
+    """
+
+    async def add(self, entry: PaymentOutbox) -> bool:
+        """queue a gateway transaction, called inside the transaction that creates its sale"""
+        raise NotImplementedError
+
+    async def get(self, reference: str) -> Optional[PaymentOutbox]:
+        """read an entry from the primary"""
+        raise NotImplementedError
+
+    async def lock(self, reference: str) -> Optional[PaymentOutbox]:
+        """read an entry and lock it until the surrounding transaction ends"""
+        raise NotImplementedError
+
+    async def claim_due(self, batch_size: int) -> List[PaymentOutbox]:
+        """lease a batch of pending entries that are due, so no other dispatcher picks them up meanwhile"""
+        raise NotImplementedError
+
+    async def mark_initialized(self, reference: str, authorization_url: Optional[str], access_code: Optional[str]) -> bool:
+        """store the checkout details the gateway returned, an entry initialized without them can still be given them"""
+        raise NotImplementedError
+
+    async def reschedule(self, reference: str, delay_seconds: float, error: str) -> bool:
+        """put a failed attempt back in the queue after a delay"""
+        raise NotImplementedError
+
+    async def mark_failed(self, reference: str, error: str) -> bool:
+        """give up on an entry"""
+        raise NotImplementedError
+
+    async def mark_expired(self, references: List[str]) -> bool:
+        """fail the entries of cancelled sales, initialized ones included, so their checkout is no longer offered"""
+        raise NotImplementedError
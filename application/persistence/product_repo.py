@@ -1,5 +1,6 @@
 from abc import ABCMeta
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, Optional, List, Tuple
 from uuid import UUID
 
 from domain.models import Product
@@ -10,22 +11,30 @@ class ProductRepository(metaclass=ABCMeta):
         Default class for product repository implementation
     """
 
-    def create(self, product: Product) -> Optional[Product]:
+    async def create(self, product: Product) -> Optional[Product]:
         """create product"""
         raise NotImplementedError
 
-    def update(self, product: Product) -> Optional[Product]:
+    async def update(self, product: Product) -> Optional[Product]:
         """update product"""
         raise NotImplementedError
 
-    def get(self, id: UUID) -> Optional[Product]:
+    async def get(self, id: UUID) -> Optional[Product]:
         """get product"""
         raise NotImplementedError
 
-    def get_by_name(self, name: str) -> Optional[Product]:
+    async def get_many(self, ids: List[UUID]) -> List[Product]:
+        """get products with their in-stock entries"""
+        raise NotImplementedError
+
+    async def get_by_name(self, name: str) -> Optional[Product]:
         """get product by name"""
         raise NotImplementedError
 
-    def list(self) -> List[Product]:
-        """list product"""
-        raise NotImplementedError
\ No newline at end of file
+    async def list(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> Tuple[List[Product], Optional[str]]:
+        """list a page of products and the cursor for the next page"""
+        raise NotImplementedError
+
+    async def list_rows(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> Tuple[List[Tuple[Any, List[Any]]], Optional[str]]:
+        """list a page of product rows with their stock rows, without loading ORM objects"""
+        raise NotImplementedError
@@ -1,5 +1,6 @@
 from abc import ABCMeta
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from domain.models import Profile
@@ -10,18 +11,18 @@ class ProfileRepository(metaclass=ABCMeta):
         default class for profile repository
     """
 
-    def create(self, profile: Profile) -> Optional[Profile]:
+    async def create(self, profile: Profile) -> Optional[Profile]:
         """create profile"""
         raise NotImplementedError
 
-    def update(self, profile: Profile) -> Optional[Profile]:
+    async def update(self, profile: Profile) -> Optional[Profile]:
         """update a profile"""
         raise NotImplementedError
 
-    def get(self, user_id: UUID) -> Optional[Profile]:
+    async def get(self, user_id: UUID) -> Optional[Profile]:
         """get a profile"""
         raise NotImplementedError
 
-    def list(self) -> List[Profile]:
-        """list profiles"""
+    async def list(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> Tuple[List[dict], Optional[str]]:
+        """list a page of profiles and the next page cursor"""
         raise NotImplementedError
\ No newline at end of file
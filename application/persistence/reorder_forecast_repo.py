@@ -0,0 +1,28 @@
+from abc import ABCMeta
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from domain.models import Sale
+
+
+class ReorderForecastRepository(metaclass=ABCMeta):
+    """
+        Default class for the reorder forecast repository implementation
+    """
+
+    async def record_sale(self, sale: Sale) -> bool:
+        """fold the units of a paid sale into the sales velocity of its products"""
+        raise NotImplementedError
+
+    async def rebuild(self) -> bool:
+        """recompute every sales velocity from the daily product rollup"""
+        raise NotImplementedError
+
+    async def update_settings(self, product_id: UUID, lead_time_days: Optional[int], cover_days: Optional[int], min_stock: Optional[int]) -> bool:
+        """set the reorder settings of one product, None falls back to the defaults"""
+        raise NotImplementedError
+
+    async def list(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> Tuple[List[Tuple[Any, int]], Optional[str]]:
+        """list a page of products with their forecast row and units on hand, and the next page cursor"""
+        raise NotImplementedError
@@ -1,7 +1,7 @@
 from abc import ABCMeta
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
-from typing import  List, Tuple
+from typing import  List, Optional, Tuple
 
 
 class ReportRepository(metaclass=ABCMeta):
@@ -9,22 +9,30 @@ class ReportRepository(metaclass=ABCMeta):
         default class Report repository.
     """
 
-    def get_total_sales(self, start_date: datetime, end_date: datetime) -> Decimal:
+    async def get_total_sales(self, start_date: datetime, end_date: datetime) -> Decimal:
         """get total sales"""
         raise NotImplementedError
 
-    def get_profit_loss(self, start_date: datetime, end_date: datetime) -> Tuple[Decimal, Decimal]:
-        """get profit or loss"""
+    async def get_profit_loss(self, start_date: datetime, end_date: datetime) -> Tuple[Decimal, Decimal, Decimal]:
+        """get revenue, cost and the revenue of items with no recorded cost"""
         raise NotImplementedError
 
-    def get_sales_status_counts(self) -> Tuple[int, int]:
+    async def get_sales_status_counts(self) -> Tuple[int, int]:
         """get sales status counts"""
         raise NotImplementedError
 
-    def get_product_performance(self) -> List[Tuple[str, str, int]]:
+    async def get_product_performance(self) -> List[Tuple[str, str, int]]:
         """get product performance"""
         raise NotImplementedError
 
-    def get_low_stock_products(self, threshold: int) -> List[Tuple[str, str, int]]:
+    async def get_low_stock_products(self, threshold: int) -> List[Tuple[str, str, int]]:
         """get low stock products"""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def get_timeseries(self, start: date, end: date, bucket: str) -> List[Tuple[date, Decimal, Decimal, int, int, Decimal]]:
+        """get revenue, cost, orders, units and uncosted revenue per bucket for days in [start, end), empty buckets omitted"""
+        raise NotImplementedError
+
+    async def get_inventory_valuation(self, as_of: Optional[datetime] = None) -> List[Tuple[str, str, int, Decimal, Decimal]]:
+        """get units, cost value and retail value of stock on hand per product, now or just before as_of"""
+        raise NotImplementedError
@@ -0,0 +1,13 @@
+from abc import ABCMeta
+from datetime import datetime
+from typing import Any, AsyncIterator, List
+
+
+class SalesExportRepository(metaclass=ABCMeta):
+    """
+        Default class for sales export repository implementation
+    """
+
+    def stream_sale_lines(self, start: datetime, end: datetime, batch_size: int) -> AsyncIterator[List[Any]]:
+        """stream sale item rows with their sale and product name for sales in [start, end), batch_size rows at a time"""
+        raise NotImplementedError
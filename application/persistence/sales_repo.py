@@ -1,5 +1,6 @@
 from abc import ABCMeta
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Tuple
 from uuid import UUID
 
 from domain.models import Product, Sale, SaleItem
@@ -7,14 +8,26 @@ from domain.models import Product, Sale, SaleItem
 class SalesRepository(metaclass=ABCMeta):
     """Default class for sale repository implementation"""
 
-    def create(self, sale: Sale) -> Optional[Sale]:
+    async def create(self, sale: Sale) -> Optional[Sale]:
         """Create a new sale"""
         raise NotImplementedError
 
-    def get_by_reference(self, reference: str) -> Optional[Sale]:
-        """Get a sale by reference"""
+    async def get_by_reference(self, reference: str, lock: bool = False) -> Optional[Sale]:
+        """Get a sale by reference, lock holds the row until the surrounding transaction ends"""
         raise NotImplementedError
 
-    def update(self, sale: Sale) -> Optional[Sale]:
+    async def update(self, sale: Sale) -> Optional[Sale]:
         """Confirm payment"""
+        raise NotImplementedError
+
+    async def mark_paid(self, reference: str) -> Optional[bool]:
+        """Mark the unpaid sale with this payment reference as paid, False when it already was, None on a database error"""
+        raise NotImplementedError
+
+    async def cancel_unpaid(self, created_before: datetime, batch_size: int) -> Optional[List[Tuple[UUID, str, date]]]:
+        """cancel a batch of unpaid sales queued through the payment outbox before the cutoff, returns their id, reference and day"""
+        raise NotImplementedError
+
+    async def cancel(self, sale: Sale) -> bool:
+        """cancel a sale by stamping cancelled_at, it is kept so exports and reports still see it"""
         raise NotImplementedError
\ No newline at end of file
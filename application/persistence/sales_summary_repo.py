@@ -0,0 +1,27 @@
+from abc import ABCMeta
+from datetime import date
+from typing import Optional
+
+from domain.models import Sale
+
+
+class SalesSummaryRepository(metaclass=ABCMeta):
+    """
+        Default class for the daily sales rollup repository implementation
+    """
+
+    async def record_created(self, sale: Sale) -> bool:
+        """count a new unpaid sale and the units it ordered"""
+        raise NotImplementedError
+
+    async def record_paid(self, sale: Sale) -> bool:
+        """move a sale from unpaid to paid and add its revenue, cost and units"""
+        raise NotImplementedError
+
+    async def first_sale_date(self) -> Optional[date]:
+        """date of the oldest sale"""
+        raise NotImplementedError
+
+    async def rebuild(self, start: date, end: date) -> bool:
+        """recompute the rollup for days in [start, end) from the sales tables"""
+        raise NotImplementedError
@@ -0,0 +1,19 @@
+from abc import ABCMeta
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Type
+
+from domain.models import BaseModel
+
+
+class SnapshotRepository(metaclass=ABCMeta):
+    """
+        Default class for the analytics snapshot repository implementation
+    """
+
+    async def current_time(self) -> Optional[datetime]:
+        """the database clock, which is what created_at and modified_at are stamped with"""
+        raise NotImplementedError
+
+    def stream_changes(self, model: Type[BaseModel], since: Optional[datetime], until: datetime, batch_size: int) -> AsyncIterator[List[Any]]:
+        """stream every column of rows created or modified in (since, until], ordered by created_at, batch_size rows at a time"""
+        raise NotImplementedError
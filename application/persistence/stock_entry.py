@@ -1,22 +1,23 @@
 from abc import ABCMeta
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Tuple
 from uuid import UUID
-from domain.models import StockEntry
+from domain.models import SaleItem, StockEntry
 
 class StockEntryRepository(metaclass=ABCMeta):
     """
         Default class for stock entry repository implementation
     """
 
-    def create(self,product_name: str,stock_entry: StockEntry) -> Optional[StockEntry]:
+    async def create(self,product_name: str,stock_entry: StockEntry) -> Optional[StockEntry]:
         """add stock to product"""
         raise NotImplementedError
 
-    def update(self, id: UUID, stock_entry: StockEntry) -> Optional[StockEntry]:
+    async def update(self, id: UUID, stock_entry: StockEntry) -> Optional[StockEntry]:
         """update stock in product"""
         raise NotImplementedError
 
-    def get(self, id: UUID) -> Optional[StockEntry]:
+    async def get(self, id: UUID) -> Optional[StockEntry]:
         """get stock in product"""
         raise NotImplementedError
 
@@ -24,10 +25,22 @@ class StockEntryRepository(metaclass=ABCMeta):
     #     """get stock in product by name"""
     #     raise NotImplementedError
 
-    def list(self) -> List[StockEntry]:
-        """list stock in product"""
+    async def list(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> Tuple[List[StockEntry], Optional[str]]:
+        """list a page of stock entries and the next page cursor"""
         raise NotImplementedError
 
-    def reduce_stock_for_sales(self, entries_to_reduce: List[StockEntry]) -> bool:
-        """reduce stock for sales"""
+    async def reserve_stock(self, product_id: UUID, quantity: int) -> Optional[List[Tuple[StockEntry, int]]]:
+        """take quantity of a product from its oldest stock entries"""
+        raise NotImplementedError
+
+    async def release_stock(self, reservations: List[Tuple[StockEntry, int]]) -> bool:
+        """return reserved quantities to their stock entries"""
+        raise NotImplementedError
+
+    async def release_sale_items(self, items: List[SaleItem]) -> bool:
+        """return the quantities of unpaid sale items to the stock entries they were taken from"""
+        raise NotImplementedError
+
+    async def release_sales(self, sale_ids: List[UUID]) -> Optional[int]:
+        """return every item of these sales to its stock entry in one statement, returns the units released"""
         raise NotImplementedError
\ No newline at end of file
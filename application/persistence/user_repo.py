@@ -1,5 +1,6 @@
 from abc import ABCMeta
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 from domain.models import User
 
@@ -9,26 +10,26 @@ class UserRepository(metaclass=ABCMeta):
         Default class for user repository implementation
     """
 
-    def create(self, user: User) -> Optional[User]:
+    async def create(self, user: User) -> Optional[User]:
         """Create user"""
         raise NotImplementedError
 
-    def create_admin(self, user: User) -> Optional[User]:
+    async def create_admin(self, user: User) -> Optional[User]:
         """Create admin user"""
         raise NotImplementedError
 
-    def update(self, user: User) -> Optional[User]:
+    async def update(self, user: User) -> Optional[User]:
         """Update user"""
         raise NotImplementedError
 
-    def get(self, id: UUID) -> Optional[User]:
+    async def get(self, id: UUID) -> Optional[User]:
         """Get user by Id"""
         raise NotImplementedError
 
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
         raise NotImplementedError
 
-    def list(self) -> List[User]:
-        """List user"""
+    async def list(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> Tuple[List[User], Optional[str]]:
+        """List a page of users and the next page cursor"""
         raise NotImplementedError
\ No newline at end of file
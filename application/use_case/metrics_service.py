@@ -0,0 +1,11 @@
+from abc import ABCMeta
+
+from application.use_case.models.base_response import BaseResponse
+
+
+class MetricsService(metaclass=ABCMeta):
+    """default metrics service implementation"""
+
+    async def get_metrics(self) -> BaseResponse:
+        """get runtime metrics"""
+        raise NotImplementedError
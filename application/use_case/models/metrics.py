@@ -0,0 +1,57 @@
+from typing import Dict
+from pydantic import BaseModel
+
+from application.use_case.models.base_response import BaseResponse
+
+
+class HistogramSnapshot(BaseModel):
+    buckets: Dict[str, int]
+    count: int
+    sum: float
+
+
+class DatabasePoolMetrics(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    connects: int
+    checkouts: int
+    checkins: int
+    invalidations: int
+    timeouts: int
+    wait_time_seconds: HistogramSnapshot
+
+
+class CacheMetrics(BaseModel):
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+class CircuitBreakerMetrics(BaseModel):
+    state: str
+    consecutive_failures: int
+    rejections: int
+    trips: int
+
+
+class SweeperMetrics(BaseModel):
+    runs: int
+    failures: int
+    sales_cancelled: int
+    units_released: int
+    last_run_seconds: float
+
+
+class MetricsReport(BaseResponse):
+    database_pool: DatabasePoolMetrics
+    replica_pool: DatabasePoolMetrics
+    caches: Dict[str, CacheMetrics]
+    circuit_breakers: Dict[str, CircuitBreakerMetrics]
+    sweepers: Dict[str, SweeperMetrics]
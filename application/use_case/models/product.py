@@ -31,4 +31,5 @@ class GetResponse(BaseResponse):
     stock_items: Optional[List[GetStockResponse]] = None
 
 class List(BaseResponse):
-    products: List[GetResponse]
\ No newline at end of file
+    products: List[GetResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
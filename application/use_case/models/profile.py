@@ -47,4 +47,5 @@ class UpdateResponse(BaseResponse):
 
 
 class ListResponse(BaseResponse):
-    profiles: List[CreateProfileResponse]
\ No newline at end of file
+    profiles: List[CreateProfileResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
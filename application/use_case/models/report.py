@@ -1,6 +1,8 @@
+import enum
+from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, Field, UUID4
 
 from application.use_case.models.base_response import BaseResponse
 
@@ -14,6 +16,8 @@ class ProfitLossReport(BaseResponse):
     total_revenue: Decimal
     total_cost: Decimal
     net_profit: Decimal
+    # part of total_revenue from items with no recorded cost, left out of net_profit
+    uncosted_revenue: Decimal = Decimal(0)
     period: str
 
 
@@ -39,4 +43,135 @@ class LowStockAlert(BaseModel):
     total_remaining_quantity: int
 
 class LowStockReport(BaseResponse):
-    alerts: List[LowStockAlert]
\ No newline at end of file
+    alerts: List[LowStockAlert]
+
+
+class TimeBucket(str, enum.Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class TimeSeriesPoint(BaseModel):
+    period_start: date
+    revenue: Decimal
+    cost: Decimal
+    orders: int
+    units: int
+    uncosted_revenue: Decimal = Decimal(0)
+
+
+class TimeSeriesReport(BaseResponse):
+    bucket: TimeBucket
+    start: date
+    end: date
+    points: List[TimeSeriesPoint]
+
+
+class ExportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class MarginBand(BaseModel):
+    lower_percent: float
+    upper_percent: float
+    units: int
+
+
+class ProductMargin(BaseModel):
+    product_id: UUID4
+    product_name: str
+    revenue: Decimal
+    cost: Decimal
+    # margin_percent only covers the revenue of items with a recorded cost
+    uncosted_revenue: Decimal = Decimal(0)
+    margin_percent: Optional[float] = None
+
+
+class MarginDistributionReport(BaseResponse):
+    start: date
+    end: date
+    median_margin_percent: Optional[float] = None
+    bands: List[MarginBand]
+    products: List[ProductMargin]
+
+
+class SellThrough(BaseModel):
+    product_id: UUID4
+    product_name: str
+    units_sold: int
+    units_on_hand: int
+    sell_through_percent: float
+    units_per_day: float
+    last_sold_at: Optional[datetime] = None
+
+
+class SellThroughReport(BaseResponse):
+    start: date
+    end: date
+    products: List[SellThrough]
+
+
+class AbcClass(str, enum.Enum):
+    A = "A"
+    B = "B"
+    C = "C"
+
+
+class AbcProduct(BaseModel):
+    product_id: UUID4
+    product_name: str
+    revenue: Decimal
+    revenue_share_percent: float
+    cumulative_share_percent: float
+    abc_class: AbcClass
+
+
+class AbcReport(BaseResponse):
+    start: date
+    end: date
+    products: List[AbcProduct]
+
+
+class InventoryValuation(BaseModel):
+    product_id: UUID4
+    product_name: str
+    units: int
+    cost_value: Decimal
+    retail_value: Decimal
+    potential_margin: Decimal
+
+
+class InventoryValuationReport(BaseResponse):
+    as_of: Optional[date] = None
+    total_units: int
+    total_cost_value: Decimal
+    total_retail_value: Decimal
+    total_potential_margin: Decimal
+    products: List[InventoryValuation]
+
+
+class ReorderSettings(BaseModel):
+    lead_time_days: Optional[int] = Field(None, ge=0)
+    cover_days: Optional[int] = Field(None, ge=0)
+    min_stock: Optional[int] = Field(None, ge=0)
+
+
+class ReorderForecast(BaseModel):
+    product_id: UUID4
+    product_name: str
+    units_on_hand: int
+    velocity_short: float
+    velocity_long: float
+    days_of_cover: Optional[float] = None
+    lead_time_days: int
+    cover_days: int
+    min_stock: int
+    reorder: bool
+    suggested_quantity: int
+
+
+class ReorderForecastReport(BaseResponse):
+    products: List[ReorderForecast]
+    next_cursor: Optional[str] = None
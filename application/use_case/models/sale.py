@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, UUID4
 from application.use_case.models.base_response import BaseResponse
 
@@ -10,10 +10,25 @@ class CreateSaleRequest(BaseModel):
     items: List[SaleItemRequest]
 
 class CreateSaleResponse(BaseResponse):
-    authorization_url: str
-    access_code: str
     reference: str
+    sale_id: Optional[UUID4] = None
+    payment_status: Optional[str] = None
+    authorization_url: Optional[str] = None
+    access_code: Optional[str] = None
+
+class PaymentStatusResponse(BaseResponse):
+    reference: str
+    payment_status: str
+    authorization_url: Optional[str] = None
+    access_code: Optional[str] = None
 
 class VerifySaleResponse(BaseResponse):
     sale_id: UUID4
-    payment_status: str
\ No newline at end of file
+    payment_status: str
+
+class PaymentEvent(BaseModel):
+    reference: str
+
+class ExpiredReservations(BaseModel):
+    sales: int = 0
+    units: int = 0
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+from application.use_case.models.base_response import BaseResponse
+
+
+class SnapshotTable(BaseModel):
+    table: str
+    rows: int
+    files: int
+    high_water_mark: Optional[datetime] = None
+
+
+class SnapshotReport(BaseResponse):
+    tables: List[SnapshotTable]
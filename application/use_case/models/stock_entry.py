@@ -31,4 +31,5 @@ class GetStockResponse(BaseResponse):
     added_date: str
 
 class ListStocks(BaseResponse):
-    stocks: List[GetStockResponse]
\ No newline at end of file
+    stocks: List[GetStockResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -30,4 +30,5 @@ class GetResponse(BaseResponse):
     role: str
 
 class ListUsers(BaseResponse):
-    users: List[UserResponse]
\ No newline at end of file
+    users: List[UserResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
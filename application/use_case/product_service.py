@@ -1,4 +1,5 @@
 from abc import ABCMeta
+from typing import Optional
 from uuid import UUID
 
 from application.use_case.models.base_response import BaseResponse
@@ -10,23 +11,23 @@ class ProductService(metaclass=ABCMeta):
         Default class for product service implementation
     """
 
-    def create(self, product: CreateProduct) -> BaseResponse:
+    async def create(self, product: CreateProduct) -> BaseResponse:
         """create product"""
         raise NotImplementedError
 
 
-    def update(self, name: str, product: UpdateProduct) -> BaseResponse:
+    async def update(self, name: str, product: UpdateProduct) -> BaseResponse:
         """update product"""
         raise NotImplementedError
 
-    def get(self, id: UUID) -> BaseResponse:
+    async def get(self, id: UUID) -> BaseResponse:
         """get product"""
         raise NotImplementedError
 
-    def get_by_name(self, name: str) -> BaseResponse:
+    async def get_by_name(self, name: str) -> BaseResponse:
         """get product by name"""
         raise NotImplementedError
 
-    def list(self) -> BaseResponse:
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
         """list product"""
         raise NotImplementedError
\ No newline at end of file
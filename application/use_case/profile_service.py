@@ -1,4 +1,5 @@
 from abc import ABCMeta
+from typing import Optional
 from uuid import UUID
 
 from application.use_case.models.base_response import BaseResponse
@@ -8,18 +9,18 @@ from application.use_case.models.profile import CreateProfile, Update
 class ProfileService(metaclass=ABCMeta):
     """Default class for profile service implementation"""
 
-    def create(self, user_id: str, profile: CreateProfile) -> BaseResponse:
+    async def create(self, user_id: str, profile: CreateProfile) -> BaseResponse:
         """create profile"""
         raise NotImplementedError
 
-    def update(self, profile: Update) -> BaseResponse:
+    async def update(self, profile: Update) -> BaseResponse:
         """update profile"""
         raise NotImplementedError
 
-    def get(self, user_id: UUID) -> BaseResponse:
+    async def get(self, user_id: UUID) -> BaseResponse:
         """get profile"""
         raise NotImplementedError
 
-    def list(self) -> BaseResponse:
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
         """list profiles"""
         raise NotImplementedError
\ No newline at end of file
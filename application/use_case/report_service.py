@@ -1,28 +1,63 @@
 from abc import ABCMeta, abstractmethod
-from typing import Optional
+from datetime import date
+from typing import AsyncIterator, Optional
+from uuid import UUID
 
 from application.use_case.models.base_response import BaseResponse
+from application.use_case.models.report import ExportFormat, ReorderSettings, TimeBucket
 
 
 class ReportService(metaclass=ABCMeta):
     """default report service implementation"""
 
-    def get_sales_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
+    async def get_sales_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
         """get sales report"""
         raise NotImplementedError
 
-    def get_profit_loss_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
+    async def get_profit_loss_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
         """get profit or loss report"""
         raise NotImplementedError
 
-    def get_sales_status_report(self) -> BaseResponse:
+    async def get_sales_status_report(self) -> BaseResponse:
         """get sales status report"""
         raise NotImplementedError
 
-    def get_product_performance_report(self) -> BaseResponse:
+    async def get_product_performance_report(self) -> BaseResponse:
         """get product performance report"""
         raise NotImplementedError
 
-    def get_low_stock_alerts(self, threshold: int) -> BaseResponse:
+    async def get_low_stock_alerts(self, threshold: int) -> BaseResponse:
         """get low stock alerts"""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def get_sales_timeseries(self, start: date, end: date, bucket: TimeBucket) -> BaseResponse:
+        """get sales time series report"""
+        raise NotImplementedError
+
+    def export_sales(self, start: date, end: date, format: ExportFormat) -> AsyncIterator[str]:
+        """stream sale lines for days in [start, end] as csv or ndjson text chunks"""
+        raise NotImplementedError
+
+    async def get_margin_distribution(self, start: date, end: date, band_width: float) -> BaseResponse:
+        """get units sold per margin band and margin per product for days in [start, end]"""
+        raise NotImplementedError
+
+    async def get_sell_through(self, start: date, end: date) -> BaseResponse:
+        """get units sold against units on hand per product for days in [start, end]"""
+        raise NotImplementedError
+
+    async def get_abc_classification(self, start: date, end: date) -> BaseResponse:
+        """get products ranked into A, B and C classes by revenue for days in [start, end]"""
+        raise NotImplementedError
+
+    async def get_inventory_valuation(self, as_of: Optional[date] = None) -> BaseResponse:
+        """get cost and retail value of stock on hand, now or at the end of as_of"""
+        raise NotImplementedError
+
+    async def get_reorder_forecast(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
+        """get a page of products with sales velocity, days of cover and suggested reorder quantity"""
+        raise NotImplementedError
+
+    async def update_reorder_settings(self, product_id: UUID, settings: ReorderSettings) -> BaseResponse:
+        """set lead time, cover days and minimum stock for one product"""
+        raise NotImplementedError
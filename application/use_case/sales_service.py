@@ -1,18 +1,43 @@
 from abc import ABCMeta
+from typing import Optional
 from uuid import UUID
 
 from application.use_case.models.base_response import BaseResponse
-from application.use_case.models.sale import CreateSaleRequest
+from application.use_case.models.sale import CreateSaleRequest, ExpiredReservations
 
 class SalesService(metaclass=ABCMeta):
     """
             Default class for sale service implementation
         """
 
-    def create(self, user_id: UUID, email: str, sale: CreateSaleRequest) -> BaseResponse:
-        """make a sale"""
+    async def create(self, user_id: UUID, email: str, sale: CreateSaleRequest, idempotency_key: Optional[str] = None) -> BaseResponse:
+        """make a sale, a repeated idempotency key gets the first response back instead of a second sale"""
         raise NotImplementedError
 
-    def verify_payment(self, reference: str) -> BaseResponse:
+    async def verify_payment(self, reference: str) -> BaseResponse:
         """verify payment"""
+        raise NotImplementedError
+
+    async def receive_webhook(self, body: bytes, signature: Optional[str]) -> BaseResponse:
+        """check a paystack webhook signature and finalize successful charges before acknowledging them"""
+        raise NotImplementedError
+
+    async def get_payment_status(self, user_id: UUID, reference: str) -> BaseResponse:
+        """where the gateway transaction of a sale is, with its checkout details once it is initialized"""
+        raise NotImplementedError
+
+    async def dispatch_payments(self, batch_size: int) -> int:
+        """initialize a batch of queued gateway transactions, returns how many were taken"""
+        raise NotImplementedError
+
+    async def expire_reservations(self, batch_size: int) -> ExpiredReservations:
+        """cancel unpaid sales older than the reservation time to live and return their stock"""
+        raise NotImplementedError
+
+    async def finalize_payment(self, reference: str, amount_in_kobo: Optional[int] = None) -> BaseResponse:
+        """mark a sale paid once the gateway confirmed it, repeated confirmations are no-ops"""
+        raise NotImplementedError
+
+    async def record_paid_sale(self, reference: str) -> bool:
+        """fold a finalized sale into the reorder forecast, the work queued after a payment"""
         raise NotImplementedError
\ No newline at end of file
@@ -0,0 +1,11 @@
+from abc import ABCMeta
+
+from application.use_case.models.base_response import BaseResponse
+
+
+class SnapshotService(metaclass=ABCMeta):
+    """default analytics snapshot service implementation"""
+
+    async def export(self) -> BaseResponse:
+        """write parquet files for rows changed since the last export"""
+        raise NotImplementedError
@@ -1,4 +1,5 @@
 from abc import ABCMeta
+from typing import Optional
 from uuid import UUID
 
 from application.use_case.models.base_response import BaseResponse
@@ -9,18 +10,18 @@ class StockEntryService(metaclass=ABCMeta):
     """
         Default class for stock entry service implementation
     """
-    def create(self, product_name: str, stock_entry: CreateStock) -> BaseResponse:
+    async def create(self, product_name: str, stock_entry: CreateStock) -> BaseResponse:
         """add stock to product"""
         raise NotImplementedError
 
-    def update(self,id: UUID, stock_entry: UpdateStock) -> BaseResponse:
+    async def update(self,id: UUID, stock_entry: UpdateStock) -> BaseResponse:
         """update stock in product"""
         raise NotImplementedError
 
-    def get(self, id: UUID) -> BaseResponse:
+    async def get(self, id: UUID) -> BaseResponse:
         """get stock of product"""
         raise NotImplementedError
 
-    def list(self) -> BaseResponse:
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
         """list stocks of all product"""
         raise NotImplementedError
@@ -1,4 +1,5 @@
 from abc import ABCMeta
+from typing import Optional
 from uuid import UUID
 from application.use_case.models.base_response import BaseResponse
 from application.use_case.models.user import CreateUser
@@ -9,22 +10,30 @@ class UserService(metaclass=ABCMeta):
         Default class for user service implementation
     """
 
-    def create(self, user: CreateUser) -> BaseResponse:
+    async def create(self, user: CreateUser) -> BaseResponse:
         """Create user"""
         raise NotImplementedError
 
-    def create_admin(self, user: CreateUser) -> BaseResponse:
+    async def create_admin(self, user: CreateUser) -> BaseResponse:
         """Create admin user"""
         raise NotImplementedError
 
-    def get(self, id: UUID) -> BaseResponse:
+    async def get(self, id: UUID) -> BaseResponse:
         """Get user by Id"""
         raise NotImplementedError
 
-    def get_by_email(self, email: str) -> BaseResponse:
+    async def get_role(self, id: UUID) -> Optional[str]:
+        """Role of an existing user, None when the user does not exist"""
+        raise NotImplementedError
+
+    def invalidate_user(self, id: UUID) -> None:
+        """Forget the cached role of a user whose role changed or who was removed"""
+        raise NotImplementedError
+
+    async def get_by_email(self, email: str) -> BaseResponse:
         """Get user by email"""
         raise NotImplementedError
 
-    def list(self) -> BaseResponse:
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
         """List user"""
         raise NotImplementedError
\ No newline at end of file
@@ -0,0 +1,6 @@
+import enum
+
+class OutboxStatus(enum.Enum):
+    Pending = "Pending"
+    Initialized = "Initialized"
+    Failed = "Failed"
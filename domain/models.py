@@ -5,13 +5,15 @@ from typing import List, Optional
 from uuid import UUID as UUID_T, uuid4
 
 from sqlalchemy import (
-    CHAR, Column, String, DateTime, Enum, ForeignKey, Table, Index, UniqueConstraint, func, Integer, Float, Boolean, Numeric
+    Column, String, Date, DateTime, Enum, ForeignKey, Table, Index, UniqueConstraint, func, Integer, BigInteger, Float, Double, Boolean, Numeric, Text
 )
 from sqlalchemy.dialects.mysql import DECIMAL
 from sqlalchemy.orm import (
     DeclarativeBase, Mapped, mapped_column, relationship, declarative_base
 )
+from domain.enums.outbox_status import OutboxStatus
 from domain.enums.role import Role as DomainRole
+from domain.types import BinaryUUID
 
 Base = declarative_base()
 
@@ -19,7 +21,7 @@ class BaseModel(Base):
     __abstract__ = True
     __tablename__: str = None
 
-    id: Mapped[UUID_T] = mapped_column(CHAR(36), primary_key=True, default=uuid4)
+    id: Mapped[UUID_T] = mapped_column(BinaryUUID(), primary_key=True, default=uuid4)
     created_by: Mapped[Optional[str]] = mapped_column(String(50))
     modified_by: Mapped[Optional[str]] = mapped_column(String(50))
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -27,6 +29,9 @@ class BaseModel(Base):
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
     email: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     username: Mapped[Optional[str]] = mapped_column(String(50))
@@ -39,12 +44,15 @@ class User(BaseModel):
 
 class Profile(BaseModel):
     __tablename__ = "profiles"
+    __table_args__ = (
+        Index("ix_profiles_created_at_id", "created_at", "id"),
+    )
 
     first_name: Mapped[str] = mapped_column(String(100))
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
     middle_name: Mapped[Optional[str]] = mapped_column(String(100))
     phone_number: Mapped[str] = mapped_column(String(50), nullable=False)
-    user_id: Mapped[UUID_T] = mapped_column(CHAR(36), ForeignKey("users.id"), unique=True, nullable=False)
+    user_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("users.id"), unique=True, nullable=False)
 
     user: Mapped[User] = relationship(back_populates="profile")
 
@@ -52,19 +60,27 @@ class Profile(BaseModel):
 
 class Product(BaseModel):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_created_at_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
     description: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
     image: Mapped[Optional[str]] = mapped_column(String(1000))
 
     stock_entries: Mapped[List["StockEntry"]] = relationship(
-        back_populates="product", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="product", cascade="all, delete-orphan", lazy="selectin", order_by="StockEntry.added_date"
     )
 
 class StockEntry(BaseModel):
     __tablename__ = "stock_entries"
+    __table_args__ = (
+        Index("ix_stock_entries_product_id_added_date", "product_id", "added_date", "remaining_quantity"),
+        Index("ix_stock_entries_created_at_id", "created_at", "id"),
+        Index("ix_stock_entries_modified_at", "modified_at"),
+    )
 
-    product_id: Mapped[UUID_T] = mapped_column(CHAR(36), ForeignKey("products.id"), nullable=False)
+    product_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("products.id"), nullable=False)
     cost_price: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
     selling_price: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -76,12 +92,20 @@ class StockEntry(BaseModel):
 
 class Sale(BaseModel):
     __tablename__ = "sales"
+    __table_args__ = (
+        Index("ix_sales_paid_sale_date", "paid", "sale_date", "total_amount"),
+        Index("ix_sales_sale_date_id", "sale_date", "id"),
+        Index("ix_sales_created_at_id", "created_at", "id"),
+        Index("ix_sales_modified_at", "modified_at"),
+        Index("ix_sales_paid_cancelled_at_sale_date", "paid", "cancelled_at", "sale_date"),
+    )
 
-    customer_id: Mapped[UUID_T] = mapped_column(CHAR(36), ForeignKey("users.id"), nullable=False)
+    customer_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("users.id"), nullable=False)
     sale_date: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     total_amount: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
     paid: Mapped[bool] = mapped_column(Boolean, nullable=False)
     payment_reference: Mapped[Optional[str]] = mapped_column(String(100), unique=True)
+    cancelled_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True))
 
     customer: Mapped["User"] = relationship("User", back_populates="sales")
     items: Mapped[List["SaleItem"]] = relationship("SaleItem", back_populates="sale", cascade="all, delete-orphan")
@@ -89,13 +113,98 @@ class Sale(BaseModel):
 
 class SaleItem(BaseModel):
     __tablename__ = "sale_items"
+    __table_args__ = (
+        Index("ix_sale_items_sale_id_cost_price", "sale_id", "product_id", "quantity", "sale_price", "cost_price"),
+        Index("ix_sale_items_product_id", "product_id", "quantity"),
+        Index("ix_sale_items_created_at_id", "created_at", "id"),
+        Index("ix_sale_items_modified_at", "modified_at"),
+    )
 
-    sale_id: Mapped[UUID_T] = mapped_column(CHAR(36), ForeignKey("sales.id"), nullable=False)
-    product_id: Mapped[UUID_T] = mapped_column(CHAR(36), ForeignKey("products.id"), nullable=False)
+    sale_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("sales.id"), nullable=False)
+    product_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("products.id"), nullable=False)
+    stock_entry_id: Mapped[Optional[UUID_T]] = mapped_column(BinaryUUID(), ForeignKey("stock_entries.id"), nullable=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     sale_price: Mapped[float] = mapped_column(DECIMAL(10, 2), nullable=False)
+    # NULL for items sold before costs were recorded when no batch could be matched, reports leave them out of cost and margin
+    cost_price: Mapped[Optional[float]] = mapped_column(DECIMAL(10, 2), nullable=True)
 
     sale: Mapped["Sale"] = relationship("Sale", back_populates="items")
     product: Mapped["Product"] = relationship("Product")
+    stock_entry: Mapped[Optional["StockEntry"]] = relationship("StockEntry")
+
+
+class DailySalesSummary(Base):
+    __tablename__ = "daily_sales_summary"
+
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    revenue: Mapped[float] = mapped_column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    cost: Mapped[float] = mapped_column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    # revenue from items with no recorded cost, counted in revenue but not in cost
+    uncosted_revenue: Mapped[float] = mapped_column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    units: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    paid_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    unpaid_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+
+class DailyProductSalesSummary(Base):
+    __tablename__ = "daily_product_sales_summary"
+    __table_args__ = (
+        Index("ix_daily_product_sales_summary_product_id", "product_id", "day", "units"),
+        Index("ix_daily_product_sales_summary_product_ordered", "product_id", "units_ordered"),
+    )
 
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    product_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("products.id"), primary_key=True)
+    revenue: Mapped[float] = mapped_column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    cost: Mapped[float] = mapped_column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    uncosted_revenue: Mapped[float] = mapped_column(DECIMAL(14, 2), nullable=False, default=0, server_default="0")
+    units: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # every unit on a sale made that day, paid or not, as the product performance report has always counted
+    units_ordered: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
+
+class ProductReorderForecast(Base):
+    __tablename__ = "product_reorder_forecast"
+
+    product_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("products.id"), primary_key=True)
+    velocity_short: Mapped[float] = mapped_column(Double, nullable=False, default=0, server_default="0")
+    velocity_long: Mapped[float] = mapped_column(Double, nullable=False, default=0, server_default="0")
+    velocity_updated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True))
+    lead_time_days: Mapped[Optional[int]] = mapped_column(Integer)
+    cover_days: Mapped[Optional[int]] = mapped_column(Integer)
+    min_stock: Mapped[Optional[int]] = mapped_column(Integer)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    user_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("users.id"), primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    response_status: Mapped[Optional[int]] = mapped_column(Integer)
+    response_body: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class PaymentOutbox(Base):
+    __tablename__ = "payment_outbox"
+    __table_args__ = (
+        Index("ix_payment_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    reference: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sale_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), nullable=False)
+    customer_id: Mapped[UUID_T] = mapped_column(BinaryUUID(), ForeignKey("users.id"), nullable=False)
+    email: Mapped[str] = mapped_column(String(100), nullable=False)
+    amount_in_kobo: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    status: Mapped[OutboxStatus] = mapped_column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.Pending)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(DateTime, nullable=False)
+    authorization_url: Mapped[Optional[str]] = mapped_column(String(500))
+    access_code: Mapped[Optional[str]] = mapped_column(String(100))
+    last_error: Mapped[Optional[str]] = mapped_column(String(255))
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    modified_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), onupdate=func.now())
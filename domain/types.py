@@ -0,0 +1,22 @@
+import uuid
+
+from sqlalchemy.types import BINARY, TypeDecorator
+
+
+class BinaryUUID(TypeDecorator):
+    """Stores UUIDs as BINARY(16) while the models keep working with uuid.UUID."""
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return uuid.UUID(bytes=bytes(value))
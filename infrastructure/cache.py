@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from dotenv import load_dotenv
+
+from infrastructure.metrics import Counter
+
+load_dotenv()
+
+PRODUCT_CACHE_TTL = float(os.getenv("PRODUCT_CACHE_TTL", "30"))
+PRODUCT_CACHE_MAX_SIZE = int(os.getenv("PRODUCT_CACHE_MAX_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+AUTH_USER_CACHE_MAX_SIZE = int(os.getenv("AUTH_USER_CACHE_MAX_SIZE", "10000"))
+
+MISSING = object()
+
+CACHES: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+        Bounded in-process cache: entries expire after ttl_seconds and the least
+        recently used entry is evicted once max_size is reached. It is per worker
+        process, so explicit invalidation only reaches the local copy and the TTL
+        bounds how stale other workers can be.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = Counter()
+        self.invalidations = Counter()
+        CACHES[name] = self
+
+    @property
+    def generation(self) -> int:
+        """read before loading a value and pass to set, so a load that raced an invalidation is dropped"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Any:
+        """returns MISSING when the key is absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses.inc()
+                return MISSING
+            self._entries.move_to_end(key)
+        self.hits.inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions.inc()
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+        self.invalidations.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+        self.invalidations.inc()
+
+    def snapshot(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "evictions": self.evictions.value,
+            "invalidations": self.invalidations.value,
+        }
+
+
+def cache_status() -> Dict[str, dict]:
+    return {name: cache.snapshot() for name, cache in CACHES.items()}
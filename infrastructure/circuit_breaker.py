@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Callable, Dict
+
+from infrastructure.metrics import Counter
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKERS: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitBreaker:
+    """
+        Opens after failure_threshold consecutive failures and rejects calls
+        until reset_timeout has passed, then lets a single trial call through:
+        success closes it again, failure reopens it for another timeout.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.rejections = Counter()
+        self.trips = Counter()
+        BREAKERS[name] = self
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """False while open; while half open only the first caller gets the trial call"""
+        state = self.state
+        with self._lock:
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+        self.rejections.inc()
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips.inc()
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "rejections": self.rejections.value,
+            "trips": self.trips.value,
+        }
+
+
+def breaker_status() -> Dict[str, dict]:
+    return {name: breaker.snapshot() for name, breaker in BREAKERS.items()}
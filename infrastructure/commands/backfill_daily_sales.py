@@ -0,0 +1,53 @@
+"""
+    Rebuilds daily_sales_summary and daily_product_sales_summary from the sales tables.
+
+    python -m infrastructure.commands.backfill_daily_sales [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--days 31]
+
+    Each chunk of days is replaced in its own transaction, so the command can be
+    rerun safely and live sales keep being counted while it runs.
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+
+from infrastructure.database import engine
+from infrastructure.dependency import Container, unit_of_work_scope
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(start: datetime.date = None, end: datetime.date = None, days: int = 31) -> bool:
+    async with unit_of_work_scope():
+        start = start or await Container.sales_summary_repository().first_sale_date()
+    if start is None:
+        logger.info("no sales to summarize")
+        return True
+    end = end or datetime.date.today() + datetime.timedelta(days=1)
+
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + datetime.timedelta(days=days), end)
+        async with unit_of_work_scope():
+            if not await Container.sales_summary_repository().rebuild(chunk_start, chunk_end):
+                logger.error(f"backfill stopped at {chunk_start}")
+                return False
+        logger.info(f"summarized sales from {chunk_start} to {chunk_end}")
+        chunk_start = chunk_end
+    return True
+
+
+async def main(args: argparse.Namespace) -> bool:
+    try:
+        return await backfill(start=args.start, end=args.end, days=args.days)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="rebuild the daily sales rollup from sales history")
+    parser.add_argument("--start", type=datetime.date.fromisoformat, help="first day to rebuild, defaults to the first sale")
+    parser.add_argument("--end", type=datetime.date.fromisoformat, help="day after the last one to rebuild, defaults to tomorrow")
+    parser.add_argument("--days", type=int, default=31, help="days rebuilt per transaction")
+    raise SystemExit(0 if asyncio.run(main(parser.parse_args())) else 1)
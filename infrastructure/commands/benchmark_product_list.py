@@ -0,0 +1,172 @@
+"""
+    Times the product list path over a generated catalog: ORM hydration with a
+    validated model per product and stock row, against the column projection
+    of list_rows with the page validated once by ProductService.list. The
+    payload build is also timed alone, over rows already fetched, since the
+    database round trips dominate the end to end numbers on small pages.
+
+    BENCHMARK_DATABASE_URL=sqlite+aiosqlite:///bench.db python -m infrastructure.commands.benchmark_product_list
+
+    The database at BENCHMARK_DATABASE_URL is dropped and recreated, never
+    point it at a real one.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from application.use_case.models.product import GetResponse, List
+from application.use_case.models.stock_entry import GetStockResponse
+from domain.models import Base, Product, StockEntry
+from infrastructure.cache import TTLCache
+from infrastructure.pagination import MAX_PAGE_SIZE, decode_cursor
+from infrastructure.persistence.product_repo import ProductRepository
+from infrastructure.unit_of_work import UnitOfWork
+from infrastructure.use_case.product_service import ProductService
+
+BENCHMARK_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL", "sqlite+aiosqlite:///benchmark_product_list.db")
+BENCHMARK_PRODUCTS = int(os.getenv("BENCHMARK_PRODUCTS", "50000"))
+BENCHMARK_STOCKS_PER_PRODUCT = int(os.getenv("BENCHMARK_STOCKS_PER_PRODUCT", "2"))
+BENCHMARK_ROUNDS = int(os.getenv("BENCHMARK_ROUNDS", "3"))
+
+logger = logging.getLogger(__name__)
+
+
+async def seed(engine) -> None:
+    rng = random.Random(7)
+    now = datetime.datetime.now()
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        for start in range(0, BENCHMARK_PRODUCTS, 5000):
+            products, stocks = [], []
+            for n in range(start, min(start + 5000, BENCHMARK_PRODUCTS)):
+                product_id = uuid.uuid4()
+                products.append({"id": product_id, "name": f"product {n}", "description": f"description {n}", "image": f"uploads/{n}.png",
+                                 "created_at": now - datetime.timedelta(seconds=n)})
+                for m in range(BENCHMARK_STOCKS_PER_PRODUCT):
+                    cost = Decimal(rng.randint(100, 500))
+                    stocks.append({"id": uuid.uuid4(), "product_id": product_id, "cost_price": cost, "selling_price": cost * Decimal("1.3"),
+                                   "quantity": 100, "remaining_quantity": rng.randint(0, 100), "added_date": now - datetime.timedelta(days=m)})
+            await connection.execute(Product.__table__.insert(), products)
+            await connection.execute(StockEntry.__table__.insert(), stocks)
+
+
+async def list_through_orm(repository: ProductRepository, limit: int, cursor):
+    """the list path before projections: ORM products, a validated model per row"""
+    products, next_cursor = await repository.list(limit=limit, after=decode_cursor(cursor) if cursor else None)
+    products_dbs = []
+    for product in products:
+        stock_items = []
+        remaining_quantity = 0
+        for stock in product.stock_entries:
+            remaining_quantity +=stock.remaining_quantity
+            stock_items.append(GetStockResponse(status=True, quantity=stock.quantity, cost_price=stock.cost_price, selling_price=stock.selling_price,
+                                                added_date=str(stock.added_date), remaining_quantity=remaining_quantity))
+        products_dbs.append(GetResponse(status=True, id=product.id, name=product.name, description=product.description, stock_items=stock_items, image=product.image))
+    return List(status=True, products=products_dbs, next_cursor=next_cursor)
+
+
+async def list_through_rows(service: ProductService, cache: TTLCache, limit: int, cursor):
+    cache.clear()
+    return await service.list(limit=limit, cursor=cursor)
+
+
+class FetchedRows:
+    """stands in for the repository with pages list_rows already returned, so only the payload build is timed"""
+
+    def __init__(self, pages):
+        self._pages = pages
+
+    async def list_rows(self, limit: int, after=None):
+        return self._pages[after]
+
+
+def build_per_row(pages) -> None:
+    for products, next_cursor in pages.values():
+        products_dbs = []
+        for product, stocks in products:
+            stock_items = []
+            remaining_quantity = 0
+            for stock in stocks:
+                remaining_quantity +=stock.remaining_quantity
+                stock_items.append(GetStockResponse(status=True, quantity=stock.quantity, cost_price=stock.cost_price, selling_price=stock.selling_price,
+                                                    added_date=str(stock.added_date), remaining_quantity=remaining_quantity))
+            products_dbs.append(GetResponse(status=True, id=product.id, name=product.name, description=product.description, stock_items=stock_items, image=product.image))
+        List(status=True, products=products_dbs, next_cursor=next_cursor)
+
+
+async def walk(unit_of_work: UnitOfWork, list_page) -> float:
+    """seconds to page through the whole catalog, each page in its own session like a request"""
+    started = time.perf_counter()
+    cursor, pages = None, 0
+    while True:
+        response = await list_page(MAX_PAGE_SIZE, cursor)
+        await unit_of_work.close()
+        pages += 1
+        cursor = response.next_cursor
+        if cursor is None:
+            break
+    assert pages == -(-BENCHMARK_PRODUCTS // MAX_PAGE_SIZE), f"walked {pages} pages"
+    return time.perf_counter() - started
+
+
+async def main() -> bool:
+    engine = create_async_engine(BENCHMARK_DATABASE_URL)
+    try:
+        logger.info(f"seeding {BENCHMARK_PRODUCTS} products with {BENCHMARK_STOCKS_PER_PRODUCT} stock entries each")
+        await seed(engine)
+        unit_of_work = UnitOfWork(async_sessionmaker(bind=engine, expire_on_commit=False))
+        # the repository and service log every page, keep that out of the timings
+        quiet = logging.getLogger(f"{__name__}.app")
+        quiet.setLevel(logging.WARNING)
+        repository = ProductRepository(quiet, unit_of_work)
+        cache = TTLCache(name="benchmark", max_size=1, ttl_seconds=60)
+        service = ProductService(quiet, repository, cache)
+
+        runs = {
+            "orm": lambda limit, cursor: list_through_orm(repository, limit, cursor),
+            "rows": lambda limit, cursor: list_through_rows(service, cache, limit, cursor),
+        }
+        for name, list_page in runs.items():
+            best = min([await walk(unit_of_work, list_page) for _ in range(BENCHMARK_ROUNDS)])
+            logger.info(f"{name}: {best:.2f}s for {BENCHMARK_PRODUCTS} products, best of {BENCHMARK_ROUNDS}")
+
+        # every page fetched once, keyed by the cursor that asks for it
+        pages, cursors, cursor = {}, [None], None
+        while True:
+            after = decode_cursor(cursor) if cursor else None
+            pages[after] = await repository.list_rows(limit=MAX_PAGE_SIZE, after=after)
+            cursor = pages[after][1]
+            if cursor is None:
+                break
+            cursors.append(cursor)
+        await unit_of_work.close()
+        fetched = ProductService(quiet, FetchedRows(pages), cache)
+
+        timings = {"build per row": [], "build page": []}
+        for _ in range(BENCHMARK_ROUNDS):
+            started = time.perf_counter()
+            build_per_row(pages)
+            timings["build per row"].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            for cursor in cursors:
+                cache.clear()
+                await fetched.list(limit=MAX_PAGE_SIZE, cursor=cursor)
+            timings["build page"].append(time.perf_counter() - started)
+        for name, runs in timings.items():
+            logger.info(f"{name}: {min(runs):.2f}s for {BENCHMARK_PRODUCTS} products, best of {BENCHMARK_ROUNDS}")
+        return True
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,46 @@
+"""
+    Runs every report and rollup query once, then EXPLAINs what it sent to
+    MySQL and fails when a query reads one of the large tables without an index.
+
+    python -m infrastructure.commands.explain_report_queries
+
+    Use it after changing a report query or dropping an index. The rollup
+    rebuild it exercises is rolled back, nothing is written.
+"""
+import asyncio
+import datetime
+import logging
+
+from infrastructure.database import engine, replica_engine
+from infrastructure.dependency import Container, unit_of_work_scope
+from infrastructure.query_plans import StatementCapture, explain, run_report_queries
+from infrastructure.use_case.report_service import LOW_STOCK_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> bool:
+    with StatementCapture(engine, replica_engine) as capture:
+        async with unit_of_work_scope() as unit_of_work:
+            await run_report_queries(capture, Container.report_repository(), Container.sales_summary_repository(), unit_of_work, LOW_STOCK_THRESHOLD, datetime.date.today())
+
+    try:
+        async with engine.connect() as connection:
+            plans = await explain(connection, capture.statements)
+    finally:
+        await replica_engine.dispose()
+        await engine.dispose()
+
+    ok = True
+    for label, row in plans:
+        if row["key"] is None:
+            ok = False
+            logger.error(f"{label}: {row['table']} is read without an index ({row['type']}, {row['rows']} rows)")
+        else:
+            logger.info(f"{label}: {row['table']} uses {row['key']} ({row['type']})")
+    return ok
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(0 if asyncio.run(main()) else 1)
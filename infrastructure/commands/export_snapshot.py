@@ -0,0 +1,34 @@
+"""
+    Writes parquet snapshots of sales, sale_items and stock_entries for offline analytics.
+
+    python -m infrastructure.commands.export_snapshot
+
+    Only rows created or modified since the previous run are exported, the
+    high-water mark per table lives in <SNAPSHOT_DIR>/_state.json.
+"""
+import asyncio
+import logging
+
+from infrastructure.database import engine, replica_engine
+from infrastructure.dependency import Container
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> bool:
+    try:
+        response = await Container.snapshot_service().export()
+        if not response.status:
+            logger.error(response.message)
+            return False
+        for table in response.tables:
+            logger.info(f"{table.table}: {table.rows} rows in {table.files} files, exported up to {table.high_water_mark}")
+        return True
+    finally:
+        await replica_engine.dispose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(0 if asyncio.run(main()) else 1)
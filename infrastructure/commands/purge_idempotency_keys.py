@@ -0,0 +1,33 @@
+"""
+    Deletes idempotency keys older than IDEMPOTENCY_KEY_TTL_SECONDS.
+
+    python -m infrastructure.commands.purge_idempotency_keys
+
+    Expired keys are already ignored when a request reuses them, this only
+    keeps the table small; run it from cron as often as you like.
+"""
+import asyncio
+import logging
+import os
+
+from infrastructure.database import engine
+from infrastructure.dependency import Container, unit_of_work_scope
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+
+
+async def main() -> int:
+    try:
+        async with unit_of_work_scope():
+            deleted = await Container.idempotency_repository().purge_expired(PURGE_BATCH_SIZE)
+        logger.info(f"purged {deleted} idempotency keys")
+        return deleted
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
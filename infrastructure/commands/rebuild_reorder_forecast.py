@@ -0,0 +1,31 @@
+"""
+    Recomputes every product's sales velocity from the daily product rollup.
+
+    python -m infrastructure.commands.rebuild_reorder_forecast
+
+    Run it once after the forecast table is created, and again after a rollup
+    backfill; per-product reorder settings are left as they are.
+"""
+import asyncio
+import logging
+
+from infrastructure.database import engine
+from infrastructure.dependency import Container, unit_of_work_scope
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> bool:
+    try:
+        async with unit_of_work_scope():
+            if not await Container.reorder_forecast_repository().rebuild():
+                return False
+        logger.info("reorder forecast rebuilt")
+        return True
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(0 if asyncio.run(main()) else 1)
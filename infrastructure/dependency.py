@@ -1,54 +1,131 @@
 from dependency_injector import containers, providers
+from application.persistence.analytics_repo import AnalyticsRepository as DefaultAnalyticsRepository
+from application.persistence.idempotency_repo import IdempotencyRepository as DefaultIdempotencyRepository
+from application.persistence.payment_outbox_repo import PaymentOutboxRepository as DefaultPaymentOutboxRepository
+from application.persistence.reorder_forecast_repo import ReorderForecastRepository as DefaultReorderForecastRepository
 from application.persistence.report_repo import ReportRepository as DefaultReportRepository
+from application.persistence.sales_export_repo import SalesExportRepository as DefaultSalesExportRepository
 from application.persistence.sales_repo import SalesRepository as DefaultSalesRepository
+from application.persistence.sales_summary_repo import SalesSummaryRepository as DefaultSalesSummaryRepository
+from application.persistence.snapshot_repo import SnapshotRepository as DefaultSnapshotRepository
 from application.persistence.user_repo import UserRepository as DefaultUserRepository
 from application.persistence.profile_repo import ProfileRepository as DefaultProfileRepository
 from application.persistence.product_repo import ProductRepository as DefaultProductRepository
 from application.persistence.stock_entry import StockEntryRepository as DefaultStockEntryRepository
+from application.use_case.models.sale import ExpiredReservations, PaymentEvent
+from application.use_case.metrics_service import MetricsService as DefaultMetricsService
 from application.use_case.report_service import ReportService as DefaultReportService
 from application.use_case.sales_service import SalesService as DefaultSalesService
+from application.use_case.snapshot_service import SnapshotService as DefaultSnapshotService
 from application.use_case.product_service import ProductService as DefaultProductService
 from application.use_case.user_service import UserService as DefaultUserService
 from application.use_case.profile_service import ProfileService as DefaultProfileService
 from application.use_case.stock_entry import StockEntryService as DefaultStockEntryService
+from infrastructure.cache import TTLCache, AUTH_USER_CACHE_MAX_SIZE, AUTH_USER_CACHE_TTL, PRODUCT_CACHE_MAX_SIZE, PRODUCT_CACHE_TTL
+from infrastructure.database import AsyncSessionLocal, replica_engine
 from infrastructure.payment import PaystackService
+from infrastructure.payment_events import PaymentEventQueue
+from infrastructure.payment_outbox import PaymentOutboxDispatcher
+from infrastructure.reservation_sweeper import ReservationSweeper
+from infrastructure.unit_of_work import UnitOfWork
+from infrastructure.persistence.analytics_repo import AnalyticsRepository as AnalyticsRepository
+from infrastructure.persistence.idempotency_repo import IdempotencyRepository as IdempotencyRepository
+from infrastructure.persistence.payment_outbox_repo import PaymentOutboxRepository as PaymentOutboxRepository
+from infrastructure.persistence.reorder_forecast_repo import ReorderForecastRepository as ReorderForecastRepository
 from infrastructure.persistence.report_repo import ReportRepository as ReportRepository
+from infrastructure.persistence.sales_export_repo import SalesExportRepository as SalesExportRepository
 from infrastructure.persistence.sales_repo import SalesRepository as SalesRepository
+from infrastructure.persistence.sales_summary_repo import SalesSummaryRepository as SalesSummaryRepository
+from infrastructure.persistence.snapshot_repo import SnapshotRepository as SnapshotRepository
 from infrastructure.persistence.user_repo import UserRepository as UserRepository
 from infrastructure.persistence.profile_repo import ProfileRepository as ProfileRepository
 from infrastructure.persistence.product_repo import ProductRepository as ProductRepository
 from infrastructure.persistence.stock_entry import StockEntryRepository as StockEntryRepository
+from infrastructure.use_case.metrics_service import MetricsService as MetricsService
 from infrastructure.use_case.report_service import ReportService as ReportService
 from infrastructure.use_case.Sales_service import SaleService as SalesService
+from infrastructure.use_case.snapshot_service import SnapshotService as SnapshotService
 from infrastructure.use_case.product_service import ProductService as ProductService
 from infrastructure.use_case.user_service import UserService as UserService
 from infrastructure.use_case.profile_service import ProfileService as ProfileService
 from infrastructure.use_case.stock_entry import StockEntryService as StockEntryService
 
 
-from typing import Callable
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
 import logging
+import os
 logger = logging.getLogger(__name__)
 
+PAYMENT_OUTBOX_BATCH_SIZE = int(os.getenv("PAYMENT_OUTBOX_BATCH_SIZE", "50"))
+RESERVATION_SWEEP_BATCH_SIZE = int(os.getenv("RESERVATION_SWEEP_BATCH_SIZE", "500"))
+
 class Container(containers.DeclarativeContainer):
     config = providers.Configuration()
 
-    user_repo: Callable[[], DefaultUserRepository] = providers.Factory(UserRepository, logger=logger)
-    user_service: Callable[[], DefaultUserService ] = providers.Factory(UserService, logger=logger, user_repo=user_repo)
+    unit_of_work: Callable[[], UnitOfWork] = providers.ContextLocalSingleton(UnitOfWork, session_factory=AsyncSessionLocal)
+    product_cache: Callable[[], TTLCache] = providers.Singleton(TTLCache, name="product", max_size=PRODUCT_CACHE_MAX_SIZE, ttl_seconds=PRODUCT_CACHE_TTL)
+    auth_user_cache: Callable[[], TTLCache] = providers.Singleton(TTLCache, name="auth_user", max_size=AUTH_USER_CACHE_MAX_SIZE, ttl_seconds=AUTH_USER_CACHE_TTL)
+
+    user_repo: Callable[[], DefaultUserRepository] = providers.Factory(UserRepository, logger=logger, unit_of_work=unit_of_work)
+    user_service: Callable[[], DefaultUserService ] = providers.Factory(UserService, logger=logger, user_repo=user_repo, auth_user_cache=auth_user_cache)
 
-    profile_repository: Callable[[], DefaultProfileRepository] = providers.Factory(ProfileRepository, logger=logger)
+    profile_repository: Callable[[], DefaultProfileRepository] = providers.Factory(ProfileRepository, logger=logger, unit_of_work=unit_of_work)
     profile_service: Callable[[], DefaultProfileService] = providers.Factory(ProfileService, logger=logger, profile_repository=profile_repository)
 
-    product_repository: Callable[[], DefaultProductRepository] = providers.Factory(ProductRepository, logger=logger)
-    product_service: Callable[[], DefaultProductService] = providers.Factory(ProductService, logger=logger, product_repository=product_repository)
+    product_repository: Callable[[], DefaultProductRepository] = providers.Factory(ProductRepository, logger=logger, unit_of_work=unit_of_work)
+    product_service: Callable[[], DefaultProductService] = providers.Factory(ProductService, logger=logger, product_repository=product_repository, product_cache=product_cache)
+
+    stock_entry_repository: Callable[[], DefaultStockEntryRepository] = providers.Factory(StockEntryRepository, logger=logger, unit_of_work=unit_of_work)
+    stock_entry_service: Callable[[], DefaultStockEntryService] = providers.Factory(StockEntryService, logger=logger, stock_entry_repository=stock_entry_repository, product_repository=product_repository, product_cache=product_cache)
+
+    paystack_service: Callable[[], PaystackService] = providers.Singleton(PaystackService, logger=logger)
+    payment_event_queue: Callable[[], PaymentEventQueue] = providers.Singleton(PaymentEventQueue, logger=logger)
+    payment_dispatcher: Callable[[], PaymentOutboxDispatcher] = providers.Singleton(PaymentOutboxDispatcher, logger=logger)
+    reservation_sweeper: Callable[[], ReservationSweeper] = providers.Singleton(ReservationSweeper, logger=logger)
+
+    sales_repository: Callable[[], DefaultSalesRepository] = providers.Factory(SalesRepository, logger=logger, unit_of_work=unit_of_work)
+    sales_summary_repository: Callable[[], DefaultSalesSummaryRepository] = providers.Factory(SalesSummaryRepository, logger=logger, unit_of_work=unit_of_work)
+    reorder_forecast_repository: Callable[[], DefaultReorderForecastRepository] = providers.Factory(ReorderForecastRepository, logger=logger, unit_of_work=unit_of_work)
+    idempotency_repository: Callable[[], DefaultIdempotencyRepository] = providers.Factory(IdempotencyRepository, logger=logger, unit_of_work=unit_of_work)
+    payment_outbox_repository: Callable[[], DefaultPaymentOutboxRepository] = providers.Factory(PaymentOutboxRepository, logger=logger, unit_of_work=unit_of_work)
+    sales_service: Callable[[], DefaultSalesService] = providers.Factory(SalesService, logger=logger, unit_of_work=unit_of_work, sale_repository=sales_repository, stock_repository= stock_entry_repository, product_repository=product_repository, sales_summary_repository=sales_summary_repository, reorder_forecast_repository=reorder_forecast_repository, idempotency_repository=idempotency_repository, payment_outbox_repository=payment_outbox_repository, paystack_service=paystack_service, payment_event_queue=payment_event_queue, payment_dispatcher=payment_dispatcher, product_cache=product_cache)
+
+    report_repository: Callable[[], DefaultReportRepository] = providers.Factory(ReportRepository, logger=logger, unit_of_work=unit_of_work)
+    sales_export_repository: Callable[[], DefaultSalesExportRepository] = providers.Factory(SalesExportRepository, logger=logger, engine=replica_engine)
+    analytics_repository: Callable[[], DefaultAnalyticsRepository] = providers.Factory(AnalyticsRepository, logger=logger, unit_of_work=unit_of_work)
+    report_service: Callable[[], DefaultReportService] = providers.Factory(ReportService, logger=logger, report_repository=report_repository, sales_export_repository=sales_export_repository, analytics_repository=analytics_repository, reorder_forecast_repository=reorder_forecast_repository)
+
+    snapshot_repository: Callable[[], DefaultSnapshotRepository] = providers.Factory(SnapshotRepository, logger=logger, engine=replica_engine)
+    snapshot_service: Callable[[], DefaultSnapshotService] = providers.Factory(SnapshotService, logger=logger, snapshot_repository=snapshot_repository)
+
+    metrics_service: Callable[[], DefaultMetricsService] = providers.Factory(MetricsService, logger=logger)
+
+
+@asynccontextmanager
+async def unit_of_work_scope() -> AsyncIterator[UnitOfWork]:
+    """binds one unit of work to the current context (a request or a background job) and closes it afterwards"""
+    unit_of_work = Container.unit_of_work()
+    try:
+        yield unit_of_work
+    finally:
+        await unit_of_work.close()
+        Container.unit_of_work.reset()
+
+
+async def handle_payment_event(event: PaymentEvent) -> None:
+    """runs the work that follows one finalized payment in its own unit of work, like a request would"""
+    async with unit_of_work_scope():
+        await Container.sales_service().record_paid_sale(event.reference)
 
-    stock_entry_repository: Callable[[], DefaultStockEntryRepository] = providers.Factory(StockEntryRepository, logger=logger)
-    stock_entry_service: Callable[[], DefaultStockEntryService] = providers.Factory(StockEntryService, logger=logger, stock_entry_repository=stock_entry_repository, product_repository=product_repository)
 
-    paystack_service: Callable[[], PaystackService] = providers.Factory(PaystackService, logger=logger)
+async def dispatch_payment_outbox() -> int:
+    """initializes one batch of queued payments in its own unit of work"""
+    async with unit_of_work_scope():
+        return await Container.sales_service().dispatch_payments(PAYMENT_OUTBOX_BATCH_SIZE)
 
-    sales_repository: Callable[[], DefaultSalesRepository] = providers.Factory(SalesRepository, logger=logger)
-    sales_service: Callable[[], DefaultSalesService] = providers.Factory(SalesService, logger=logger, sale_repository=sales_repository, stock_repository= stock_entry_repository, product_repository=product_repository, paystack_service=paystack_service)
 
-    report_repository: Callable[[], DefaultReportRepository] = providers.Factory(ReportRepository, logger=logger)
-    report_service: Callable[[], DefaultReportService] = providers.Factory(ReportService, logger=logger, report_repository=report_repository)
\ No newline at end of file
+async def sweep_expired_reservations() -> ExpiredReservations:
+    """cancels expired unpaid sales in its own unit of work"""
+    async with unit_of_work_scope():
+        return await Container.sales_service().expire_reservations(RESERVATION_SWEEP_BATCH_SIZE)
@@ -0,0 +1,48 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+
+class Counter:
+    """Monotonic counter that is safe to bump from pool and worker threads."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Fixed-bucket histogram, reported cumulatively like a prometheus histogram."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self._buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect_left(self._buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        buckets = {}
+        running = 0
+        for bound, bucket_count in zip(self._buckets, counts):
+            running += bucket_count
+            buckets[f"le_{bound}"] = running
+        buckets["le_inf"] = running + counts[-1]
+        return {"buckets": buckets, "count": count, "sum": total}
@@ -0,0 +1,46 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+Cursor = Tuple[datetime.datetime, UUID]
+
+
+def encode_cursor(created_at: datetime.datetime, id: UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), UUID(str(id)).hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """raises ValueError when the cursor was not produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.datetime.fromisoformat(created_at), UUID(hex=id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid cursor {cursor!r}") from e
+
+
+def paginate(statement: Select, model: Any, limit: int, after: Optional[Cursor] = None) -> Select:
+    """orders by (created_at, id) and seeks past the cursor, fetching one extra row to detect a next page"""
+    if after:
+        created_at, id = after
+        statement = statement.where(or_(
+            model.created_at > created_at,
+            and_(model.created_at == created_at, model.id > id),
+        ))
+    return statement.order_by(model.created_at, model.id).limit(limit + 1)
+
+
+def next_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
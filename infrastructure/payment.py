@@ -1,47 +1,142 @@
+import asyncio
+import hashlib
+import hmac
 import os
+import random
+import time
 from logging import Logger
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List
 
 import httpx
 
+from infrastructure.circuit_breaker import CircuitBreaker
+
+PAYSTACK_BASE_URL = os.getenv("PAYSTACK_BASE_URL", "https://api.paystack.co")
+PAYSTACK_CONNECT_TIMEOUT = float(os.getenv("PAYSTACK_CONNECT_TIMEOUT", "3"))
+PAYSTACK_READ_TIMEOUT = float(os.getenv("PAYSTACK_READ_TIMEOUT", "10"))
+PAYSTACK_MAX_CONNECTIONS = int(os.getenv("PAYSTACK_MAX_CONNECTIONS", "20"))
+PAYSTACK_MAX_RETRIES = int(os.getenv("PAYSTACK_MAX_RETRIES", "2"))
+PAYSTACK_RETRY_BASE_DELAY = float(os.getenv("PAYSTACK_RETRY_BASE_DELAY", "0.2"))
+PAYSTACK_BREAKER_THRESHOLD = int(os.getenv("PAYSTACK_BREAKER_THRESHOLD", "5"))
+PAYSTACK_BREAKER_RESET = float(os.getenv("PAYSTACK_BREAKER_RESET", "30"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# clients opened by PaystackService, so shutdown can close them without building the service
+OPEN_CLIENTS: List[httpx.AsyncClient] = []
+
+
+async def close_clients() -> None:
+    while OPEN_CLIENTS:
+        await OPEN_CLIENTS.pop().aclose()
+
+
+class DuplicateReference(Exception):
+    """the gateway already has a transaction under this reference, an earlier attempt reached it"""
+
 
 class PaystackService:
-    def __init__(self, logger: Logger):
+    """
+        One pooled AsyncClient per process, so checkouts reuse warm TLS
+        connections. Verification is a GET and is retried with jittered
+        backoff; initialization is only retried when the request never
+        reached the gateway, because a replayed reference is rejected.
+    """
+
+    def __init__(self, logger: Logger, transport: Optional[httpx.AsyncBaseTransport] = None, clock: Callable[[], float] = time.monotonic):
         self._logger = logger
         self.secret_key = os.getenv("PAYSTACK_SECRET_KEY")
-        self.base_url = "https://api.paystack.co"
+        self.base_url = PAYSTACK_BASE_URL
         if not self.secret_key:
             self._logger.critical("PAYSTACK_SECRET_KEY is not set in the environment.")
             raise ValueError("PAYSTACK_SECRET_KEY is not set.")
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.secret_key}"},
+            timeout=httpx.Timeout(PAYSTACK_READ_TIMEOUT, connect=PAYSTACK_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=PAYSTACK_MAX_CONNECTIONS, max_keepalive_connections=PAYSTACK_MAX_CONNECTIONS),
+            transport=transport,
+        )
+        OPEN_CLIENTS.append(self._client)
+        self._breaker = CircuitBreaker("paystack", failure_threshold=PAYSTACK_BREAKER_THRESHOLD, reset_timeout=PAYSTACK_BREAKER_RESET, clock=clock)
+
+    async def aclose(self) -> None:
+        if self._client in OPEN_CLIENTS:
+            OPEN_CLIENTS.remove(self._client)
+        await self._client.aclose()
+
+    def verify_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        """webhooks are signed with HMAC-SHA512 of the raw body under the secret key"""
+        if not signature:
+            return False
+        expected = hmac.new(self.secret_key.encode(), body, hashlib.sha512).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    async def _request(self, method: str, url: str, idempotent: bool, **kwargs) -> Optional[httpx.Response]:
+        """returns None when the gateway could not be reached or kept failing, a 4xx response is returned as is"""
+        for attempt in range(PAYSTACK_MAX_RETRIES + 1):
+            if not self._breaker.allow():
+                self._logger.error(f"Paystack circuit is open, not calling {url}")
+                return None
+            recorded = False
+            try:
+                response = await self._client.request(method, url, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS:
+                    self._breaker.record_success()
+                    recorded = True
+                    return response
+                self._breaker.record_failure()
+                recorded = True
+                self._logger.warning(f"Paystack returned {response.status_code} for {url} on attempt {attempt + 1}")
+                # a 429 was turned away before processing, any other error may already have been acted on
+                if attempt == PAYSTACK_MAX_RETRIES or not (idempotent or response.status_code == 429):
+                    return response
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                # the request was never sent, so even a non-idempotent call can go again
+                self._breaker.record_failure()
+                recorded = True
+                self._logger.warning(f"Paystack unreachable for {url} on attempt {attempt + 1}: {e!r}")
+            except httpx.TransportError as e:
+                self._breaker.record_failure()
+                recorded = True
+                self._logger.warning(f"Paystack transport error for {url} on attempt {attempt + 1}: {e!r}")
+                if not idempotent:
+                    return None
+            finally:
+                if not recorded:
+                    # cancelled mid-call, count it so a half open trial is never left hanging
+                    self._breaker.record_failure()
+            if attempt < PAYSTACK_MAX_RETRIES:
+                # full jitter keeps workers that failed together from retrying in lockstep
+                await asyncio.sleep(random.uniform(0, PAYSTACK_RETRY_BASE_DELAY * 2 ** attempt))
+        return None
 
-    def initialize_transaction(self, email: str, amount_in_kobo: int) -> Optional[Dict[str, Any]]:
+    async def initialize_transaction(self, email: str, amount_in_kobo: int, reference: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Initializes a transaction and returns the response data from Paystack."""
-        url = f"{self.base_url}/transaction/initialize"
-        headers = {
-            "Authorization": f"Bearer {self.secret_key}",
-            "Content-Type": "application/json",
-        }
         payload = {"email": email, "amount": amount_in_kobo}
+        if reference:
+            payload["reference"] = reference
 
+        response = await self._request("POST", "/transaction/initialize", idempotent=False, json=payload)
+        if response is None:
+            return None
         try:
-            with httpx.Client() as client:
-                response = client.post(url, json=payload, headers=headers)
-                response.raise_for_status()  # Raises an exception for 4xx/5xx responses
-                return response.json()
+            response.raise_for_status()  # Raises an exception for 4xx/5xx responses
+            return response.json()
         except httpx.HTTPStatusError as e:
+            if reference and e.response.status_code == 400 and "duplicate" in e.response.text.lower():
+                raise DuplicateReference(reference) from e
             self._logger.error(f"Paystack API error during initialization: {e.response.status_code} - {e.response.text}")
             return None
 
-    def verify_transaction(self, reference: str) -> Optional[Dict[str, Any]]:
+    async def verify_transaction(self, reference: str) -> Optional[Dict[str, Any]]:
         """Verifies a transaction and returns the response data."""
-        url = f"{self.base_url}/transaction/verify/{reference}"
-        headers = {"Authorization": f"Bearer {self.secret_key}"}
-
+        response = await self._request("GET", f"/transaction/verify/{reference}", idempotent=True)
+        if response is None:
+            return None
         try:
-            with httpx.Client() as client:
-                response = client.get(url, headers=headers)
-                response.raise_for_status()
-                return response.json()
+            response.raise_for_status()
+            return response.json()
         except httpx.HTTPStatusError as e:
             self._logger.error(f"Paystack verification error for reference {reference}: {e.response.status_code} - {e.response.text}")
-            return None
\ No newline at end of file
+            return None
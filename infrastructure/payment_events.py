@@ -0,0 +1,56 @@
+import asyncio
+import os
+from logging import Logger
+from typing import Awaitable, Callable, Optional
+
+from application.use_case.models.sale import PaymentEvent
+
+PAYMENT_EVENT_QUEUE_SIZE = int(os.getenv("PAYMENT_EVENT_QUEUE_SIZE", "1000"))
+PAYMENT_EVENT_DRAIN_TIMEOUT = float(os.getenv("PAYMENT_EVENT_DRAIN_TIMEOUT", "10"))
+
+
+class PaymentEventQueue:
+    """
+        In-process queue for the work that follows a finalized payment. The
+        sale is marked paid before the webhook or verify answers, only the
+        advisory reorder forecast update waits here, so an event lost with
+        the process costs nothing rebuild_reorder_forecast cannot repair.
+    """
+
+    def __init__(self, logger: Logger, max_size: int = PAYMENT_EVENT_QUEUE_SIZE):
+        self._logger = logger
+        self._queue: "asyncio.Queue[PaymentEvent]" = asyncio.Queue(maxsize=max_size)
+        self._worker: Optional[asyncio.Task] = None
+
+    def enqueue(self, event: PaymentEvent) -> bool:
+        """False when the queue is full, the event is dropped"""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self._logger.error(f"payment event queue is full, dropping {event.reference}")
+            return False
+
+    def start(self, handler: Callable[[PaymentEvent], Awaitable[None]]) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(handler))
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), PAYMENT_EVENT_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            self._logger.warning(f"stopping with {self._queue.qsize()} payment events unprocessed")
+        self._worker.cancel()
+        self._worker = None
+
+    async def _run(self, handler: Callable[[PaymentEvent], Awaitable[None]]) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                await handler(event)
+            except Exception as e:
+                self._logger.error(f"failed to process payment event for {event.reference}: {e}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,54 @@
+import asyncio
+import os
+from logging import Logger
+from typing import Awaitable, Callable, Optional
+
+PAYMENT_OUTBOX_POLL_INTERVAL = float(os.getenv("PAYMENT_OUTBOX_POLL_INTERVAL", "2"))
+
+
+class PaymentOutboxDispatcher:
+    """
+        Background loop that drains the payment outbox. A checkout wakes it
+        right after its sale commits, the poll interval only matters for
+        retries and for entries written by other processes.
+    """
+
+    def __init__(self, logger: Logger, poll_interval: float = PAYMENT_OUTBOX_POLL_INTERVAL):
+        self._logger = logger
+        self._poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def start(self, dispatch: Callable[[], Awaitable[int]]) -> None:
+        """dispatch handles one batch and returns how many entries it took"""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(dispatch))
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        # entries being dispatched keep their lease, they are picked up again once it runs out
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self, dispatch: Callable[[], Awaitable[int]]) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                dispatched = await dispatch()
+            except Exception as e:
+                self._logger.error(f"payment outbox dispatch failed: {e}")
+                dispatched = 0
+            if dispatched:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,57 @@
+from datetime import datetime
+from logging import Logger
+from typing import AsyncIterator, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from application.persistence.analytics_repo import AnalyticsRepository as DefaultAnalyticsRepository
+from domain.models import Product, Sale, SaleItem, StockEntry
+from infrastructure.analytics import UNKNOWN_COST
+from infrastructure.unit_of_work import UnitOfWork
+
+
+# TO_SECONDS('1970-01-01'), TO_SECONDS counts from year 0 and ignores the session time zone, unlike UNIX_TIMESTAMP
+EPOCH_TO_SECONDS = 62167219200
+
+
+class AnalyticsRepository(DefaultAnalyticsRepository):
+    _logger: Logger
+    _unit_of_work: UnitOfWork
+
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
+        self._logger = logger
+        self._unit_of_work = unit_of_work
+
+    async def get_products(self) -> List[Tuple[UUID, str, int]]:
+        session = self._unit_of_work.session
+        try:
+            statement = (
+                select(Product.id, Product.name, func.coalesce(func.sum(StockEntry.remaining_quantity), 0))
+                .outerjoin(StockEntry, StockEntry.product_id == Product.id)
+                .group_by(Product.id, Product.name)
+            )
+            return (await session.execute(statement)).all()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error getting products for analytics: {e}")
+            return []
+
+    async def stream_sale_items(self, start: datetime, end: datetime, batch_size: int) -> AsyncIterator[List[Tuple[UUID, int, int, int, int]]]:
+        session = self._unit_of_work.session
+        # everything arrives as plain integers, building arrays from Decimal and datetime objects costs more than the query
+        statement = (
+            select(
+                SaleItem.product_id,
+                SaleItem.quantity,
+                (SaleItem.sale_price * 100).cast(Integer),
+                func.coalesce((SaleItem.cost_price * 100).cast(Integer), UNKNOWN_COST),
+                (func.to_seconds(Sale.sale_date) - EPOCH_TO_SECONDS).cast(Integer),
+            )
+            .join(Sale, SaleItem.sale_id == Sale.id)
+            .where(Sale.paid == True, Sale.sale_date >= start, Sale.sale_date < end)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(statement)
+        async for rows in result.partitions(batch_size):
+            yield rows
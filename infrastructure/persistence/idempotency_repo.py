@@ -0,0 +1,127 @@
+import os
+from logging import Logger
+from typing import Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, delete, func, literal_column, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from application.persistence.idempotency_repo import IdempotencyRepository as DefaultIdempotencyRepository
+from domain.models import IdempotencyKey
+from infrastructure.unit_of_work import UnitOfWork
+
+
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(24 * 60 * 60)))
+# how long a claim without a response holds its key, well past the time a sale takes to create
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "120"))
+
+
+def _age():
+    return func.timestampdiff(literal_column("SECOND"), IdempotencyKey.created_at, func.now())
+
+
+def _expired():
+    return _age() >= IDEMPOTENCY_KEY_TTL_SECONDS
+
+
+def _stale():
+    """claimed by a request that died before it could save or release its response"""
+    return and_(IdempotencyKey.response_status.is_(None), _age() >= IDEMPOTENCY_LEASE_SECONDS)
+
+
+class IdempotencyRepository(DefaultIdempotencyRepository):
+    _logger: Logger
+    _unit_of_work: UnitOfWork
+
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
+        self._logger = logger
+        self._unit_of_work = unit_of_work
+
+    async def claim(self, user_id: UUID, key: str, fingerprint: str) -> Optional[Tuple[IdempotencyKey, bool]]:
+        """the primary key decides between concurrent duplicates, so this is called outside any other transaction"""
+        try:
+            async with self._unit_of_work.transaction() as session:
+                # an expired key is free to be used again, a stale claim is taken over
+                await session.execute(
+                    delete(IdempotencyKey)
+                    .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key, or_(_expired(), _stale()))
+                    .execution_options(synchronize_session=False)
+                )
+                record = IdempotencyKey(user_id=user_id, key=key, fingerprint=fingerprint)
+                session.add(record)
+                await session.flush()
+                # created_at tells this claim apart from one that takes it over later
+                await session.refresh(record)
+                return record, True
+        except IntegrityError:
+            pass
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in claiming idempotency key: {e}")
+            return None
+
+        record = await self.get(user_id, key)
+        if record is None:
+            return None
+        return record, False
+
+    async def get(self, user_id: UUID, key: str) -> Optional[IdempotencyKey]:
+        try:
+            # a transaction of its own, so every poll reads past the snapshot of the previous one
+            async with self._unit_of_work.transaction() as session:
+                statement = (
+                    select(IdempotencyKey)
+                    .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                    .execution_options(use_primary=True, populate_existing=True)
+                )
+                return (await session.scalars(statement)).one_or_none()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in getting idempotency key: {e}")
+            return None
+
+    async def complete(self, record: IdempotencyKey, status_code: int, body: str) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                result = await session.execute(
+                    update(IdempotencyKey)
+                    .where(IdempotencyKey.user_id == record.user_id, IdempotencyKey.key == record.key, IdempotencyKey.created_at == record.created_at)
+                    .values(response_status=status_code, response_body=body)
+                    .execution_options(synchronize_session=False)
+                )
+                return result.rowcount == 1
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in saving idempotent response: {e}")
+            return False
+
+    async def release(self, record: IdempotencyKey) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                await session.execute(
+                    delete(IdempotencyKey)
+                    .where(IdempotencyKey.user_id == record.user_id, IdempotencyKey.key == record.key, IdempotencyKey.created_at == record.created_at,
+                           IdempotencyKey.response_status.is_(None))
+                    .execution_options(synchronize_session=False)
+                )
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in releasing idempotency key: {e}")
+            return False
+
+    async def purge_expired(self, batch_size: int) -> int:
+        deleted = 0
+        cutoff = func.subdate(func.now(), literal_column(f"INTERVAL {IDEMPOTENCY_KEY_TTL_SECONDS} SECOND"))
+        try:
+            while True:
+                # short batches over the created_at index keep each delete from holding locks for long
+                async with self._unit_of_work.transaction() as session:
+                    result = await session.execute(
+                        delete(IdempotencyKey)
+                        .where(IdempotencyKey.created_at < cutoff)
+                        .with_dialect_options(mysql_limit=batch_size)
+                        .execution_options(synchronize_session=False)
+                    )
+                deleted += result.rowcount
+                if result.rowcount < batch_size:
+                    return deleted
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in purging idempotency keys: {e}")
+            return deleted
@@ -0,0 +1,149 @@
+import datetime
+import os
+from logging import Logger
+from typing import List, Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.attributes import set_committed_value
+
+from application.persistence.payment_outbox_repo import PaymentOutboxRepository as DefaultPaymentOutboxRepository
+from domain.enums.outbox_status import OutboxStatus
+from domain.models import PaymentOutbox
+from infrastructure.unit_of_work import UnitOfWork
+
+
+# how long a dispatcher owns the entries it claimed, long enough for the gateway call and its retries
+PAYMENT_OUTBOX_LEASE_SECONDS = int(os.getenv("PAYMENT_OUTBOX_LEASE_SECONDS", "60"))
+
+
+def utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+class PaymentOutboxRepository(DefaultPaymentOutboxRepository):
+    """
+        Entries are keyed by payment reference and kept after their sale is
+        initialized or removed, so a checkout can always read its outcome.
+        next_attempt_at is UTC and doubles as the lease of a claimed entry.
+    """
+    _logger: Logger
+    _unit_of_work: UnitOfWork
+
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
+        self._logger = logger
+        self._unit_of_work = unit_of_work
+
+    async def add(self, entry: PaymentOutbox) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                if entry.next_attempt_at is None:
+                    entry.next_attempt_at = utc_now()
+                session.add(entry)
+                await session.flush()
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in queueing payment {entry.reference}: {e}")
+            return False
+
+    async def get(self, reference: str) -> Optional[PaymentOutbox]:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = (
+                    select(PaymentOutbox)
+                    .where(PaymentOutbox.reference == reference)
+                    .execution_options(use_primary=True, populate_existing=True)
+                )
+                return (await session.scalars(statement)).one_or_none()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in getting payment {reference}: {e}")
+            return None
+
+    async def lock(self, reference: str) -> Optional[PaymentOutbox]:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = (
+                    select(PaymentOutbox)
+                    .where(PaymentOutbox.reference == reference)
+                    .with_for_update()
+                    .execution_options(use_primary=True, populate_existing=True)
+                )
+                return (await session.scalars(statement)).one_or_none()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in locking payment {reference}: {e}")
+            return None
+
+    async def claim_due(self, batch_size: int) -> List[PaymentOutbox]:
+        now = utc_now()
+        try:
+            async with self._unit_of_work.transaction() as session:
+                # skip locked lets several dispatchers share the queue without waiting on each other's batches
+                statement = (
+                    select(PaymentOutbox)
+                    .where(PaymentOutbox.status == OutboxStatus.Pending, PaymentOutbox.next_attempt_at <= now)
+                    .order_by(PaymentOutbox.next_attempt_at)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .execution_options(use_primary=True, populate_existing=True)
+                )
+                entries = list((await session.scalars(statement)).all())
+                if entries:
+                    lease_until = now + datetime.timedelta(seconds=PAYMENT_OUTBOX_LEASE_SECONDS)
+                    await session.execute(
+                        update(PaymentOutbox)
+                        .where(PaymentOutbox.reference.in_([entry.reference for entry in entries]))
+                        .values(attempts=PaymentOutbox.attempts + 1, next_attempt_at=lease_until)
+                        .execution_options(synchronize_session=False)
+                    )
+                    # the update already wrote these, mirror them without leaving the entries dirty for the next flush
+                    for entry in entries:
+                        set_committed_value(entry, "attempts", entry.attempts + 1)
+                        set_committed_value(entry, "next_attempt_at", lease_until)
+                return entries
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in claiming queued payments: {e}")
+            return []
+
+    async def _set(self, reference: str, status_condition=None, **values) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                result = await session.execute(
+                    update(PaymentOutbox)
+                    .where(PaymentOutbox.reference == reference, status_condition if status_condition is not None else PaymentOutbox.status == OutboxStatus.Pending)
+                    .values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+                return result.rowcount == 1
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in updating queued payment {reference}: {e}")
+            return False
+
+    async def mark_initialized(self, reference: str, authorization_url: Optional[str], access_code: Optional[str]) -> bool:
+        # a lapsed lease lets two dispatchers initialize one entry, the one that learned the checkout details may still store them
+        status_condition = or_(
+            PaymentOutbox.status == OutboxStatus.Pending,
+            and_(PaymentOutbox.status == OutboxStatus.Initialized, PaymentOutbox.authorization_url.is_(None)),
+        )
+        return await self._set(reference, status_condition, status=OutboxStatus.Initialized, authorization_url=authorization_url, access_code=access_code, last_error=None)
+
+    async def reschedule(self, reference: str, delay_seconds: float, error: str) -> bool:
+        return await self._set(reference, next_attempt_at=utc_now() + datetime.timedelta(seconds=delay_seconds), last_error=error[:255])
+
+    async def mark_failed(self, reference: str, error: str) -> bool:
+        return await self._set(reference, status=OutboxStatus.Failed, last_error=error[:255])
+
+    async def mark_expired(self, references: List[str]) -> bool:
+        if not references:
+            return True
+        try:
+            async with self._unit_of_work.transaction() as session:
+                await session.execute(
+                    update(PaymentOutbox)
+                    .where(PaymentOutbox.reference.in_(references), PaymentOutbox.status != OutboxStatus.Failed)
+                    .values(status=OutboxStatus.Failed, authorization_url=None, access_code=None, last_error="reservation expired")
+                    .execution_options(synchronize_session=False)
+                )
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in expiring queued payments: {e}")
+            return False
@@ -1,93 +1,142 @@
 from logging import Logger
-from typing import Optional, List
+from typing import Any, Optional, List, Tuple
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
 
-from infrastructure.database import SessionLocal
+from infrastructure.pagination import Cursor, paginate, next_page
+from infrastructure.unit_of_work import UnitOfWork
 from application.persistence.product_repo import ProductRepository as DefaultProductRepository
-from domain.models import Product
+from domain.models import Product, StockEntry
 
 
 class ProductRepository(DefaultProductRepository):
     _logger: Logger
+    _unit_of_work: UnitOfWork
 
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
         self._logger = logger
+        self._unit_of_work = unit_of_work
 
-    def create(self, product: Product) -> Optional[Product]:
-        with SessionLocal() as session:
-            try:
+    async def create(self, product: Product) -> Optional[Product]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(product)
                 self._logger.info(f"product {product.name} created successfully")
-                session.commit()
-                session.refresh(product)
+                await session.flush()
+                await session.refresh(product)
                 return product
-            except SQLAlchemyError as e:
-                self._logger.error(f"Database error while creating product with id {product.name}: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"an error occured while cxreating product, {e}")
-                return None
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while creating product with id {product.name}: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"an error occured while cxreating product, {e}")
+            return None
 
 
-    def update(self, name: str, product: Product) -> Optional[Product]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(Product).where(Product.name == name))
-                update = session.scalars(statement).one_or_none()
+    async def update(self, name: str, product: Product) -> Optional[Product]:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = (select(Product).where(Product.name == name).execution_options(use_primary=True))
+                update = (await session.scalars(statement)).one_or_none()
                 if not update:
                     return None
                 update.description = product.description
                 update.image = product.image
 
-                session.commit()
-                session.refresh(update)
+                await session.flush()
+                await session.refresh(update)
                 return update
-            except SQLAlchemyError as e:
-                self._logger.error(f"Database error while updating product with id {id}: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"unable to update product {product.name}, {e}")
-                return None
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while updating product with id {id}: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"unable to update product {product.name}, {e}")
+            return None
 
 
-    def get(self, id: UUID) -> Optional[Product]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(Product).options(selectinload(Product.stock_entries)).where(Product.id == str(id)))
-                product = session.scalars(statement).one_or_none()
-                return product
-            except SQLAlchemyError as e:
-                self._logger.error(f"Database error while fetching product with id {id}: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"An unexpected error occurred while fetching product {id}: {e}")
-                return None
+    async def get(self, id: UUID) -> Optional[Product]:
+        session = self._unit_of_work.session
+        try:
+            statement = (select(Product).options(selectinload(Product.stock_entries)).where(Product.id == str(id)))
+            product = (await session.scalars(statement)).one_or_none()
+            return product
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while fetching product with id {id}: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"An unexpected error occurred while fetching product {id}: {e}")
+            return None
 
-    def get_by_name(self, name: str) -> Optional[Product]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(Product).options(selectinload(Product.stock_entries)).where(Product.name == name))
-                product = session.scalars(statement).one_or_none()
-                return product
-            except SQLAlchemyError as e:
-                self._logger.error(f"Database error while fetching product with id {name}: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"An unexpected error occurred while fetching product {name}: {e}")
-                return None
+    async def get_many(self, ids: List[UUID]) -> List[Product]:
+        session = self._unit_of_work.session
+        try:
+            statement = (
+                select(Product)
+                .options(selectinload(Product.stock_entries.and_(StockEntry.remaining_quantity > 0)))
+                .where(Product.id.in_([str(id) for id in ids]))
+            )
+            return list((await session.scalars(statement)).all())
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while fetching products {ids}: {e}")
+            return []
+        except Exception as e:
+            self._logger.error(f"An unexpected error occurred while fetching products {ids}: {e}")
+            return []
+
+    async def get_by_name(self, name: str) -> Optional[Product]:
+        session = self._unit_of_work.session
+        try:
+            statement = (select(Product).options(selectinload(Product.stock_entries)).where(Product.name == name))
+            product = (await session.scalars(statement)).one_or_none()
+            return product
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while fetching product with id {name}: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"An unexpected error occurred while fetching product {name}: {e}")
+            return None
+
+    async def list(self, limit: int, after: Optional[Cursor] = None) -> Tuple[List[Product], Optional[str]]:
+        session = self._unit_of_work.session
+        try:
+            statement = paginate(select(Product).options(selectinload(Product.stock_entries)), Product, limit, after)
+            return next_page((await session.scalars(statement)).all(), limit)
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while listing products: {e}")
+            return [], None
+        except Exception as e:
+            self._logger.error(f"An unexpected error occurred while listing products: {e}")
+            return [], None
 
-    def list(self) -> List[Product]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(Product).options(selectinload(Product.stock_entries)))
-                return list(session.scalars(statement).all())
-            except SQLAlchemyError as e:
-                self._logger.error(f"Database error while listing products: {e}")
-                return []
-            except Exception as e:
-                self._logger.error(f"An unexpected error occurred while listing products: {e}")
-                return []
\ No newline at end of file
+    async def list_rows(self, limit: int, after: Optional[Cursor] = None) -> Tuple[List[Tuple[Any, List[Any]]], Optional[str]]:
+        """
+            Column-only variant of list: plain rows, no ORM instances or identity map.
+            Returns (product row, stock rows oldest first) pairs and the next page cursor.
+        """
+        session = self._unit_of_work.session
+        try:
+            statement = paginate(
+                select(Product.id, Product.created_at, Product.name, Product.description, Product.image),
+                Product, limit, after,
+            )
+            products, next_cursor = next_page((await session.execute(statement)).all(), limit)
+            stocks = {product.id: [] for product in products}
+            if stocks:
+                statement = (
+                    select(StockEntry.product_id, StockEntry.quantity, StockEntry.remaining_quantity,
+                           StockEntry.cost_price, StockEntry.selling_price, StockEntry.added_date)
+                    .where(StockEntry.product_id.in_(list(stocks)))
+                    .order_by(StockEntry.product_id, StockEntry.added_date)
+                )
+                for stock in (await session.execute(statement)).all():
+                    stocks[stock.product_id].append(stock)
+            return [(product, stocks[product.id]) for product in products], next_cursor
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error while listing products: {e}")
+            return [], None
+        except Exception as e:
+            self._logger.error(f"An unexpected error occurred while listing products: {e}")
+            return [], None
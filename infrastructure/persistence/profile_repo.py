@@ -1,38 +1,42 @@
 from logging import Logger
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from domain.models import Profile
-from infrastructure.database import SessionLocal
+from infrastructure.pagination import Cursor, paginate, next_page
+from infrastructure.unit_of_work import UnitOfWork
 from sqlalchemy import select
 from application.persistence.profile_repo import ProfileRepository as DefaultprofileRepository
 
 
 class ProfileRepository(DefaultprofileRepository):
     _logger: Logger
+    _unit_of_work: UnitOfWork
 
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
         self._logger = logger
+        self._unit_of_work = unit_of_work
 
-    def create(self, profile: Profile) -> Optional[Profile]:
-        with SessionLocal() as session:
-            try:
+    async def create(self, profile: Profile) -> Optional[Profile]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(profile)
                 self._logger.info(f"profile with id {profile.id} created succesfully")
-                session.commit()
-                session.refresh(profile)
+                await session.flush()
+                await session.refresh(profile)
                 return profile
-            except Exception as e:
-                self._logger.error(f"an error occured while creating profile, {e}")
-                return None
+        except Exception as e:
+            self._logger.error(f"an error occured while creating profile, {e}")
+            return None
 
-    def update(self, user_id: UUID, profile: Profile) -> Optional[Profile]:
-        with SessionLocal() as session:
-            try:
+    async def update(self, user_id: UUID, profile: Profile) -> Optional[Profile]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 statement = (
                     select(Profile)
                     .where(Profile.user_id == user_id)
+                    .execution_options(use_primary=True)
                 )
-                update = session.scalars(statement).one_or_none()
+                update = (await session.scalars(statement)).one_or_none()
 
                 if not update:
                     return None
@@ -41,30 +45,30 @@ class ProfileRepository(DefaultprofileRepository):
                 update.middle_name = profile.middle_name
                 update.phone_number = profile.phone_number
 
-                session.commit()
-                session.refresh(update)
+                await session.flush()
+                await session.refresh(update)
                 return update
-            except Exception as e:
-                self._logger.error(f"unable to update profile with id{user_id}")
-                return None
+        except Exception as e:
+            self._logger.error(f"unable to update profile with id{user_id}")
+            return None
 
-    def get(self, user_id: UUID) -> Optional[Profile]:
-        with SessionLocal() as session:
-            try:
-                statement = (
-                    select(Profile).where(Profile.user_id == str(user_id))
-                )
-                profile = session.scalars(statement).one_or_none()
-                return profile
-            except Exception as e:
-                self._logger.error(f"unable to get profile with user id {user_id}, {e}")
-                return None
+    async def get(self, user_id: UUID) -> Optional[Profile]:
+        session = self._unit_of_work.session
+        try:
+            statement = (
+                select(Profile).where(Profile.user_id == str(user_id))
+            )
+            profile = (await session.scalars(statement)).one_or_none()
+            return profile
+        except Exception as e:
+            self._logger.error(f"unable to get profile with user id {user_id}, {e}")
+            return None
 
-    def list(self) -> List[Profile]:
-        with SessionLocal() as session:
-            profiles = session.scalars(select(Profile)).all()
-            return [
-                {"user_id": u.user_id, "first_name": u.first_name, "last_name": u.last_name,
-                 "middle_name": u.middle_name, "phone_number": u.phone_number}
-                for u in profiles
-            ]
\ No newline at end of file
+    async def list(self, limit: int, after: Optional[Cursor] = None) -> Tuple[List[dict], Optional[str]]:
+        session = self._unit_of_work.session
+        profiles, next_cursor = next_page((await session.scalars(paginate(select(Profile), Profile, limit, after))).all(), limit)
+        return [
+            {"user_id": u.user_id, "first_name": u.first_name, "last_name": u.last_name,
+             "middle_name": u.middle_name, "phone_number": u.phone_number}
+            for u in profiles
+        ], next_cursor
@@ -0,0 +1,144 @@
+import datetime
+import math
+import os
+from collections import defaultdict
+from logging import Logger
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, literal_column, select, update
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from application.persistence.reorder_forecast_repo import ReorderForecastRepository as DefaultReorderForecastRepository
+from domain.models import DailyProductSalesSummary, Product, ProductReorderForecast, Sale, StockEntry
+from infrastructure.pagination import Cursor, next_page, paginate
+from infrastructure.unit_of_work import UnitOfWork
+
+
+REORDER_SHORT_WINDOW_DAYS = float(os.getenv("REORDER_SHORT_WINDOW_DAYS", "7"))
+REORDER_LONG_WINDOW_DAYS = float(os.getenv("REORDER_LONG_WINDOW_DAYS", "28"))
+WINDOWS = {"velocity_short": REORDER_SHORT_WINDOW_DAYS, "velocity_long": REORDER_LONG_WINDOW_DAYS}
+
+
+def utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def decay(velocity: float, updated_at: Optional[datetime.datetime], window_days: float, now: datetime.datetime) -> float:
+    """
+        Velocities are exponentially weighted units per day: every sale adds
+        units / window and the total fades by e^(-days / window), so a window
+        behaves like a moving average without keeping per-day history.
+    """
+    if not velocity or updated_at is None:
+        return 0.0
+    age_days = max((now - updated_at.replace(tzinfo=None)).total_seconds(), 0) / 86400
+    return velocity * math.exp(-age_days / window_days)
+
+
+class ReorderForecastRepository(DefaultReorderForecastRepository):
+    _logger: Logger
+    _unit_of_work: UnitOfWork
+
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
+        self._logger = logger
+        self._unit_of_work = unit_of_work
+
+    async def record_sale(self, sale: Sale) -> bool:
+        units = defaultdict(int)
+        for item in sale.items:
+            units[item.product_id] += item.quantity
+        now = utc_now()
+        try:
+            async with self._unit_of_work.transaction() as session:
+                for product_id, quantity in units.items():
+                    statement = insert(ProductReorderForecast).values(
+                        product_id=product_id,
+                        velocity_updated_at=now,
+                        **{name: quantity / window for name, window in WINDOWS.items()},
+                    )
+                    # decay and add in the upsert itself, so concurrent verifications never overwrite each other
+                    elapsed = func.timestampdiff(literal_column("SECOND"), ProductReorderForecast.velocity_updated_at, statement.inserted.velocity_updated_at)
+                    updates = [
+                        (name, func.coalesce(getattr(ProductReorderForecast, name) * func.exp(-func.greatest(elapsed, 0) / (window * 86400)), 0) + statement.inserted[name])
+                        for name, window in WINDOWS.items()
+                    ]
+                    # MySQL applies assignments left to right, the timestamp has to move after the velocities used it
+                    updates.append(("velocity_updated_at", func.greatest(func.coalesce(ProductReorderForecast.velocity_updated_at, statement.inserted.velocity_updated_at), statement.inserted.velocity_updated_at)))
+                    await session.execute(statement.on_duplicate_key_update(updates))
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error adding sale {sale.payment_reference} to the reorder forecast: {e}")
+            return False
+
+    async def rebuild(self) -> bool:
+        now = utc_now()
+        # older days weigh less than e^-5 in the long window
+        since = (now - datetime.timedelta(days=5 * REORDER_LONG_WINDOW_DAYS)).date()
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = (
+                    select(DailyProductSalesSummary.product_id, DailyProductSalesSummary.day, DailyProductSalesSummary.units)
+                    .where(DailyProductSalesSummary.day >= since, DailyProductSalesSummary.units > 0)
+                    .execution_options(use_primary=True)
+                )
+                velocities = defaultdict(lambda: {name: 0.0 for name in WINDOWS})
+                for product_id, day, units in (await session.execute(statement)).all():
+                    # a day's sales are counted at its midpoint
+                    age_days = (now - datetime.datetime.combine(day, datetime.time(12))).total_seconds() / 86400
+                    for name, window in WINDOWS.items():
+                        velocities[product_id][name] += units / window * math.exp(-max(age_days, 0) / window)
+
+                await session.execute(
+                    update(ProductReorderForecast).values(velocity_updated_at=now, **{name: 0 for name in WINDOWS})
+                )
+                if velocities:
+                    statement = insert(ProductReorderForecast).values([
+                        {"product_id": product_id, "velocity_updated_at": now, **values}
+                        for product_id, values in velocities.items()
+                    ])
+                    await session.execute(statement.on_duplicate_key_update(
+                        {name: statement.inserted[name] for name in [*WINDOWS, "velocity_updated_at"]}
+                    ))
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error rebuilding the reorder forecast: {e}")
+            return False
+
+    async def update_settings(self, product_id: UUID, lead_time_days: Optional[int], cover_days: Optional[int], min_stock: Optional[int]) -> bool:
+        settings = {"lead_time_days": lead_time_days, "cover_days": cover_days, "min_stock": min_stock}
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = insert(ProductReorderForecast).values(product_id=product_id, **settings)
+                await session.execute(statement.on_duplicate_key_update(settings))
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error saving reorder settings for product {product_id}: {e}")
+            return False
+
+    async def list(self, limit: int, after: Optional[Cursor] = None) -> Tuple[List[Tuple[Any, int]], Optional[str]]:
+        session = self._unit_of_work.session
+        try:
+            statement = paginate(
+                select(
+                    Product.id, Product.created_at, Product.name,
+                    ProductReorderForecast.velocity_short, ProductReorderForecast.velocity_long, ProductReorderForecast.velocity_updated_at,
+                    ProductReorderForecast.lead_time_days, ProductReorderForecast.cover_days, ProductReorderForecast.min_stock,
+                ).outerjoin(ProductReorderForecast, ProductReorderForecast.product_id == Product.id),
+                Product, limit, after,
+            )
+            products, next_cursor = next_page((await session.execute(statement)).all(), limit)
+            on_hand = {}
+            if products:
+                # only the page's products are summed, through the (product_id, added_date, remaining_quantity) index
+                statement = (
+                    select(StockEntry.product_id, func.sum(StockEntry.remaining_quantity))
+                    .where(StockEntry.product_id.in_([product.id for product in products]), StockEntry.remaining_quantity > 0)
+                    .group_by(StockEntry.product_id)
+                )
+                on_hand = dict((await session.execute(statement)).all())
+            return [(product, int(on_hand.get(product.id, 0))) for product in products], next_cursor
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error listing the reorder forecast: {e}")
+            return [], None
@@ -1,105 +1,182 @@
-from datetime import datetime
+from datetime import date, datetime
 from logging import Logger
 
 from decimal import Decimal
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, case, or_
 from sqlalchemy.exc import SQLAlchemyError
 from application.persistence.report_repo import ReportRepository as DefaultReportRepository
-from domain.models import Sale, SaleItem, Product,StockEntry
-from infrastructure.database import SessionLocal
+from domain.models import Sale, SaleItem, Product,StockEntry, DailySalesSummary, DailyProductSalesSummary
+from infrastructure.unit_of_work import UnitOfWork
 
 class ReportRepository(DefaultReportRepository):
     _logger: Logger
-    def __init__(self, logger: Logger):
+    _unit_of_work: UnitOfWork
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
         self._logger = logger
+        self._unit_of_work = unit_of_work
+
+    async def get_total_sales(self, start_date: datetime, end_date: datetime) -> Decimal:
+        session = self._unit_of_work.session
+        try:
+            statement = select(func.sum(DailySalesSummary.revenue)).where(
+                and_(DailySalesSummary.day >= start_date.date(), DailySalesSummary.day < end_date.date())
+            )
+            total = (await session.scalars(statement)).one_or_none()
+            return total or Decimal(0)
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return Decimal(0)
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return Decimal(0)
 
-    def get_total_sales(self, start_date: datetime, end_date: datetime) -> Decimal:
-        with SessionLocal() as session:
-            try:
-                statement = select(func.sum(Sale.total_amount)).where(
-                    and_(Sale.paid == True, Sale.sale_date.between(start_date, end_date))
-                )
-                total = session.scalars(statement).one_or_none()
-                return total or Decimal(0)
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error: {e}")
-                return Decimal(0)
-            except Exception as e:
-                self._logger.error(f"error getting details: {e}")
-                return Decimal(0)
 
+    async def get_profit_loss(self, start_date: datetime, end_date: datetime) -> Tuple[Decimal, Decimal, Decimal]:
+        session = self._unit_of_work.session
+        try:
+            statement = select(func.sum(DailySalesSummary.revenue), func.sum(DailySalesSummary.cost), func.sum(DailySalesSummary.uncosted_revenue))\
+                .where(and_(DailySalesSummary.day >= start_date.date(), DailySalesSummary.day < end_date.date()))
 
-    def get_profit_loss(self, start_date: datetime, end_date: datetime) -> Tuple[Decimal, Decimal]:
-        with SessionLocal() as session:
-            try:
-                statement = select(func.sum(SaleItem.sale_price * SaleItem.quantity),
-                                   func.sum(StockEntry.cost_price * SaleItem.quantity)).join(
-                    Sale, SaleItem.sale_id == Sale.id)\
-                    .join(Product, SaleItem.product_id == Product.id)\
-                    .join(StockEntry, Product.id == StockEntry.product_id)\
-                    .where(and_(Sale.paid == True, Sale.sale_date.between(start_date, end_date)))
+            result = (await session.execute(statement)).first()
+            revenue = result[0] or Decimal(0)
+            cost = result[1] or Decimal(0)
+            uncosted_revenue = result[2] or Decimal(0)
+            return revenue, cost, uncosted_revenue
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return Decimal(0), Decimal(0), Decimal(0)
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return Decimal(0), Decimal(0), Decimal(0)
 
-                result = session.execute(statement).first()
-                revenue = result[0] or Decimal(0)
-                cost = result[1] or Decimal(0)
-                return revenue, cost
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error: {e}")
-                return Decimal(0), Decimal(0)
-            except Exception as e:
-                self._logger.error(f"error getting details: {e}")
-                return Decimal(0), Decimal(0)
+    async def get_sales_status_counts(self) -> Tuple[int, int]:
+        session = self._unit_of_work.session
+        try:
+            statement = select(func.sum(DailySalesSummary.paid_count), func.sum(DailySalesSummary.unpaid_count))
+            successful_count, unsuccessful_count = (await session.execute(statement)).one()
+            return int(successful_count or 0), int(unsuccessful_count or 0)
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return 0,0
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return 0,0
 
-    def get_sales_status_counts(self) -> Tuple[int, int]:
-        with SessionLocal() as session:
-            try:
-                successful_stmt = select(func.count(Sale.id)).where(Sale.paid == True)
-                unsuccessful_stmt = select(func.count(Sale.id)).where(Sale.paid == False)
-                successful_count = session.scalars(successful_stmt).one_or_none()
-                unsuccessful_count = session.scalars(unsuccessful_stmt).one_or_none()
-                return successful_count, unsuccessful_count
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error: {e}")
-                return 0,0
-            except Exception as e:
-                self._logger.error(f"error getting details: {e}")
-                return 0,0
 
+    async def get_product_performance(self) -> List[Tuple[str, str, int]]:
+        session = self._unit_of_work.session
+        try:
+            # units_ordered counts paid and unpaid items alike, products whose sales were all removed drop out
+            total_sold = select(
+                DailyProductSalesSummary.product_id, func.sum(DailyProductSalesSummary.units_ordered).label("total_sold")
+            ).group_by(DailyProductSalesSummary.product_id)\
+            .having(func.sum(DailyProductSalesSummary.units_ordered) > 0).subquery()
+            statement = select(
+                Product.id, Product.name, total_sold.c.total_sold
+            ).join(Product, total_sold.c.product_id == Product.id)\
+            .order_by(total_sold.c.total_sold.desc())
+            return (await session.execute(statement)).all()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return []
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return []
+
+    async def get_low_stock_products(self, threshold: int) -> List[Tuple[str, str, int]]:
+        session = self._unit_of_work.session
+        try:
+            statement = (
+                select(
+                    Product.id,
+                    Product.name,
+                    func.sum(StockEntry.remaining_quantity).label("total_remaining")
+                )
+                .join(StockEntry, Product.id == StockEntry.product_id)
+                .group_by(Product.id, Product.name)
+                .having(func.sum(StockEntry.remaining_quantity) <= threshold)
+            )
+            return (await session.execute(statement)).all()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return []
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return []
 
-    def get_product_performance(self) -> List[Tuple[str, str, int]]:
-        with SessionLocal() as session:
-            try:
-                statement = select(
-                    Product.id, Product.name, func.sum(SaleItem.quantity).label("total_sold")
-                ).join(Product, SaleItem.product_id == Product.id)\
-                .group_by(Product.id, Product.name).order_by(func.sum(SaleItem.quantity).desc())
-                return session.execute(statement).all()
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error: {e}")
-                return []
-            except Exception as e:
-                self._logger.error(f"error getting details: {e}")
-                return []
+    async def get_timeseries(self, start: date, end: date, bucket: str) -> List[Tuple[date, Decimal, Decimal, int, int, Decimal]]:
+        session = self._unit_of_work.session
+        day = DailySalesSummary.day
+        buckets = {
+            "day": day,
+            # weeks start on Monday
+            "week": func.subdate(day, func.weekday(day)),
+            "month": func.subdate(day, func.dayofmonth(day) - 1),
+        }
+        period_start = buckets[bucket].label("period_start")
+        try:
+            statement = select(
+                period_start,
+                func.sum(DailySalesSummary.revenue),
+                func.sum(DailySalesSummary.cost),
+                func.sum(DailySalesSummary.paid_count),
+                func.sum(DailySalesSummary.units),
+                func.sum(DailySalesSummary.uncosted_revenue),
+            ).where(and_(day >= start, day < end)).group_by(period_start).order_by(period_start)
+            return (await session.execute(statement)).all()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return []
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return []
+
+    async def get_inventory_valuation(self, as_of: Optional[datetime] = None) -> List[Tuple[str, str, int, Decimal, Decimal]]:
+        session = self._unit_of_work.session
+        try:
+            if as_of is None:
+                units = StockEntry.remaining_quantity
+                batches = select(StockEntry.product_id, units.label("units"), StockEntry.cost_price, StockEntry.selling_price)\
+                    .where(units > 0).subquery()
+            else:
+                # walk back from today instead of forward from the first sale: a batch held what it holds now
+                # plus whatever sales since as_of took from it, so only the recent ledger is read.
+                # a cancelled reservation gave its units back, so it only counts when it was still held at as_of
+                taken = case(
+                    (and_(Sale.sale_date >= as_of, Sale.cancelled_at.is_(None)), SaleItem.quantity),
+                    (and_(Sale.sale_date < as_of, Sale.cancelled_at >= as_of), -SaleItem.quantity),
+                    else_=0,
+                )
+                sold_since = (
+                    select(SaleItem.stock_entry_id, func.sum(taken).label("quantity"))
+                    .join(Sale, SaleItem.sale_id == Sale.id)
+                    .where(or_(Sale.sale_date >= as_of, Sale.cancelled_at >= as_of), SaleItem.stock_entry_id.is_not(None))
+                    .group_by(SaleItem.stock_entry_id)
+                    .subquery()
+                )
+                units = StockEntry.remaining_quantity + func.coalesce(sold_since.c.quantity, 0)
+                batches = select(StockEntry.product_id, units.label("units"), StockEntry.cost_price, StockEntry.selling_price)\
+                    .outerjoin(sold_since, sold_since.c.stock_entry_id == StockEntry.id)\
+                    .where(StockEntry.added_date < as_of, units > 0).subquery()
 
-    def get_low_stock_products(self, threshold: int) -> List[Tuple[str, str, int]]:
-        with SessionLocal() as session:
-            try:
-                statement = (
-                    select(
-                        Product.id,
-                        Product.name,
-                        func.sum(StockEntry.remaining_quantity).label("total_remaining")
-                    )
-                    .join(StockEntry, Product.id == StockEntry.product_id)
-                    .group_by(Product.id, Product.name)
-                    .having(func.sum(StockEntry.remaining_quantity) <= threshold)
+            statement = (
+                select(
+                    Product.id,
+                    Product.name,
+                    func.sum(batches.c.units),
+                    func.sum(batches.c.units * batches.c.cost_price),
+                    func.sum(batches.c.units * batches.c.selling_price),
                 )
-                return session.execute(statement).all()
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error: {e}")
-                return []
-            except Exception as e:
-                self._logger.error(f"error getting details: {e}")
-                return []
+                .join(Product, batches.c.product_id == Product.id)
+                .group_by(Product.id, Product.name)
+                .order_by(func.sum(batches.c.units * batches.c.cost_price).desc())
+            )
+            return (await session.execute(statement)).all()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error: {e}")
+            return []
+        except Exception as e:
+            self._logger.error(f"error getting details: {e}")
+            return []
@@ -0,0 +1,48 @@
+from datetime import datetime
+from logging import Logger
+from typing import Any, AsyncIterator, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from application.persistence.sales_export_repo import SalesExportRepository as DefaultSalesExportRepository
+from domain.models import Product, Sale, SaleItem
+
+
+SALE_LINE_COLUMNS = [
+    "sale_id", "payment_reference", "sale_date", "paid", "customer_id",
+    "product_id", "product_name", "stock_entry_id", "quantity", "sale_price", "cost_price",
+]
+
+
+class SalesExportRepository(DefaultSalesExportRepository):
+    """
+        Reads on its own connection rather than the request's unit of work: the
+        response body is still streaming after the request scope has closed.
+    """
+    _logger: Logger
+    _engine: AsyncEngine
+
+    def __init__(self, logger: Logger, engine: AsyncEngine):
+        self._logger = logger
+        self._engine = engine
+
+    async def stream_sale_lines(self, start: datetime, end: datetime, batch_size: int) -> AsyncIterator[List[Any]]:
+        statement = (
+            select(
+                Sale.id, Sale.payment_reference, Sale.sale_date, Sale.paid, Sale.customer_id,
+                SaleItem.product_id, Product.name, SaleItem.stock_entry_id, SaleItem.quantity,
+                SaleItem.sale_price, SaleItem.cost_price,
+            )
+            .select_from(SaleItem)
+            .join(Sale, SaleItem.sale_id == Sale.id)
+            .join(Product, SaleItem.product_id == Product.id)
+            .where(Sale.sale_date >= start, Sale.sale_date < end)
+            .order_by(Sale.sale_date, Sale.id)
+            .execution_options(yield_per=batch_size)
+        )
+        # stream() asks the driver for a server side cursor, so rows arrive batch by batch instead of all at once
+        async with self._engine.connect() as connection:
+            result = await connection.stream(statement)
+            async for rows in result.partitions(batch_size):
+                yield rows
@@ -1,58 +1,124 @@
 from logging import Logger
-from typing import Optional
-from sqlalchemy import select
+import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import exists, select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
 from application.persistence.sales_repo import SalesRepository as DefaultSaleRepository
-from domain.models import Sale
-from infrastructure.database import SessionLocal
+from domain.models import PaymentOutbox, Sale
+from infrastructure.unit_of_work import UnitOfWork
 
 class SalesRepository(DefaultSaleRepository):
     _logger: Logger
+    _unit_of_work: UnitOfWork
 
-    def __init__(self, logger:Logger):
+    def __init__(self, logger:Logger, unit_of_work: UnitOfWork):
         self._logger = logger
+        self._unit_of_work = unit_of_work
 
-    def create(self, sale: Sale) -> Optional[Sale]:
-        with SessionLocal() as session:
-            try:
+    async def create(self, sale: Sale) -> Optional[Sale]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(sale)
-                session.commit()
-                session.refresh(sale)
+                await session.flush()
+                await session.refresh(sale)
                 return sale
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error in creating sale: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"error in creating sale: {e}")
-                return None
-
-
-    def get_by_reference(self, reference: str) -> Optional[Sale]:
-        with SessionLocal() as session:
-            try:
-                statement = select(Sale).where(Sale.payment_reference==reference).options(selectinload(Sale.items))
-                sale = session.scalars(statement).one_or_none()
-                return sale
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error in getting sale: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"error in getting sale: {e}")
-                return None
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in creating sale: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"error in creating sale: {e}")
+            return None
+
+
+    async def get_by_reference(self, reference: str, lock: bool = False) -> Optional[Sale]:
+        session = self._unit_of_work.session
+        try:
+            statement = select(Sale).where(Sale.payment_reference==reference).options(selectinload(Sale.items)).execution_options(use_primary=True, populate_existing=True)
+            if lock:
+                statement = statement.with_for_update()
+            sale = (await session.scalars(statement)).one_or_none()
+            return sale
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in getting sale: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"error in getting sale: {e}")
+            return None
 
 
 
-    def update(self, sale: Sale) -> Optional[Sale]:
-        with SessionLocal() as session:
-            try:
+    async def update(self, sale: Sale) -> Optional[Sale]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(sale)
-                session.commit()
-                session.refresh(sale)
+                await session.flush()
+                await session.refresh(sale)
                 return sale
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error in confirming sale payment: {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"error in confirming sale payment: {e}")
-                return None
\ No newline at end of file
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in confirming sale payment: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"error in confirming sale payment: {e}")
+            return None
+
+    async def mark_paid(self, reference: str) -> Optional[bool]:
+        """flips paid only while it is still unpaid, so a sale is finalized exactly once however many times it is confirmed. None on a database error"""
+        try:
+            async with self._unit_of_work.transaction() as session:
+                result = await session.execute(
+                    update(Sale)
+                    .where(Sale.payment_reference == reference, Sale.paid == False, Sale.cancelled_at.is_(None))
+                    .values(paid=True)
+                    .execution_options(synchronize_session=False)
+                )
+                return result.rowcount == 1
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in confirming sale payment: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"error in confirming sale payment: {e}")
+            return None
+
+    async def cancel_unpaid(self, created_before: datetime.datetime, batch_size: int) -> Optional[List[Tuple[UUID, str, datetime.date]]]:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                # the row locks hold off a payment confirmation until the cancellation commits, skip locked lets sweepers share the work
+                statement = (
+                    select(Sale.id, Sale.payment_reference, Sale.sale_date)
+                    .where(
+                        Sale.paid == False, Sale.cancelled_at.is_(None), Sale.sale_date < created_before,
+                        # sales from before the outbox may have been paid without being confirmed here, they are never swept
+                        exists().where(PaymentOutbox.reference == Sale.payment_reference),
+                    )
+                    .order_by(Sale.sale_date)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                    .execution_options(use_primary=True)
+                )
+                expired = (await session.execute(statement)).all()
+                if expired:
+                    await session.execute(
+                        update(Sale)
+                        .where(Sale.id.in_([sale_id for sale_id, _, _ in expired]))
+                        .values(cancelled_at=datetime.datetime.now(datetime.timezone.utc))
+                        .execution_options(synchronize_session=False)
+                    )
+                return [(sale_id, reference, sale_date.date()) for sale_id, reference, sale_date in expired]
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in cancelling expired sales: {e}")
+            return None
+
+    async def cancel(self, sale: Sale) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                sale.cancelled_at = datetime.datetime.now(datetime.timezone.utc)
+                await session.flush()
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in cancelling sale {sale.id}: {e}")
+            return False
+        except Exception as e:
+            self._logger.error(f"error in cancelling sale {sale.id}: {e}")
+            return False
@@ -0,0 +1,168 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from logging import Logger
+from typing import Optional
+
+from sqlalchemy import case, delete, func, inspect, select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from application.persistence.sales_summary_repo import SalesSummaryRepository as DefaultSalesSummaryRepository
+from domain.models import DailyProductSalesSummary, DailySalesSummary, Sale, SaleItem
+from infrastructure.unit_of_work import UnitOfWork
+
+
+class SalesSummaryRepository(DefaultSalesSummaryRepository):
+    _logger: Logger
+    _unit_of_work: UnitOfWork
+
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
+        self._logger = logger
+        self._unit_of_work = unit_of_work
+
+    @staticmethod
+    async def _increment(session: AsyncSession, model, keys: dict, increments: dict) -> None:
+        # INSERT ... ON DUPLICATE KEY UPDATE col = col + VALUES(col), so concurrent sales on the same day never lose an update
+        statement = insert(model).values(**keys, **increments)
+        statement = statement.on_duplicate_key_update(
+            {name: getattr(model, name) + statement.inserted[name] for name in increments}
+        )
+        await session.execute(statement)
+
+    @staticmethod
+    def _day(sale: Sale) -> datetime.date:
+        return sale.sale_date.date()
+
+    async def _count(self, session: AsyncSession, sale: Sale) -> None:
+        if "items" in inspect(sale).unloaded:
+            # a freshly created sale was refreshed, which expires its items
+            await session.refresh(sale, ["items"])
+        ordered = defaultdict(int)
+        for item in sale.items:
+            ordered[item.product_id] += item.quantity
+        day = self._day(sale)
+        for product_id, units in ordered.items():
+            await self._increment(session, DailyProductSalesSummary, {"day": day, "product_id": product_id}, {"units_ordered": units})
+        await self._increment(session, DailySalesSummary, {"day": day}, {"unpaid_count": 1})
+
+    async def record_created(self, sale: Sale) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                await self._count(session, sale)
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error counting sale {sale.payment_reference} in the daily summary: {e}")
+            return False
+
+    async def record_paid(self, sale: Sale) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                products = defaultdict(lambda: {"revenue": Decimal(0), "cost": Decimal(0), "uncosted_revenue": Decimal(0), "units": 0})
+                for item in sale.items:
+                    totals = products[item.product_id]
+                    totals["revenue"] += item.sale_price * item.quantity
+                    if item.cost_price is None:
+                        totals["uncosted_revenue"] += item.sale_price * item.quantity
+                    else:
+                        totals["cost"] += item.cost_price * item.quantity
+                    totals["units"] += item.quantity
+
+                day = self._day(sale)
+                for product_id, totals in products.items():
+                    await self._increment(session, DailyProductSalesSummary, {"day": day, "product_id": product_id}, totals)
+                await self._increment(session, DailySalesSummary, {"day": day}, {
+                    "revenue": sum((t["revenue"] for t in products.values()), Decimal(0)),
+                    "cost": sum((t["cost"] for t in products.values()), Decimal(0)),
+                    "uncosted_revenue": sum((t["uncosted_revenue"] for t in products.values()), Decimal(0)),
+                    "units": sum(t["units"] for t in products.values()),
+                    "paid_count": 1,
+                    "unpaid_count": -1,
+                })
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error adding sale {sale.payment_reference} to the daily summary: {e}")
+            return False
+
+    async def first_sale_date(self) -> Optional[datetime.date]:
+        session = self._unit_of_work.session
+        try:
+            first = (await session.scalars(select(func.min(Sale.sale_date)))).one_or_none()
+            return first.date() if first else None
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error getting the first sale date: {e}")
+            return None
+
+    async def rebuild(self, start: datetime.date, end: datetime.date) -> bool:
+        start_at = datetime.datetime.combine(start, datetime.time.min)
+        end_at = datetime.datetime.combine(end, datetime.time.min)
+        day = func.date(Sale.sale_date)
+        try:
+            async with self._unit_of_work.transaction() as session:
+                await session.execute(delete(DailyProductSalesSummary).where(DailyProductSalesSummary.day >= start, DailyProductSalesSummary.day < end))
+                await session.execute(delete(DailySalesSummary).where(DailySalesSummary.day >= start, DailySalesSummary.day < end))
+
+                # money and units only count once paid, units_ordered counts every item like the product report always has
+                paid_quantity = case((Sale.paid == True, SaleItem.quantity), else_=0)
+                # items with no recorded cost add nothing to cost, their revenue is kept apart instead
+                uncosted_quantity = case((SaleItem.cost_price.is_(None), paid_quantity), else_=0)
+                product_rows = (
+                    select(
+                        day,
+                        SaleItem.product_id,
+                        func.sum(SaleItem.sale_price * paid_quantity),
+                        func.coalesce(func.sum(SaleItem.cost_price * paid_quantity), 0),
+                        func.sum(SaleItem.sale_price * uncosted_quantity),
+                        func.sum(paid_quantity),
+                        func.sum(SaleItem.quantity),
+                    )
+                    .join(Sale, SaleItem.sale_id == Sale.id)
+                    .where(Sale.sale_date >= start_at, Sale.sale_date < end_at)
+                    .group_by(day, SaleItem.product_id)
+                )
+                await session.execute(
+                    insert(DailyProductSalesSummary).from_select(["day", "product_id", "revenue", "cost", "uncosted_revenue", "units", "units_ordered"], product_rows)
+                )
+
+                counts = (
+                    select(
+                        day.label("day"),
+                        func.sum(case((Sale.paid == True, 1), else_=0)).label("paid_count"),
+                        func.sum(case((Sale.paid == True, 0), else_=1)).label("unpaid_count"),
+                    )
+                    .where(Sale.sale_date >= start_at, Sale.sale_date < end_at)
+                    .group_by(day)
+                    .subquery()
+                )
+                totals = (
+                    select(
+                        DailyProductSalesSummary.day,
+                        func.sum(DailyProductSalesSummary.revenue).label("revenue"),
+                        func.sum(DailyProductSalesSummary.cost).label("cost"),
+                        func.sum(DailyProductSalesSummary.uncosted_revenue).label("uncosted_revenue"),
+                        func.sum(DailyProductSalesSummary.units).label("units"),
+                    )
+                    .where(DailyProductSalesSummary.day >= start, DailyProductSalesSummary.day < end)
+                    .group_by(DailyProductSalesSummary.day)
+                    .subquery()
+                )
+                day_rows = (
+                    select(
+                        counts.c.day,
+                        func.coalesce(totals.c.revenue, 0),
+                        func.coalesce(totals.c.cost, 0),
+                        func.coalesce(totals.c.uncosted_revenue, 0),
+                        func.coalesce(totals.c.units, 0),
+                        counts.c.paid_count,
+                        counts.c.unpaid_count,
+                    )
+                    .outerjoin(totals, totals.c.day == counts.c.day)
+                )
+                await session.execute(
+                    insert(DailySalesSummary).from_select(["day", "revenue", "cost", "uncosted_revenue", "units", "paid_count", "unpaid_count"], day_rows)
+                )
+                return True
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error rebuilding daily sales summary from {start} to {end}: {e}")
+            return False
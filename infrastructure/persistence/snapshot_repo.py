@@ -0,0 +1,43 @@
+from datetime import datetime
+from logging import Logger
+from typing import Any, AsyncIterator, List, Optional, Type
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from application.persistence.snapshot_repo import SnapshotRepository as DefaultSnapshotRepository
+from domain.models import BaseModel
+
+
+class SnapshotRepository(DefaultSnapshotRepository):
+    """
+        Reads on its own replica connection, a full snapshot can outlive any
+        request and should never hold a primary connection for that long.
+    """
+    _logger: Logger
+    _engine: AsyncEngine
+
+    def __init__(self, logger: Logger, engine: AsyncEngine):
+        self._logger = logger
+        self._engine = engine
+
+    async def current_time(self) -> Optional[datetime]:
+        try:
+            async with self._engine.connect() as connection:
+                return (await connection.execute(select(func.now()))).scalar_one()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error reading the database clock: {e}")
+            return None
+
+    async def stream_changes(self, model: Type[BaseModel], since: Optional[datetime], until: datetime, batch_size: int) -> AsyncIterator[List[Any]]:
+        changed_at = func.coalesce(model.modified_at, model.created_at)
+        statement = select(model.__table__).where(changed_at <= until)
+        if since is not None:
+            # two plain comparisons rather than one on the coalesce, so MySQL can merge the created_at and modified_at indexes
+            statement = statement.where(or_(model.created_at > since, model.modified_at > since))
+        statement = statement.order_by(model.created_at, model.id).execution_options(yield_per=batch_size)
+        async with self._engine.connect() as connection:
+            result = await connection.stream(statement)
+            async for rows in result.partitions(batch_size):
+                yield rows
@@ -1,38 +1,43 @@
+from collections import Counter
 from logging import Logger
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from domain.models import StockEntry
-from infrastructure.database import SessionLocal
+from domain.models import SaleItem, StockEntry
+from infrastructure.pagination import Cursor, paginate, next_page
+from infrastructure.unit_of_work import UnitOfWork
 from application.persistence.stock_entry import StockEntryRepository as DefaultStockRepository
 class StockEntryRepository(DefaultStockRepository):
     _logger: Logger
-    def __init__(self, logger:Logger):
+    _unit_of_work: UnitOfWork
+    def __init__(self, logger:Logger, unit_of_work: UnitOfWork):
         self._logger = logger
+        self._unit_of_work = unit_of_work
 
-    def create(self,product_name: str, stock_entry: StockEntry) -> Optional[StockEntry]:
-        with SessionLocal() as session:
-            try:
+    async def create(self,product_name: str, stock_entry: StockEntry) -> Optional[StockEntry]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(stock_entry)
                 self._logger.info(f"adding stocks for {product_name}")
-                session.commit()
-                session.refresh(stock_entry)
+                await session.flush()
+                await session.refresh(stock_entry)
                 return stock_entry
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error in adding {stock_entry.quantity} quantity to {product_name}, {e} ")
-                return None
-            except Exception as e:
-                self._logger.error(f"an error occured, {e}")
-                return None
-
-    def update(self, id: UUID, stock_entry: StockEntry) -> Optional[StockEntry]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(StockEntry).where(StockEntry.id == id))
-                update = session.scalars(statement).one_or_none()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in adding {stock_entry.quantity} quantity to {product_name}, {e} ")
+            return None
+        except Exception as e:
+            self._logger.error(f"an error occured, {e}")
+            return None
+
+    async def update(self, id: UUID, stock_entry: StockEntry) -> Optional[StockEntry]:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = (select(StockEntry).where(StockEntry.id == id).execution_options(use_primary=True))
+                update = (await session.scalars(statement)).one_or_none()
                 if not update:
                     return None
 
@@ -40,56 +45,148 @@ class StockEntryRepository(DefaultStockRepository):
                 update.selling_price = stock_entry.selling_price
                 update.quantity = stock_entry.quantity
 
-                session.commit()
-                session.refresh(update)
+                await session.flush()
+                await session.refresh(update)
                 return update
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error in updating {stock_entry.id}, {e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"error in updating product stock, {e}")
-                return None
-
-
-    def get(self, id: UUID) -> Optional[StockEntry]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(StockEntry).options(selectinload(StockEntry.product)).where(StockEntry.id == str(id)))
-                stock = session.scalars(statement).one_or_none()
-                return stock
-
-            except SQLAlchemyError as e:
-                self._logger.error(f"database error in getting stock{e}")
-                return None
-            except Exception as e:
-                self._logger.error(f"error getting stock{e}")
-                return None
-
-
-    def list(self) -> List[StockEntry]:
-        with SessionLocal() as session:
-            try:
-                statement = (select(StockEntry).options(selectinload(StockEntry.product)))
-                return list(session.scalars(statement).all())
-            except SQLAlchemyError as e:
-                self._logger.error(f"unable to fetch list of stocks from database{e}")
-                return []
-            except Exception as e:
-                self._logger.error(f"unable to get list of stocks: {e}")
-                return []
-
-    def reduce_stock_for_sales(self, entries_to_reduce: List[StockEntry]) -> bool:
-
-        with SessionLocal() as session:
-            try:
-                for entry in entries_to_reduce:
-                    session.merge(entry)
-
-                session.commit()
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in updating {stock_entry.id}, {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"error in updating product stock, {e}")
+            return None
+
+
+    async def get(self, id: UUID) -> Optional[StockEntry]:
+        session = self._unit_of_work.session
+        try:
+            statement = (select(StockEntry).options(selectinload(StockEntry.product)).where(StockEntry.id == str(id)))
+            stock = (await session.scalars(statement)).one_or_none()
+            return stock
+
+        except SQLAlchemyError as e:
+            self._logger.error(f"database error in getting stock{e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"error getting stock{e}")
+            return None
+
+
+    async def list(self, limit: int, after: Optional[Cursor] = None) -> Tuple[List[StockEntry], Optional[str]]:
+        session = self._unit_of_work.session
+        try:
+            statement = paginate(select(StockEntry).options(selectinload(StockEntry.product)), StockEntry, limit, after)
+            return next_page((await session.scalars(statement)).all(), limit)
+        except SQLAlchemyError as e:
+            self._logger.error(f"unable to fetch list of stocks from database{e}")
+            return [], None
+        except Exception as e:
+            self._logger.error(f"unable to get list of stocks: {e}")
+            return [], None
+
+    async def reserve_stock(self, product_id: UUID, quantity: int) -> Optional[List[Tuple[StockEntry, int]]]:
+        """
+            Walks the product's entries oldest first and takes stock with
+            conditional UPDATEs, so concurrent checkouts can never drive
+            remaining_quantity below zero. When another buyer got to an entry
+            first, its current quantity is re-read and the entry retried.
+            Returns None, leaving the transaction marked for rollback, when
+            there is not enough stock.
+        """
+        try:
+            async with self._unit_of_work.transaction() as session:
+                statement = (
+                    select(StockEntry)
+                    .where(StockEntry.product_id == str(product_id), StockEntry.remaining_quantity > 0)
+                    .order_by(StockEntry.added_date)
+                    .execution_options(use_primary=True, populate_existing=True)
+                )
+                entries = (await session.scalars(statement)).all()
+
+                reservations = []
+                outstanding = quantity
+                for entry in entries:
+                    available = entry.remaining_quantity
+                    while outstanding > 0 and available > 0:
+                        take = min(outstanding, available)
+                        result = await session.execute(
+                            update(StockEntry)
+                            .where(StockEntry.id == entry.id, StockEntry.remaining_quantity >= take)
+                            .values(remaining_quantity=StockEntry.remaining_quantity - take)
+                            .execution_options(synchronize_session=False)
+                        )
+                        if result.rowcount == 1:
+                            available -= take
+                            outstanding -= take
+                            reservations.append((entry, take))
+                        else:
+                            current = select(StockEntry.remaining_quantity).where(StockEntry.id == entry.id).with_for_update()
+                            available = (await session.scalars(current)).one()
+                    set_committed_value(entry, "remaining_quantity", available)
+                    if outstanding == 0:
+                        break
+
+                if outstanding > 0:
+                    self._logger.warning(f"not enough stock to reserve {quantity} of product {product_id}")
+                    self._unit_of_work.set_rollback_only()
+                    return None
+                return reservations
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error during stock reservation: {e}")
+            return None
+        except Exception as e:
+            self._logger.error(f"Unexpected error during stock reservation: {e}")
+            return None
+
+    async def release_stock(self, reservations: List[Tuple[StockEntry, int]]) -> bool:
+        return await self._release([(entry.id, quantity) for entry, quantity in reservations])
+
+    async def release_sale_items(self, items: List[SaleItem]) -> bool:
+        quantities = Counter()
+        for item in items:
+            if item.stock_entry_id is None:
+                self._logger.warning(f"Sale item {item.id} does not record its stock entry, its quantity is not returned")
+                continue
+            quantities[item.stock_entry_id] += item.quantity
+        return await self._release(list(quantities.items()))
+
+    async def _release(self, quantities: List[Tuple[UUID, int]]) -> bool:
+        try:
+            async with self._unit_of_work.transaction() as session:
+                for stock_entry_id, quantity in quantities:
+                    await session.execute(
+                        update(StockEntry)
+                        .where(StockEntry.id == stock_entry_id)
+                        .values(remaining_quantity=StockEntry.remaining_quantity + quantity)
+                        .execution_options(synchronize_session=False)
+                    )
                 return True
-            except SQLAlchemyError as e:
-                self._logger.error(f"Database error during stock reduction: {e}")
-                return False
-            except Exception as e:
-                self._logger.error(f"Unexpected error during stock reduction: {e}")
-                return False
\ No newline at end of file
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error during stock release: {e}")
+            return False
+        except Exception as e:
+            self._logger.error(f"Unexpected error during stock release: {e}")
+            return False
+
+    async def release_sales(self, sale_ids: List[UUID]) -> Optional[int]:
+        if not sale_ids:
+            return 0
+        try:
+            async with self._unit_of_work.transaction() as session:
+                taken = (
+                    select(SaleItem.stock_entry_id, func.sum(SaleItem.quantity).label("quantity"))
+                    .where(SaleItem.sale_id.in_(sale_ids), SaleItem.stock_entry_id.is_not(None))
+                    .group_by(SaleItem.stock_entry_id)
+                    .subquery()
+                )
+                units = (await session.execute(select(func.coalesce(func.sum(taken.c.quantity), 0)))).scalar_one()
+                # one multi-table UPDATE against the grouped ledger, however many items and entries the batch touches
+                await session.execute(
+                    update(StockEntry)
+                    .where(StockEntry.id == taken.c.stock_entry_id)
+                    .values(remaining_quantity=StockEntry.remaining_quantity + taken.c.quantity)
+                    .execution_options(synchronize_session=False)
+                )
+                return int(units)
+        except SQLAlchemyError as e:
+            self._logger.error(f"Database error during stock release: {e}")
+            return None
@@ -1,5 +1,5 @@
 from datetime import timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from pydantic import EmailStr
@@ -7,48 +7,51 @@ from sqlalchemy import select
 from domain.enums import role
 from application.persistence.user_repo import UserRepository as DefaultUserRepository
 from domain.models import User
-from infrastructure.database import SessionLocal
+from infrastructure.pagination import Cursor, paginate, next_page
+from infrastructure.unit_of_work import UnitOfWork
 from logging import Logger
 
 class UserRepository(DefaultUserRepository):
     _logger: Logger
+    _unit_of_work: UnitOfWork
 
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork):
         self._logger = logger
+        self._unit_of_work = unit_of_work
 
 
-    def create(self, user: User) -> Optional[User]:
-        with SessionLocal() as session:
-            try:
+    async def create(self, user: User) -> Optional[User]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(user)
                 self._logger.info(f"Created new user {user.id}")
-                session.commit()
-                session.refresh(user)
+                await session.flush()
+                await session.refresh(user)
                 return user
-            except Exception as e:
-                self._logger.error(f"Failed to create new user {user.id}: {e}")
-                return None
+        except Exception as e:
+            self._logger.error(f"Failed to create new user {user.id}: {e}")
+            return None
 
-    def create_admin(self, user: User) -> Optional[User]:
-        with SessionLocal() as session:
-            try:
+    async def create_admin(self, user: User) -> Optional[User]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 session.add(user)
                 self._logger.info(f"Created new admin {user.id}")
-                session.commit()
-                session.refresh(user)
+                await session.flush()
+                await session.refresh(user)
                 return user
-            except Exception as e:
-                self._logger.error(f"Failed to create new admin {user.id}: {e}")
-                return None
+        except Exception as e:
+            self._logger.error(f"Failed to create new admin {user.id}: {e}")
+            return None
 
 
-    def update(self, user: User) -> Optional[User]:
-        with SessionLocal() as session:
-            try:
+    async def update(self, user: User) -> Optional[User]:
+        try:
+            async with self._unit_of_work.transaction() as session:
                 statement = (
-                    select(User).where(User.id == user.id)
+                    select(User).where(User.id == user.id).execution_options(use_primary=True)
                 )
-                db_user = session.scalars(statement).one_or_none()
+                db_user = (await session.scalars(statement)).one_or_none()
                 if db_user is None:
                     self._logger.info(f"User {user.id} does not exist")
                     return None
@@ -58,41 +61,38 @@ class UserRepository(DefaultUserRepository):
                 db_user.modified_at = user.modified_at
                 db_user.created_by = user.created_by
                 db_user.modified_by = user.modified_by
-                session.commit()
-                session.refresh(db_user)
+                await session.flush()
+                await session.refresh(db_user)
                 return db_user
-            except Exception as e:
-                self._logger.error(f"Failed to update user {user.id}: {e}")
-                return None
+        except Exception as e:
+            self._logger.error(f"Failed to update user {user.id}: {e}")
+            return None
 
-    def get(self, id: UUID) -> Optional[User]:
-        with SessionLocal() as session:
-            try:
-                statement = (
-                    select(User).where(User.id == str(id))
-                )
-                user = session.scalars(statement).one_or_none()
-                return user
-            except Exception as e:
-                self._logger.error(f"Failed to get user {id}: {e}")
-                return None
+    async def get(self, id: UUID) -> Optional[User]:
+        session = self._unit_of_work.session
+        try:
+            statement = (
+                select(User).where(User.id == str(id))
+            )
+            user = (await session.scalars(statement)).one_or_none()
+            return user
+        except Exception as e:
+            self._logger.error(f"Failed to get user {id}: {e}")
+            return None
 
-    def get_by_email(self, email: str) -> Optional[User]:
-        with SessionLocal() as session:
-            try:
-                statement = (
-                    select(User).where(User.email == email)
-                )
-                user = session.scalars(statement).one_or_none()
-                return user
-            except Exception as e:
-                self._logger.error(f"Failed to get user {email}: {e}")
-                return None
+    async def get_by_email(self, email: str) -> Optional[User]:
+        session = self._unit_of_work.session
+        try:
+            statement = (
+                select(User).where(User.email == email)
+            )
+            user = (await session.scalars(statement)).one_or_none()
+            return user
+        except Exception as e:
+            self._logger.error(f"Failed to get user {email}: {e}")
+            return None
 
-    def list(self)-> List[User]:
-        with SessionLocal() as session:
-            db_users = session.scalars(select(User)).all()
-            users = []
-            for db_user in db_users:
-                users.append(db_user)
-            return users
+    async def list(self, limit: int, after: Optional[Cursor] = None) -> Tuple[List[User], Optional[str]]:
+        session = self._unit_of_work.session
+        db_users = (await session.scalars(paginate(select(User), User, limit, after))).all()
+        return next_page(db_users, limit)
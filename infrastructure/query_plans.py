@@ -0,0 +1,75 @@
+import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from application.persistence.report_repo import ReportRepository
+from application.persistence.sales_summary_repo import SalesSummaryRepository
+from infrastructure.unit_of_work import UnitOfWork
+
+# small lookup tables like products and users may be scanned, these may not
+CHECKED_TABLES = {"sales", "sale_items", "stock_entries", "daily_sales_summary", "daily_product_sales_summary"}
+
+
+class StatementCapture:
+    """
+        Records the statements sent through the engines it listens on, tagged
+        with the current label, so they can be EXPLAINed afterwards.
+    """
+
+    def __init__(self, *engines: AsyncEngine):
+        self.statements: List[Tuple[str, str, object]] = []
+        self.label = ""
+        self._engines = {engine.sync_engine for engine in engines}
+
+    def __enter__(self) -> "StatementCapture":
+        for sync_engine in self._engines:
+            event.listen(sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for sync_engine in self._engines:
+            event.remove(sync_engine, "before_cursor_execute", self)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        # plain INSERT ... VALUES has no plan worth checking
+        if not executemany and ("SELECT" in statement.upper() or statement.lstrip().upper().startswith(("UPDATE", "DELETE"))):
+            self.statements.append((self.label, statement, parameters))
+
+
+async def run_report_queries(capture: StatementCapture, reports: ReportRepository, sales_summary: SalesSummaryRepository,
+                             unit_of_work: UnitOfWork, low_stock_threshold: int, today: datetime.date) -> None:
+    """every report query once over the last 30 days, then a rollup rebuild of the last week that is rolled back"""
+    start = datetime.datetime.combine(today - datetime.timedelta(days=30), datetime.time())
+    end = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time())
+    calls = [
+        ("total sales", lambda: reports.get_total_sales(start, end)),
+        ("profit and loss", lambda: reports.get_profit_loss(start, end)),
+        ("sales status", lambda: reports.get_sales_status_counts()),
+        ("product performance", lambda: reports.get_product_performance()),
+        ("low stock", lambda: reports.get_low_stock_products(low_stock_threshold)),
+        ("inventory valuation", lambda: reports.get_inventory_valuation()),
+        ("inventory valuation as of", lambda: reports.get_inventory_valuation(start)),
+    ] + [
+        (f"timeseries by {bucket}", lambda bucket=bucket: reports.get_timeseries(start.date(), end.date(), bucket))
+        for bucket in ("day", "week", "month")
+    ]
+    for label, call in calls:
+        capture.label = label
+        await call()
+
+    capture.label = "rollup rebuild"
+    async with unit_of_work.transaction():
+        await sales_summary.rebuild(today - datetime.timedelta(days=7), today + datetime.timedelta(days=1))
+        unit_of_work.set_rollback_only()
+
+
+async def explain(connection: AsyncConnection, statements: List[Tuple[str, str, object]]) -> List[Tuple[str, Dict]]:
+    """the EXPLAIN rows of every statement that read one of the checked tables, with its label"""
+    plans = []
+    for label, statement, parameters in statements:
+        for row in (await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)).mappings().all():
+            if row["select_type"] != "INSERT" and row["table"] in CHECKED_TABLES:
+                plans.append((label, dict(row)))
+    return plans
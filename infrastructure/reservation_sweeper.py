@@ -0,0 +1,80 @@
+import asyncio
+import os
+import time
+from logging import Logger
+from typing import Awaitable, Callable, Dict, Optional
+
+from application.use_case.models.sale import ExpiredReservations
+
+RESERVATION_SWEEP_INTERVAL = float(os.getenv("RESERVATION_SWEEP_INTERVAL", "60"))
+
+SWEEPERS: Dict[str, "ReservationSweeper"] = {}
+
+
+class ReservationSweeper:
+    """
+        Background loop that periodically cancels unpaid sales whose
+        reservation expired and counts what it gave back to stock.
+    """
+
+    def __init__(self, logger: Logger, name: str = "reservations", interval: float = RESERVATION_SWEEP_INTERVAL):
+        self._logger = logger
+        self.name = name
+        self._interval = interval
+        self._worker: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.sales_cancelled = 0
+        self.units_released = 0
+        self.last_run_seconds = 0.0
+        SWEEPERS[name] = self
+
+    def start(self, sweep: Callable[[], Awaitable[ExpiredReservations]]) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(sweep))
+
+    async def stop(self) -> None:
+        if self._worker is None:
+            return
+        # a batch interrupted here rolls back as a whole and is swept again by the next run
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def run_once(self, sweep: Callable[[], Awaitable[ExpiredReservations]]) -> Optional[ExpiredReservations]:
+        started = time.monotonic()
+        try:
+            expired = await sweep()
+        except Exception as e:
+            self.failures += 1
+            self._logger.error(f"reservation sweep failed: {e}")
+            return None
+        finally:
+            self.runs += 1
+            self.last_run_seconds = time.monotonic() - started
+        self.sales_cancelled += expired.sales
+        self.units_released += expired.units
+        if expired.sales:
+            self._logger.info(f"cancelled {expired.sales} expired sales and released {expired.units} units")
+        return expired
+
+    async def _run(self, sweep: Callable[[], Awaitable[ExpiredReservations]]) -> None:
+        while True:
+            await self.run_once(sweep)
+            await asyncio.sleep(self._interval)
+
+    def snapshot(self) -> dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "sales_cancelled": self.sales_cancelled,
+            "units_released": self.units_released,
+            "last_run_seconds": round(self.last_run_seconds, 3),
+        }
+
+
+def sweeper_status() -> Dict[str, dict]:
+    return {name: sweeper.snapshot() for name, sweeper in SWEEPERS.items()}
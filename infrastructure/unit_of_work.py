@@ -0,0 +1,58 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class UnitOfWork:
+    """
+        Request scoped session shared by every repository used while handling
+        one request, so a request checks out connections once and its writes
+        can commit together.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self._session_factory = session_factory
+        self._session: Optional[AsyncSession] = None
+        self._depth = 0
+        self._rollback_only = False
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        """
+            Joins the surrounding transaction when there is one. Only the
+            outermost block commits, and it rolls back instead if any block
+            inside it failed.
+        """
+        session = self.session
+        self._depth += 1
+        try:
+            yield session
+        except BaseException:
+            self._rollback_only = True
+            raise
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                rollback_only, self._rollback_only = self._rollback_only, False
+                if rollback_only:
+                    await session.rollback()
+                else:
+                    await session.commit()
+
+    def set_rollback_only(self) -> None:
+        """make the outermost transaction roll back without raising"""
+        self._rollback_only = True
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._depth = 0
+        self._rollback_only = False
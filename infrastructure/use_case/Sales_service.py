@@ -1,124 +1,423 @@
+import asyncio
 import datetime
+import hashlib
+import json
+import os
+import time
+import uuid
 from logging import Logger
+from typing import Optional
 from uuid import UUID
 
+from application.persistence.idempotency_repo import IdempotencyRepository
+from application.persistence.payment_outbox_repo import PaymentOutboxRepository
 from application.persistence.product_repo import ProductRepository
+from application.persistence.reorder_forecast_repo import ReorderForecastRepository
 from application.persistence.sales_repo import SalesRepository
+from application.persistence.sales_summary_repo import SalesSummaryRepository
 from application.persistence.stock_entry import StockEntryRepository
 from application.use_case.models.base_response import BaseResponse
-from application.use_case.models.sale import CreateSaleRequest, CreateSaleResponse, VerifySaleResponse
+from application.use_case.models.sale import CreateSaleRequest, CreateSaleResponse, ExpiredReservations, PaymentEvent, PaymentStatusResponse, VerifySaleResponse
 from application.use_case.sales_service import SalesService as DefaultSaleService
-from domain.models import Sale, SaleItem
-from infrastructure.payment import PaystackService
+from domain.enums.outbox_status import OutboxStatus
+from domain.models import PaymentOutbox, Sale, SaleItem
+from infrastructure.cache import TTLCache
+from infrastructure.payment import DuplicateReference, PaystackService
+from infrastructure.payment_events import PaymentEventQueue
+from infrastructure.payment_outbox import PaymentOutboxDispatcher
+from infrastructure.unit_of_work import UnitOfWork
+
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+IDEMPOTENCY_POLL_INTERVAL = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", "0.25"))
+# unpaid sales hold their stock this long, leave room for the outbox retries and the customer's time on the checkout page
+SALE_RESERVATION_TTL_SECONDS = int(os.getenv("SALE_RESERVATION_TTL_SECONDS", "1800"))
+PAYMENT_DISPATCH_CONCURRENCY = int(os.getenv("PAYMENT_DISPATCH_CONCURRENCY", "10"))
+PAYMENT_OUTBOX_MAX_ATTEMPTS = int(os.getenv("PAYMENT_OUTBOX_MAX_ATTEMPTS", "5"))
+PAYMENT_OUTBOX_RETRY_BASE_DELAY = float(os.getenv("PAYMENT_OUTBOX_RETRY_BASE_DELAY", "2"))
+PAYMENT_OUTBOX_RETRY_MAX_DELAY = float(os.getenv("PAYMENT_OUTBOX_RETRY_MAX_DELAY", "60"))
 
 
 class SaleService(DefaultSaleService):
     _logger: Logger
+    _unit_of_work: UnitOfWork
     sale_repository: SalesRepository
     product_repository: ProductRepository
     stock_repository: StockEntryRepository
+    sales_summary_repository: SalesSummaryRepository
+    reorder_forecast_repository: ReorderForecastRepository
+    idempotency_repository: IdempotencyRepository
+    payment_outbox_repository: PaymentOutboxRepository
     paystack_service: PaystackService
+    _payment_events: PaymentEventQueue
+    _payment_dispatcher: PaymentOutboxDispatcher
+    _product_cache: TTLCache
 
-    def __init__(self, logger: Logger, sale_repository: SalesRepository, product_repository: ProductRepository, stock_repository: StockEntryRepository, paystack_service: PaystackService):
+    def __init__(self, logger: Logger, unit_of_work: UnitOfWork, sale_repository: SalesRepository, product_repository: ProductRepository, stock_repository: StockEntryRepository, sales_summary_repository: SalesSummaryRepository, reorder_forecast_repository: ReorderForecastRepository, idempotency_repository: IdempotencyRepository, payment_outbox_repository: PaymentOutboxRepository, paystack_service: PaystackService, payment_event_queue: PaymentEventQueue, payment_dispatcher: PaymentOutboxDispatcher, product_cache: TTLCache):
         self._logger = logger
+        self._unit_of_work = unit_of_work
         self._sale_repository = sale_repository
         self._product_repository = product_repository
         self._stock_entry = stock_repository
+        self._sales_summary = sales_summary_repository
+        self._reorder_forecast = reorder_forecast_repository
+        self._idempotency = idempotency_repository
+        self._payment_outbox = payment_outbox_repository
         self._paystack_service = paystack_service
+        self._payment_events = payment_event_queue
+        self._payment_dispatcher = payment_dispatcher
+        self._product_cache = product_cache
+
+    async def create(self, user_id: UUID, email: str, sale: CreateSaleRequest, idempotency_key: Optional[str] = None) -> BaseResponse:
+        if idempotency_key is None:
+            return await self._create(user_id, email, sale)
+
+        if not idempotency_key or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            response = BaseResponse(status=False, message=f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+            response._status_code= 400
+            return response
+        fingerprint = hashlib.sha256(json.dumps(sale.model_dump(mode="json"), sort_keys=True).encode()).hexdigest()
+
+        claimed = await self._idempotency.claim(user_id, idempotency_key, fingerprint)
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            if claimed is None:
+                response = BaseResponse(status=False, message="Could not check the Idempotency-Key, please retry")
+                response._status_code= 500
+                return response
+            record, created = claimed
+            if created:
+                break
+            if record.fingerprint != fingerprint:
+                response = BaseResponse(status=False, message="Idempotency-Key was already used with a different request")
+                response._status_code= 422
+                return response
+            if record.response_status is not None:
+                self._logger.info(f"Replaying sale response for idempotency key {idempotency_key}")
+                response = CreateSaleResponse.model_validate_json(record.response_body)
+                response._status_code = record.response_status
+                return response
+            # the first request is still running, waiting for it keeps the duplicate off the stock and the gateway
+            if time.monotonic() >= deadline:
+                response = BaseResponse(status=False, message="A request with this Idempotency-Key is still being processed")
+                response._status_code= 409
+                return response
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+            current = await self._idempotency.get(user_id, idempotency_key)
+            # gone means the first request failed and let the key go, so this one takes over
+            claimed = (current, False) if current else await self._idempotency.claim(user_id, idempotency_key, fingerprint)
 
-    def create(self, user_id: UUID, email: str, sale: CreateSaleRequest) -> BaseResponse:
+        try:
+            response = await self._create(user_id, email, sale)
+        except BaseException:
+            await self._idempotency.release(record)
+            raise
+        if response.status:
+            if not await self._idempotency.complete(record, response._status_code, response.model_dump_json()):
+                self._logger.error(f"Sale created but its response was not saved for idempotency key {idempotency_key}")
+        else:
+            # failures leave nothing behind, so the same key may be retried
+            await self._idempotency.release(record)
+        return response
+
+    async def _create(self, user_id: UUID, email: str, sale: CreateSaleRequest) -> BaseResponse:
         self._logger.info(f"Creating sale ")
-        total_amount = 0
-        sale_items = []
-        updates_to_stock = []
+        products = await self._product_repository.get_many(list({item.product_id for item in sale.items}))
+        products_by_id = {str(product.id): product for product in products}
 
         for item in sale.items:
-            product = self._product_repository.get(item.product_id)
+            product = products_by_id.get(str(item.product_id))
             if not product:
                 response = BaseResponse(status=False, message=f"Product {item.product_id} not found")
                 response._status_code= 400
                 return response
 
-            sorted_stock = sorted(product.stock_entries, key=lambda s: s.added_date)
-
-            total_available = sum(s.remaining_quantity for s in sorted_stock)
+            total_available = sum(s.remaining_quantity for s in product.stock_entries)
             if total_available < item.quantity:
                 response = BaseResponse(status=False, message=f"Not enough stock for product {item.product_id}")
                 response._status_code= 400
                 return response
 
-            quantity_to_fulfill = item.quantity
-            for stock_entry in sorted_stock:
-                if quantity_to_fulfill == 0:
-                    break
-                quantity_from_this_batch = min(quantity_to_fulfill, stock_entry.remaining_quantity)
+        # our own reference lets the sale and its stock be committed before the gateway is called
+        reference = uuid.uuid4().hex
+        total_amount = 0
+        sale_items = []
 
-                if quantity_from_this_batch > 0:
-                    total_amount += quantity_from_this_batch * stock_entry.selling_price
+        async with self._unit_of_work.transaction():
+            for item in sale.items:
+                reserved = await self._stock_entry.reserve_stock(product_id=item.product_id, quantity=item.quantity)
+                if reserved is None:
+                    response = BaseResponse(status=False, message=f"Not enough stock for product {item.product_id}")
+                    response._status_code= 400
+                    return response
 
-                    sale_items.append(SaleItem(product_id=product.id, quantity=quantity_from_this_batch, sale_price=stock_entry.selling_price))
+                for stock_entry, quantity in reserved:
+                    total_amount += quantity * stock_entry.selling_price
+                    sale_items.append(SaleItem(product_id=stock_entry.product_id, stock_entry_id=stock_entry.id, quantity=quantity, sale_price=stock_entry.selling_price, cost_price=stock_entry.cost_price))
 
-                    stock_entry.remaining_quantity -= quantity_from_this_batch
-                    updates_to_stock.append(stock_entry)
-                    quantity_to_fulfill -= quantity_from_this_batch
+            new_sale = Sale(customer_id=user_id, sale_date=datetime.datetime.now(datetime.timezone.utc), total_amount=total_amount, paid=False, payment_reference=reference, items=sale_items )
+            created_sale = await self._sale_repository.create(new_sale)
+            if not created_sale or not await self._sales_summary.record_created(created_sale):
+                self._logger.error(f"Failed to create sale for reference {reference}")
+                self._unit_of_work.set_rollback_only()
+                response = BaseResponse(status=False, message=f"Failed to create sale for reference {reference}")
+                response._status_code= 500
+                return response
+            # the gateway call is queued with the sale, so it can neither be lost nor made for a sale that never committed
+            outbox_entry = PaymentOutbox(reference=reference, sale_id=created_sale.id, customer_id=user_id, email=email, amount_in_kobo=int(total_amount * 100))
+            if not await self._payment_outbox.add(outbox_entry):
+                self._unit_of_work.set_rollback_only()
+                response = BaseResponse(status=False, message=f"Failed to create sale for reference {reference}")
+                response._status_code= 500
+                return response
+        # remaining quantities changed, cached product pages are stale once the reservation commits
+        self._product_cache.clear()
+        self._payment_dispatcher.notify()
+        self._logger.info(f"Created sale {created_sale.id}")
 
-        amount_in_kobo = int(total_amount * 100)
-        payment_response = self._paystack_service.initialize_transaction(email=email, amount_in_kobo=amount_in_kobo)
-        if not payment_response:
-            self._logger.error(f"Paystack transaction failed")
-            response = BaseResponse(status=False, message=f"Payment failed")
-            response._status_code= 400
-            return response
-        payment_data = payment_response["data"]
-        reference = payment_data["reference"]
-
-        new_sale = Sale(customer_id=user_id, sale_date=datetime.datetime.now(datetime.timezone.utc), total_amount=total_amount, paid=False, payment_reference=reference, items=sale_items )
-        created_sale = self._sale_repository.create(new_sale)
-        if not created_sale:
-            self._logger.error(f"Failed to create sale {created_sale.id}")
-            response = BaseResponse(status=False, message=f"Failed to create sale {created_sale.id}")
-            response._status_code= 500
+        response = CreateSaleResponse(status=True, message="Payment is being initialized", reference=reference, sale_id=created_sale.id, payment_status=OutboxStatus.Pending.value)
+        response._status_code = 202
+        return response
+
+    async def get_payment_status(self, user_id: UUID, reference: str) -> BaseResponse:
+        entry = await self._payment_outbox.get(reference)
+        if not entry or str(entry.customer_id) != str(user_id):
+            response = BaseResponse(status=False, message="Sale not found for this reference.")
+            response._status_code= 404
             return response
-        self._logger.info(f"Created sale {created_sale.id}")
-        stock_reduction = self._stock_entry.reduce_stock_for_sales(entries_to_reduce=updates_to_stock)
-        if not stock_reduction:
-            self._logger.error(f"Failed to reduce stock for sale {created_sale.id}")
-        response = CreateSaleResponse(status=True, authorization_url=payment_data["authorization_url"], access_code=payment_data["access_code"], reference=reference)
+        response = PaymentStatusResponse(
+            status=True,
+            message=entry.last_error if entry.status == OutboxStatus.Failed else None,
+            reference=reference,
+            payment_status=entry.status.value,
+            authorization_url=entry.authorization_url,
+            access_code=entry.access_code,
+        )
         response._status_code = 200
         return response
 
+    async def dispatch_payments(self, batch_size: int) -> int:
+        entries = await self._payment_outbox.claim_due(batch_size)
+        if not entries:
+            return 0
+
+        # the gateway calls overlap, the outbox writes stay sequential on the one session
+        semaphore = asyncio.Semaphore(PAYMENT_DISPATCH_CONCURRENCY)
+        async def initialize(entry: PaymentOutbox):
+            async with semaphore:
+                return await self._paystack_service.initialize_transaction(email=entry.email, amount_in_kobo=entry.amount_in_kobo, reference=entry.reference)
+        results = await asyncio.gather(*(initialize(entry) for entry in entries), return_exceptions=True)
+
+        for entry, result in zip(entries, results):
+            if isinstance(result, DuplicateReference):
+                # an attempt whose answer was lost already created the transaction, confirm it instead of failing the sale
+                self._logger.warning(f"Payment {entry.reference} was already initialized, verifying it")
+                result = await self._paystack_service.verify_transaction(entry.reference)
+            if isinstance(result, BaseException) or not result:
+                error = repr(result) if isinstance(result, BaseException) else "payment initialization failed"
+                if entry.attempts >= PAYMENT_OUTBOX_MAX_ATTEMPTS:
+                    await self._abandon(entry, error)
+                else:
+                    delay = min(PAYMENT_OUTBOX_RETRY_BASE_DELAY * 2 ** (entry.attempts - 1), PAYMENT_OUTBOX_RETRY_MAX_DELAY)
+                    self._logger.warning(f"Payment initialization for {entry.reference} failed on attempt {entry.attempts}, retrying in {delay}s")
+                    await self._payment_outbox.reschedule(entry.reference, delay, error)
+                continue
+            payment_data = result["data"]
+            # a verified transaction carries no checkout details, the checkout then sends the customer to verify
+            if not await self._payment_outbox.mark_initialized(entry.reference, payment_data.get("authorization_url"), payment_data.get("access_code")):
+                self._logger.error(f"Payment {entry.reference} was initialized but its checkout details were not saved")
+        return len(entries)
+
+    async def _abandon(self, entry: PaymentOutbox, error: str) -> None:
+        """gives the stock of a sale whose payment could not be started back and cancels the sale"""
+        async with self._unit_of_work.transaction():
+            # sale before outbox entry, the same order the reservation sweeper locks them in
+            sale = await self._sale_repository.get_by_reference(entry.reference, lock=True)
+            locked = await self._payment_outbox.lock(entry.reference)
+            # the lease may have lapsed while the gateway was being called, another dispatcher then owns the entry
+            if not locked or locked.status != OutboxStatus.Pending or locked.attempts != entry.attempts:
+                self._logger.info(f"Payment {entry.reference} moved on while it was being dispatched, not giving up on it")
+                return
+            if sale and sale.paid:
+                # paid through a checkout an earlier attempt opened, so the transaction exists
+                await self._payment_outbox.mark_initialized(entry.reference, None, None)
+                return
+            self._logger.error(f"Giving up on payment {entry.reference} after {entry.attempts} attempts: {error}")
+            if not await self._payment_outbox.mark_failed(entry.reference, error):
+                self._unit_of_work.set_rollback_only()
+                return
+            if not sale or sale.cancelled_at:
+                return
+            # cancelled rather than deleted, so snapshots pick the change up; the rollup keeps counting it as unpaid like an expired sale
+            if not await self._stock_entry.release_sale_items(sale.items) or not await self._sale_repository.cancel(sale):
+                self._logger.error(f"Failed to roll back sale {sale.id} after payment initialization failed")
+                self._unit_of_work.set_rollback_only()
+                return
+        self._product_cache.clear()
 
-    def verify_payment(self, reference: str) -> BaseResponse:
-        verification_data = self._paystack_service.verify_transaction(reference)
 
+    async def verify_payment(self, reference: str) -> BaseResponse:
+        sale = await self._sale_repository.get_by_reference(reference)
+        if not sale:
+            response =  BaseResponse(status=False, message="Sale not found for this reference.")
+            response._status_code= 400
+            return response
+
+        if sale.cancelled_at:
+            return self._cancelled(sale, confirmed=False)
+
+        # the webhook normally got here first, so a paid sale is answered without calling the gateway
+        if sale.paid:
+            response = VerifySaleResponse(status=True, message="Payment has already been verified.", sale_id=sale.id, payment_status="success")
+            response._status_code= 200
+            return response
+
+        verification_data = await self._paystack_service.verify_transaction(reference)
         if not verification_data:
             self._logger.error(f"Paystack verification failed")
             response = BaseResponse(status=False, message="Payment verification failed with gateway.")
             response._status_code= 400
             return response
 
+        payment_status = verification_data["data"].get("status")
+        if payment_status != "success":
+            self._logger.info(f"Payment for {reference} is {payment_status}")
+            response = BaseResponse(status=False, message=f"Payment has not been completed, status is {payment_status}.")
+            response._status_code= 400
+            return response
+
+        return await self._finalize(sale, verification_data["data"].get("amount"))
+
+    async def receive_webhook(self, body: bytes, signature: Optional[str]) -> BaseResponse:
+        if not self._paystack_service.verify_signature(body, signature):
+            self._logger.warning("Rejected a webhook with an invalid signature")
+            response = BaseResponse(status=False, message="Invalid signature")
+            response._status_code= 401
+            return response
+
+        try:
+            payload = json.loads(body)
+            event = payload["event"]
+            data = payload.get("data") or {}
+        except (ValueError, TypeError, KeyError):
+            response = BaseResponse(status=False, message="Malformed webhook payload")
+            response._status_code= 400
+            return response
+
+        if event != "charge.success" or not data.get("reference"):
+            response = BaseResponse(status=True, message="Event ignored")
+            response._status_code= 200
+            return response
 
-        sale = self._sale_repository.get_by_reference(reference)
+        # the sale is marked paid before paystack gets its 200, an acknowledged event is never redelivered
+        finalized = await self.finalize_payment(data["reference"], data.get("amount"))
+        if finalized._status_code >= 500:
+            # a non 2xx makes paystack deliver the event again later
+            response = BaseResponse(status=False, message="Could not apply the payment, retry later")
+            response._status_code= 503
+            return response
+        # an unknown reference, a cancelled sale or a wrong amount will not change on redelivery, they were logged for follow up
+        response = BaseResponse(status=True, message="Event received")
+        response._status_code= 200
+        return response
+
+    async def expire_reservations(self, batch_size: int) -> ExpiredReservations:
+        created_before = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=SALE_RESERVATION_TTL_SECONDS)
+        expired = ExpiredReservations()
+        while True:
+            # one transaction per batch: the sales, their stock and the outbox move together.
+            # the rollup is left alone, a cancelled sale still counts as unpaid in the status report
+            async with self._unit_of_work.transaction():
+                cancelled = await self._sale_repository.cancel_unpaid(created_before, batch_size)
+                if not cancelled:
+                    break
+                units = await self._stock_entry.release_sales([sale_id for sale_id, _, _ in cancelled])
+                if units is None or not await self._payment_outbox.mark_expired([reference for _, reference, _ in cancelled]):
+                    self._logger.error("Failed to release an expired reservation batch, it will be retried")
+                    self._unit_of_work.set_rollback_only()
+                    break
+            expired.sales += len(cancelled)
+            expired.units += units
+            self._product_cache.clear()
+            if len(cancelled) < batch_size:
+                break
+        return expired
+
+    async def finalize_payment(self, reference: str, amount_in_kobo: Optional[int] = None) -> BaseResponse:
+        sale = await self._sale_repository.get_by_reference(reference)
         if not sale:
+            self._logger.error(f"Payment confirmed for unknown reference {reference}")
             response =  BaseResponse(status=False, message="Sale not found for this reference.")
             response._status_code= 400
             return response
-
+        if sale.cancelled_at:
+            return self._cancelled(sale, confirmed=True)
         if sale.paid:
-            self._logger.error(f"Sale has already been verified")
             response = VerifySaleResponse(status=True, message="Payment has already been verified.", sale_id=sale.id, payment_status="success")
             response._status_code= 200
             return response
+        return await self._finalize(sale, amount_in_kobo)
 
-        sale.paid = True
-        self._sale_repository.update(sale=sale)
+    async def record_paid_sale(self, reference: str) -> bool:
+        sale = await self._sale_repository.get_by_reference(reference)
+        if not sale or not sale.paid:
+            self._logger.error(f"Sale {reference} is not paid, it was not added to the reorder forecast")
+            return False
+        if not await self._reorder_forecast.record_sale(sale):
+            self._logger.warning(f"Sale {reference} was not added to the reorder forecast")
+            return False
+        return True
+
+    def _cancelled(self, sale: Sale, confirmed: bool) -> BaseResponse:
+        # the stock went back when the reservation expired or the payment could not be started, so a payment can no longer complete this sale
+        if confirmed:
+            self._logger.error(f"Payment confirmed for sale {sale.payment_reference} cancelled at {sale.cancelled_at}, it needs a refund")
+        response = BaseResponse(status=False, message="This sale was cancelled before payment was confirmed.")
+        response._status_code= 409
+        return response
 
+    async def _finalize(self, sale: Sale, amount_in_kobo: Optional[int]) -> BaseResponse:
+        reference = sale.payment_reference
+        if amount_in_kobo is not None and amount_in_kobo != int(sale.total_amount * 100):
+            self._logger.error(f"Paid amount {amount_in_kobo} does not match sale {reference} total {sale.total_amount}")
+            response = BaseResponse(status=False, message="Paid amount does not match the sale total.")
+            response._status_code= 400
+            return response
+
+        async with self._unit_of_work.transaction():
+            marked = await self._sale_repository.mark_paid(reference)
+            if marked is None:
+                self._unit_of_work.set_rollback_only()
+                self._logger.error(f"Failed to mark sale {reference} paid")
+                response = BaseResponse(status=False, message="Failed to finalize sale, please retry verification.")
+                response._status_code= 500
+                return response
+            if not marked:
+                current = await self._sale_repository.get_by_reference(reference)
+                if current and current.cancelled_at:
+                    return self._cancelled(current, confirmed=True)
+                self._logger.info(f"Sale {reference} was verified concurrently")
+                response = VerifySaleResponse(status=True, message="Payment has already been verified.", sale_id=sale.id, payment_status="success")
+                response._status_code= 200
+                return response
+            # the rollup moves in the same transaction as the paid flag, so reports never double count
+            if not await self._sales_summary.record_paid(sale):
+                self._unit_of_work.set_rollback_only()
+                self._logger.error(f"Failed to finalize sale for reference: {reference}")
+                response = BaseResponse(status=False, message="Failed to finalize sale, please retry verification.")
+                response._status_code= 500
+                return response
+
+        # the forecast is advisory, it is kept off the payment path and the rebuild command repairs a missed sale
+        if not self._payment_events.enqueue(PaymentEvent(reference=reference)):
+            self._logger.warning(f"Sale {reference} was not queued for the reorder forecast")
         self._logger.info(f"Payment verified and sale finalized for reference: {reference}")
         response =  VerifySaleResponse(
             status=True,
             message="Payment successful and sale finalized.",
             sale_id=sale.id,
-            payment_status=verification_data["data"].get("status")
+            payment_status="success"
         )
         response._status_code = 200
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,29 @@
+from logging import Logger
+
+from application.use_case.metrics_service import MetricsService as DefaultMetricsService
+from application.use_case.models.base_response import BaseResponse
+from application.use_case.models.metrics import MetricsReport, DatabasePoolMetrics, CacheMetrics, CircuitBreakerMetrics, SweeperMetrics
+from infrastructure.cache import cache_status
+from infrastructure.circuit_breaker import breaker_status
+from infrastructure.database import engine, replica_engine, pool_status
+from infrastructure.reservation_sweeper import sweeper_status
+
+
+class MetricsService(DefaultMetricsService):
+    _logger: Logger
+
+    def __init__(self, logger: Logger):
+        self._logger = logger
+
+    async def get_metrics(self) -> BaseResponse:
+        self._logger.info("getting runtime metrics")
+        response = MetricsReport(
+            status=True,
+            database_pool=DatabasePoolMetrics(**pool_status(engine)),
+            replica_pool=DatabasePoolMetrics(**pool_status(replica_engine)),
+            caches={name: CacheMetrics(**status) for name, status in cache_status().items()},
+            circuit_breakers={name: CircuitBreakerMetrics(**status) for name, status in breaker_status().items()},
+            sweepers={name: SweeperMetrics(**status) for name, status in sweeper_status().items()},
+        )
+        response._status_code = 200
+        return response
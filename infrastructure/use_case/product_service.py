@@ -1,4 +1,5 @@
 from logging import Logger
+from typing import Optional
 from uuid import UUID
 
 from application.persistence.product_repo import ProductRepository
@@ -8,19 +9,23 @@ from application.use_case.models.product import UpdateProduct
 from application.use_case.models.stock_entry import GetStockResponse
 from application.use_case.product_service import ProductService as DefaultProductService
 from domain.models import Product
+from infrastructure.cache import MISSING, TTLCache
+from infrastructure.pagination import decode_cursor
 
 
 class ProductService(DefaultProductService):
     _logger: Logger
     _product_repository: ProductRepository
+    _product_cache: TTLCache
 
-    def __init__(self, logger: Logger, product_repository: ProductRepository):
+    def __init__(self, logger: Logger, product_repository: ProductRepository, product_cache: TTLCache):
         self._logger = logger
         self._product_repository = product_repository
+        self._product_cache = product_cache
 
-    def create(self, product: CreateProduct) -> BaseResponse:
+    async def create(self, product: CreateProduct) -> BaseResponse:
         self._logger.info(f"adding product {product.name} ")
-        product_exist = self._product_repository.get_by_name(product.name)
+        product_exist = await self._product_repository.get_by_name(product.name)
         if product_exist:
             self._logger.warning(f"{product.name} already exist in the database")
             response = BaseResponse(status=False, message=f"{product.name} already exist in database")
@@ -28,20 +33,21 @@ class ProductService(DefaultProductService):
             return response
 
         product = Product(name=product.name, description=product.description, image=product.image)
-        product = self._product_repository.create(product)
+        product = await self._product_repository.create(product)
         if not product:
             self._logger.error(f"error adding {product.name}")
             response = BaseResponse(status=False, message=f"error adding {product.name}")
             response._status_code = 500
             return response
+        self._product_cache.clear()
         self._logger.info(f"{product.name} added to database succesfully")
         response = CreateProductResponse(status=True, name=product.name, description=product.description, image=product.image)
         response._status_code = 200
         return response
 
 
-    def update(self, name: str, product: UpdateProduct ) -> BaseResponse:
-        product_exist = self._product_repository.get_by_name(name=name)
+    async def update(self, name: str, product: UpdateProduct ) -> BaseResponse:
+        product_exist = await self._product_repository.get_by_name(name=name)
         if not product_exist:
             self._logger.warning(f"{name} does not exist in database")
             response = BaseResponse(status=False, message=f"{name} does not exist in database")
@@ -50,19 +56,20 @@ class ProductService(DefaultProductService):
         product_exist.description = product.description
         product_exist.image = product.image
 
-        product_update = self._product_repository.update(name=product_exist.name, product=product_exist)
+        product_update = await self._product_repository.update(name=product_exist.name, product=product_exist)
         if not product_update:
             self._logger.error(f"error updating {product_exist.name} in database")
             response = BaseResponse(status= False, message=f"error updating {product_exist.name} in database")
             response._status_code = 500
             return response
+        self._product_cache.clear()
         self._logger.info(f"{product_exist.name} updated succesfully")
         response = CreateProductResponse(status=True, name=product_exist.name, description=product_exist.description, image=product_exist.image)
         response._status_code = 200
         return response
 
-    def get(self, id: UUID) -> BaseResponse:
-        product_exist = self._product_repository.get(id=id)
+    async def get(self, id: UUID) -> BaseResponse:
+        product_exist = await self._product_repository.get(id=id)
         if not product_exist:
             self._logger.warning(f"product not in database")
             response = BaseResponse(status=False, message=f"product not in database")
@@ -88,8 +95,13 @@ class ProductService(DefaultProductService):
         return response
 
 
-    def get_by_name(self, name: str) -> BaseResponse:
-        product_exist = self._product_repository.get_by_name(name)
+    async def get_by_name(self, name: str) -> BaseResponse:
+        cache_key = ("name", name)
+        cached = self._product_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+        generation = self._product_cache.generation
+        product_exist = await self._product_repository.get_by_name(name)
         if not product_exist:
             self._logger.warning(f"product not in database")
             response = BaseResponse(status=False, message="product not in database")
@@ -112,29 +124,42 @@ class ProductService(DefaultProductService):
         self._logger.info(f"{product_exist.name} deatils below")
         response = GetResponse(status=True, id=product_exist.id, name=product_exist.name, description=product_exist.description, stock_items=stock_items, image=product_exist.image)
         response._status_code = 200
+        self._product_cache.set(cache_key, response, generation)
         return response
 
-    def list(self) -> BaseResponse:
-        products = self._product_repository.list()
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            self._logger.warning(f"invalid product cursor {cursor}")
+            response = BaseResponse(status=False, message="invalid cursor")
+            response._status_code = 400
+            return response
+        cache_key = ("list", limit, after)
+        cached = self._product_cache.get(cache_key)
+        if cached is not MISSING:
+            return cached
+        generation = self._product_cache.generation
+        products, next_cursor = await self._product_repository.list_rows(limit=limit, after=after)
+        # plain dicts validated once as a whole page, not a model per product and stock row
         products_dbs = []
-        for product in products:
+        for product, stocks in products:
             stock_items = []
             remaining_quantity = 0
-            for stock in product.stock_entries:
+            for stock in stocks:
                 remaining_quantity +=stock.remaining_quantity
-                stock_item = GetStockResponse(
-                    status=True,
-                    quantity=stock.quantity,
-                    cost_price=stock.cost_price,
-                    selling_price=stock.selling_price,
-                    added_date=str(stock.added_date),
-                    remaining_quantity=remaining_quantity
-                )
-                stock_items.append(stock_item)
-            product_list  = GetResponse(status=True, id=product.id ,name=product.name, description=product.description, stock_items=stock_items, image=product.image)
-            products_dbs.append(product_list)
+                stock_items.append({
+                    "status": True,
+                    "quantity": stock.quantity,
+                    "cost_price": stock.cost_price,
+                    "selling_price": stock.selling_price,
+                    "added_date": str(stock.added_date),
+                    "remaining_quantity": remaining_quantity,
+                })
+            products_dbs.append({"status": True, "id": product.id, "name": product.name, "description": product.description, "stock_items": stock_items, "image": product.image})
 
         self._logger.info("list of products below")
-        response = List(status=True, products=products_dbs)
+        response = List(status=True, products=products_dbs, next_cursor=next_cursor)
         response._status_code = 200
+        self._product_cache.set(cache_key, response, generation)
         return response
\ No newline at end of file
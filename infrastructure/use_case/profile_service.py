@@ -7,6 +7,7 @@ from application.use_case.models.profile import CreateProfileResponse, Get, GetR
     UpdateResponse
 from application.use_case.profile_service import ProfileService as DefaultProfileService
 from domain.models import Profile, User
+from infrastructure.pagination import decode_cursor
 
 
 class ProfileService(DefaultProfileService):
@@ -17,9 +18,9 @@ class ProfileService(DefaultProfileService):
         self._logger = logger
         self._profile_repository = profile_repository
 
-    def create(self, user_id: str, profile: Profile) -> BaseResponse:
+    async def create(self, user_id: str, profile: Profile) -> BaseResponse:
         self._logger.info(f"creating a profile with user id {user_id}")
-        profile_exist = self._profile_repository.get(user_id=user_id)
+        profile_exist = await self._profile_repository.get(user_id=user_id)
 
         if profile_exist:
             self._logger.warning(f"profile with user id {user_id} already exist")
@@ -29,7 +30,7 @@ class ProfileService(DefaultProfileService):
 
         db_profile = Profile(user_id=user_id, first_name=profile.first_name, last_name=profile.last_name,
                              middle_name=profile.middle_name, phone_number=profile.phone_number)
-        db_profile = self._profile_repository.create(db_profile)
+        db_profile = await self._profile_repository.create(db_profile)
         if not db_profile:
             self._logger.error(f"error occured while crioyuueating profile with user id {user_id}")
             response = BaseResponse(status=False,
@@ -43,8 +44,8 @@ class ProfileService(DefaultProfileService):
         response._status_code = 200
         return response
 
-    def update(self, user_id: str,  profile: Update) -> BaseResponse:
-        profile_exist = self._profile_repository.get(user_id=user_id)
+    async def update(self, user_id: str,  profile: Update) -> BaseResponse:
+        profile_exist = await self._profile_repository.get(user_id=user_id)
         if not profile_exist:
             self._logger.warning(f"profile with user id {user_id} does not exist")
             response = BaseResponse(status=False, message=f"profile with user id {user_id} does not exist")
@@ -56,7 +57,7 @@ class ProfileService(DefaultProfileService):
         profile_exist.middle_name = profile.middle_name
         profile_exist.phone_number = profile.phone_number
 
-        update_profile = self._profile_repository.update(user_id, profile_exist)
+        update_profile = await self._profile_repository.update(user_id, profile_exist)
         if not update_profile:
             self._logger.error(f"error occured while updating profile with user id {user_id}")
             response = BaseResponse(status=False, message=f"error occured while updating profile of user id {user_id}")
@@ -70,8 +71,8 @@ class ProfileService(DefaultProfileService):
         response._status_code = 200
         return response
 
-    def get(self, user_id: UUID) -> BaseResponse:
-        profile_exist = self._profile_repository.get(user_id=user_id)
+    async def get(self, user_id: UUID) -> BaseResponse:
+        profile_exist = await self._profile_repository.get(user_id=user_id)
         if not profile_exist:
             self._logger.warning(f"profile with user id {user_id} does not exist")
             response = BaseResponse(status=False, message=f"profile with user id {user_id} does not exist")
@@ -86,13 +87,20 @@ class ProfileService(DefaultProfileService):
         response._status_code = 200
         return response
 
-    def list(self) -> BaseResponse:
-        profiles = self._profile_repository.list()
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            self._logger.warning(f"invalid profile cursor {cursor}")
+            response = BaseResponse(status=False, message="invalid cursor")
+            response._status_code = 400
+            return response
+        profiles, next_cursor = await self._profile_repository.list(limit=limit, after=after)
 
         profile_responses = [
             CreateProfileResponse(status=True, **profile_dict)
             for profile_dict in profiles
         ]
         self._logger.info(f"list of profiles fetched")
-        response = ListResponse(status=True, profiles=profile_responses)
+        response = ListResponse(status=True, profiles=profile_responses, next_cursor=next_cursor)
         return response
@@ -1,22 +1,57 @@
-from datetime import datetime, timedelta
+import csv
+import io
+import json
+import math
+import os
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from logging import Logger
-from typing import Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from uuid import UUID
 
+import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
+
+from application.persistence.analytics_repo import AnalyticsRepository
+from application.persistence.reorder_forecast_repo import ReorderForecastRepository
 from application.persistence.report_repo import ReportRepository
+from application.persistence.sales_export_repo import SalesExportRepository
 from application.use_case.models.base_response import BaseResponse
 from application.use_case.models.report import SalesReport, ProfitLossReport, SalesStatusReport, \
-    ProductPerformanceReport, ProductPerformance, LowStockAlert, LowStockReport
+    ProductPerformanceReport, ProductPerformance, LowStockAlert, LowStockReport, TimeBucket, TimeSeriesPoint, \
+    TimeSeriesReport, ExportFormat, MarginBand, ProductMargin, MarginDistributionReport, SellThrough, SellThroughReport, \
+    AbcClass, AbcProduct, AbcReport, InventoryValuation, InventoryValuationReport, ReorderSettings, ReorderForecast, \
+    ReorderForecastReport
 from application.use_case.report_service import ReportService as DefaultReportService
+from infrastructure import analytics
+from infrastructure.analytics import SaleItemArrays
+from infrastructure.pagination import decode_cursor
+from infrastructure.persistence.reorder_forecast_repo import WINDOWS, decay, utc_now
+from infrastructure.persistence.sales_export_repo import SALE_LINE_COLUMNS
+
+
+MAX_TIMESERIES_POINTS = 1000
+EXPORT_BATCH_SIZE = 1000
+ANALYTICS_BATCH_SIZE = 10000
+ANALYTICS_MAX_DAYS = 366
+LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", "5"))
+REORDER_LEAD_TIME_DAYS = int(os.getenv("REORDER_LEAD_TIME_DAYS", "7"))
+REORDER_COVER_DAYS = int(os.getenv("REORDER_COVER_DAYS", "14"))
 
 
 class ReportService(DefaultReportService):
     _logger: Logger
     report_repository: ReportRepository
+    sales_export_repository: SalesExportRepository
+    analytics_repository: AnalyticsRepository
+    reorder_forecast_repository: ReorderForecastRepository
 
-    def __init__(self, logger: Logger, report_repository: ReportRepository):
+    def __init__(self, logger: Logger, report_repository: ReportRepository, sales_export_repository: SalesExportRepository, analytics_repository: AnalyticsRepository, reorder_forecast_repository: ReorderForecastRepository):
         self._logger = logger
         self._report_repository = report_repository
+        self._sales_export_repository = sales_export_repository
+        self._analytics_repository = analytics_repository
+        self._reorder_forecast_repository = reorder_forecast_repository
 
     def _get_date_range(self, year: int, month: Optional[int] = None, day: Optional[int] = None):
         self._logger.info("getting date range")
@@ -36,10 +71,10 @@ class ReportService(DefaultReportService):
         return start_date, end_date, period_str
 
 
-    def get_sales_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
+    async def get_sales_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
         start_date, end_date, period_str = self._get_date_range(year, month, day)
         self._logger.info("getting sales report")
-        total_sales = self._report_repository.get_total_sales(start_date=start_date, end_date=end_date)
+        total_sales = await self._report_repository.get_total_sales(start_date=start_date, end_date=end_date)
         if total_sales == 0:
             self._logger.info("no sales found for that period")
         self._logger.info(f"total sales: {total_sales}")
@@ -48,9 +83,9 @@ class ReportService(DefaultReportService):
         return response
 
 
-    def get_product_performance_report(self) -> BaseResponse:
+    async def get_product_performance_report(self) -> BaseResponse:
         self._logger.info("getting product performance report")
-        performance_data = self._report_repository.get_product_performance()
+        performance_data = await self._report_repository.get_product_performance()
         if not performance_data:
             self._logger.info("no product performance data")
             response = BaseResponse(status=True, message="no product performance data")
@@ -64,9 +99,9 @@ class ReportService(DefaultReportService):
         return response
 
 
-    def get_low_stock_alerts(self, threshold: int) -> BaseResponse:
+    async def get_low_stock_alerts(self, threshold: int) -> BaseResponse:
         self._logger.info("getting low stock alerts")
-        low_stock_products = self._report_repository.get_low_stock_products(threshold=threshold)
+        low_stock_products = await self._report_repository.get_low_stock_products(threshold=threshold)
         response = [
             LowStockAlert(product_id=p[0], product_name=p[1], total_remaining_quantity=p[2])
             for p in low_stock_products
@@ -83,23 +118,328 @@ class ReportService(DefaultReportService):
         return response
 
 
-    def get_profit_loss_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
+    async def get_inventory_valuation(self, as_of: Optional[date] = None) -> BaseResponse:
+        self._logger.info(f"getting inventory valuation as of {as_of or 'now'}")
+        if as_of and as_of > date.today():
+            response = BaseResponse(status=False, message="as_of must not be in the future")
+            response._status_code = 400
+            return response
+
+        as_of_end = datetime.combine(as_of + timedelta(days=1), datetime.min.time()) if as_of else None
+        rows = await self._report_repository.get_inventory_valuation(as_of=as_of_end)
+        products = [
+            InventoryValuation(
+                product_id=row[0],
+                product_name=row[1],
+                units=int(row[2]),
+                cost_value=row[3],
+                retail_value=row[4],
+                potential_margin=row[4] - row[3],
+            )
+            for row in rows
+        ]
+        total_cost = sum((p.cost_value for p in products), Decimal(0))
+        total_retail = sum((p.retail_value for p in products), Decimal(0))
+        response = InventoryValuationReport(
+            status=True,
+            as_of=as_of,
+            total_units=sum(p.units for p in products),
+            total_cost_value=total_cost,
+            total_retail_value=total_retail,
+            total_potential_margin=total_retail - total_cost,
+            products=products,
+        )
+        response._status_code = 200
+        return response
+
+
+    async def get_profit_loss_report(self, year: int, month: Optional[int] = None, day: Optional[int] = None) -> BaseResponse:
         start_date, end_date, period_str = self._get_date_range(year, month, day)
-        total_revenue, total_cost = self._report_repository.get_profit_loss(start_date=start_date, end_date=end_date)
+        total_revenue, total_cost, uncosted_revenue = await self._report_repository.get_profit_loss(start_date=start_date, end_date=end_date)
         self._logger.info("profit loss report: {}".format(total_revenue))
-        net_profit = total_revenue - total_cost
+        # sales of items with no recorded cost would show as pure profit, leave them out
+        net_profit = total_revenue - uncosted_revenue - total_cost
         if total_revenue == 0 and total_cost == 0:
             response = ProfitLossReport(status=True, net_profit=Decimal(0), total_revenue=Decimal(0), total_cost=Decimal(0), period=period_str, message="no profit/loss for the selected period")
             response._status_code = 200
             return response
-        response = ProfitLossReport(status=True, total_revenue=total_revenue, total_cost=total_cost, period=period_str, net_profit=net_profit)
+        message = "net profit leaves out sales of items with no recorded cost" if uncosted_revenue else None
+        response = ProfitLossReport(status=True, total_revenue=total_revenue, total_cost=total_cost, uncosted_revenue=uncosted_revenue, period=period_str, net_profit=net_profit, message=message)
         response._status_code = 200
         return response
 
 
-    def get_sales_status_report(self) -> BaseResponse:
+    async def get_sales_status_report(self) -> BaseResponse:
         self._logger.info("getting sales status report")
-        successful, unsuccessful = self._report_repository.get_sales_status_counts()
+        successful, unsuccessful = await self._report_repository.get_sales_status_counts()
         response = SalesStatusReport(status=True, successful_sales=successful, unsuccessful_sales=unsuccessful)
         response._status_code = 200
-        return response
\ No newline at end of file
+        return response
+
+
+    @staticmethod
+    def _bucket_start(day: date, bucket: TimeBucket) -> date:
+        if bucket == TimeBucket.week:
+            return day - timedelta(days=day.weekday())
+        if bucket == TimeBucket.month:
+            return day.replace(day=1)
+        return day
+
+    @staticmethod
+    def _next_bucket(day: date, bucket: TimeBucket) -> date:
+        if bucket == TimeBucket.week:
+            return day + timedelta(days=7)
+        if bucket == TimeBucket.month:
+            return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return day + timedelta(days=1)
+
+
+    async def get_sales_timeseries(self, start: date, end: date, bucket: TimeBucket) -> BaseResponse:
+        self._logger.info(f"getting {bucket.value} sales time series from {start} to {end}")
+        if end < start:
+            response = BaseResponse(status=False, message="end must not be before start")
+            response._status_code = 400
+            return response
+
+        periods = []
+        period = self._bucket_start(start, bucket)
+        while period <= end:
+            periods.append(period)
+            if len(periods) > MAX_TIMESERIES_POINTS:
+                response = BaseResponse(status=False, message=f"range has more than {MAX_TIMESERIES_POINTS} {bucket.value} buckets")
+                response._status_code = 400
+                return response
+            period = self._next_bucket(period, bucket)
+
+        rows = await self._report_repository.get_timeseries(start=start, end=end + timedelta(days=1), bucket=bucket.value)
+        totals = {row[0]: row for row in rows}
+        points = []
+        # buckets without sales are filled with zeros so the chart keeps an even axis
+        for period in periods:
+            row = totals.get(period)
+            points.append(TimeSeriesPoint(
+                period_start=period,
+                revenue=row[1] if row else Decimal(0),
+                cost=row[2] if row else Decimal(0),
+                orders=int(row[3]) if row else 0,
+                units=int(row[4]) if row else 0,
+                uncosted_revenue=row[5] if row else Decimal(0),
+            ))
+        response = TimeSeriesReport(status=True, bucket=bucket, start=start, end=end, points=points)
+        response._status_code = 200
+        return response
+
+
+    async def export_sales(self, start: date, end: date, format: ExportFormat) -> AsyncIterator[str]:
+        self._logger.info(f"exporting sales from {start} to {end} as {format.value}")
+        start_at = datetime.combine(start, datetime.min.time())
+        end_at = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        if format == ExportFormat.csv:
+            yield ",".join(SALE_LINE_COLUMNS) + "\r\n"
+        exported = 0
+        try:
+            # one text chunk per fetched batch keeps memory flat whatever the range
+            async for rows in self._sales_export_repository.stream_sale_lines(start=start_at, end=end_at, batch_size=EXPORT_BATCH_SIZE):
+                if format == ExportFormat.csv:
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(rows)
+                    yield buffer.getvalue()
+                else:
+                    yield "".join(json.dumps(dict(zip(SALE_LINE_COLUMNS, row)), default=str) + "\n" for row in rows)
+                exported += len(rows)
+        except Exception as e:
+            # headers are already sent, all that is left is to cut the stream short and log it
+            self._logger.error(f"sales export failed after {exported} rows: {e}")
+            raise
+        self._logger.info(f"exported {exported} sale lines")
+
+
+    @staticmethod
+    def _kobo(amount) -> Decimal:
+        return Decimal(int(amount)).scaleb(-2)
+
+    async def _load_sale_items(self, start: date, end: date) -> Union[BaseResponse, Tuple[List[Tuple], SaleItemArrays]]:
+        if end < start:
+            response = BaseResponse(status=False, message="end must not be before start")
+            response._status_code = 400
+            return response
+        if (end - start).days >= ANALYTICS_MAX_DAYS:
+            response = BaseResponse(status=False, message=f"range is longer than {ANALYTICS_MAX_DAYS} days")
+            response._status_code = 400
+            return response
+
+        products = await self._analytics_repository.get_products()
+        product_index = {product[0]: index for index, product in enumerate(products)}
+        start_at = datetime.combine(start, datetime.min.time())
+        end_at = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        try:
+            items = await analytics.load_sale_items(
+                self._analytics_repository.stream_sale_items(start=start_at, end=end_at, batch_size=ANALYTICS_BATCH_SIZE),
+                product_index,
+            )
+        except (SQLAlchemyError, KeyError) as e:
+            self._logger.error(f"error loading sale items from {start} to {end}: {e}")
+            response = BaseResponse(status=False, message="could not load sales for the period")
+            response._status_code = 500
+            return response
+        self._logger.info(f"loaded {len(items)} sale items for {len(products)} products")
+        return products, items
+
+
+    async def get_margin_distribution(self, start: date, end: date, band_width: float) -> BaseResponse:
+        self._logger.info(f"getting margin distribution from {start} to {end}")
+        loaded = await self._load_sale_items(start, end)
+        if isinstance(loaded, BaseResponse):
+            return loaded
+        products, items = loaded
+
+        margins = analytics.unit_margins(items)
+        edges, units = analytics.margin_histogram(margins, items.quantity, band_width)
+        bands = [
+            MarginBand(lower_percent=float(edges[i]), upper_percent=float(edges[i + 1]), units=int(units[i]))
+            for i in np.flatnonzero(units)
+        ]
+        median = analytics.weighted_percentile(margins, items.quantity, 0.5)
+
+        _, revenue, cost = analytics.product_totals(items, len(products))
+        uncosted = analytics.uncosted_revenue(items, len(products))
+        costed = revenue - uncosted
+        product_margins = []
+        for i in np.argsort(-revenue, kind="stable"):
+            if revenue[i] == 0:
+                continue
+            product_margins.append(ProductMargin(
+                product_id=products[i][0],
+                product_name=products[i][1],
+                revenue=self._kobo(revenue[i]),
+                cost=self._kobo(cost[i]),
+                uncosted_revenue=self._kobo(uncosted[i]),
+                margin_percent=round(float((costed[i] - cost[i]) * 100 / costed[i]), 2) if costed[i] else None,
+            ))
+
+        response = MarginDistributionReport(
+            status=True,
+            start=start,
+            end=end,
+            median_margin_percent=None if np.isnan(median) else round(median, 2),
+            bands=bands,
+            products=product_margins,
+        )
+        response._status_code = 200
+        return response
+
+
+    async def get_sell_through(self, start: date, end: date) -> BaseResponse:
+        self._logger.info(f"getting sell-through from {start} to {end}")
+        loaded = await self._load_sale_items(start, end)
+        if isinstance(loaded, BaseResponse):
+            return loaded
+        products, items = loaded
+
+        units, _, _ = analytics.product_totals(items, len(products))
+        on_hand = np.fromiter((product[2] for product in products), dtype=np.int64, count=len(products))
+        available = units + on_hand
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # share of what was available over the period that actually sold
+            rate = np.where(available > 0, units * 100.0 / available, 0.0)
+        velocity = units / ((end - start).days + 1)
+        latest = analytics.last_sold(items, len(products))
+
+        rows = []
+        for i in np.argsort(-rate, kind="stable"):
+            rows.append(SellThrough(
+                product_id=products[i][0],
+                product_name=products[i][1],
+                units_sold=int(units[i]),
+                units_on_hand=int(on_hand[i]),
+                sell_through_percent=round(float(rate[i]), 2),
+                units_per_day=round(float(velocity[i]), 3),
+                last_sold_at=None if np.isnat(latest[i]) else latest[i].astype(datetime),
+            ))
+        response = SellThroughReport(status=True, start=start, end=end, products=rows)
+        response._status_code = 200
+        return response
+
+
+    async def get_abc_classification(self, start: date, end: date) -> BaseResponse:
+        self._logger.info(f"getting abc classification from {start} to {end}")
+        loaded = await self._load_sale_items(start, end)
+        if isinstance(loaded, BaseResponse):
+            return loaded
+        products, items = loaded
+
+        _, revenue, _ = analytics.product_totals(items, len(products))
+        order, share, cumulative, classes = analytics.abc_classes(revenue)
+        rows = [
+            AbcProduct(
+                product_id=products[i][0],
+                product_name=products[i][1],
+                revenue=self._kobo(revenue[i]),
+                revenue_share_percent=round(float(share[rank]) * 100, 2),
+                cumulative_share_percent=round(float(cumulative[rank]) * 100, 2),
+                abc_class=AbcClass(classes[rank]),
+            )
+            for rank, i in enumerate(order)
+        ]
+        response = AbcReport(status=True, start=start, end=end, products=rows)
+        response._status_code = 200
+        return response
+
+
+    async def get_reorder_forecast(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            self._logger.warning(f"invalid reorder forecast cursor {cursor}")
+            response = BaseResponse(status=False, message="invalid cursor")
+            response._status_code = 400
+            return response
+
+        rows, next_cursor = await self._reorder_forecast_repository.list(limit=limit, after=after)
+        now = utc_now()
+        products = []
+        for row, on_hand in rows:
+            velocities = {name: decay(getattr(row, name), row.velocity_updated_at, window, now) for name, window in WINDOWS.items()}
+            # whichever window is selling faster, so a recent spike or a steady seller both get covered
+            velocity = max(velocities.values())
+            lead_time_days = REORDER_LEAD_TIME_DAYS if row.lead_time_days is None else row.lead_time_days
+            cover_days = REORDER_COVER_DAYS if row.cover_days is None else row.cover_days
+            min_stock = LOW_STOCK_THRESHOLD if row.min_stock is None else row.min_stock
+
+            days_of_cover = on_hand / velocity if velocity > 0 else None
+            reorder = on_hand <= min_stock or (days_of_cover is not None and days_of_cover <= lead_time_days)
+            target = max(math.ceil(velocity * (lead_time_days + cover_days)), min_stock + 1)
+            products.append(ReorderForecast(
+                product_id=row.id,
+                product_name=row.name,
+                units_on_hand=on_hand,
+                velocity_short=round(velocities["velocity_short"], 3),
+                velocity_long=round(velocities["velocity_long"], 3),
+                days_of_cover=None if days_of_cover is None else round(days_of_cover, 1),
+                lead_time_days=lead_time_days,
+                cover_days=cover_days,
+                min_stock=min_stock,
+                reorder=reorder,
+                suggested_quantity=max(target - on_hand, 0) if reorder else 0,
+            ))
+
+        self._logger.info("reorder forecast below")
+        response = ReorderForecastReport(status=True, products=products, next_cursor=next_cursor)
+        response._status_code = 200
+        return response
+
+
+    async def update_reorder_settings(self, product_id: UUID, settings: ReorderSettings) -> BaseResponse:
+        self._logger.info(f"updating reorder settings for product {product_id}")
+        if not await self._reorder_forecast_repository.update_settings(
+            product_id=product_id,
+            lead_time_days=settings.lead_time_days,
+            cover_days=settings.cover_days,
+            min_stock=settings.min_stock,
+        ):
+            response = BaseResponse(status=False, message=f"could not save reorder settings for product {product_id}")
+            response._status_code = 400
+            return response
+        response = BaseResponse(status=True, message="reorder settings updated")
+        response._status_code = 200
+        return response
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from logging import Logger
+from typing import Any, Dict, List, Optional, Type
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, DateTime, Integer, Numeric
+from sqlalchemy.exc import SQLAlchemyError
+
+from application.persistence.snapshot_repo import SnapshotRepository
+from application.use_case.models.base_response import BaseResponse
+from application.use_case.models.snapshot import SnapshotReport, SnapshotTable
+from application.use_case.snapshot_service import SnapshotService as DefaultSnapshotService
+from domain.models import BaseModel, Sale, SaleItem, StockEntry
+from domain.types import BinaryUUID
+
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "5000"))
+# rows stamped just before "now" may belong to transactions that have not committed yet, so the mark trails the clock
+SNAPSHOT_SETTLE_SECONDS = int(os.getenv("SNAPSHOT_SETTLE_SECONDS", "60"))
+SNAPSHOT_TABLES: Dict[str, Type[BaseModel]] = {"sales": Sale, "sale_items": SaleItem, "stock_entries": StockEntry}
+
+STATE_FILE = "_state.json"
+LOCK_FILE = ".lock"
+
+
+def _arrow_type(column_type) -> pa.DataType:
+    if isinstance(column_type, BinaryUUID):
+        return pa.string()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Numeric):
+        return pa.decimal128(column_type.precision, column_type.scale)
+    if isinstance(column_type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _try_lock(lock_file) -> bool:
+    """takes the export lock without waiting, False when another export holds it"""
+    # imported here, not at module level: dependency.py loads this module and fcntl only exists on POSIX
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        try:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _record_batch(schema: pa.Schema, rows: List[Any]) -> pa.RecordBatch:
+    columns = []
+    for field, values in zip(schema, zip(*rows)):
+        if pa.types.is_string(field.type):
+            values = [None if value is None else str(value) for value in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+class SnapshotService(DefaultSnapshotService):
+    """
+        Appends rows created or modified since the previous run to
+        <SNAPSHOT_DIR>/<table>/day=<created_at date>/part-<run>.parquet.
+        An updated row is written again by a later run, readers keep the copy
+        with the latest modified_at per id. Sales are never deleted, a sale
+        whose payment could not be started is cancelled and so written again
+        with its cancelled_at set.
+    """
+    _logger: Logger
+    _snapshot_repository: SnapshotRepository
+
+    def __init__(self, logger: Logger, snapshot_repository: SnapshotRepository, directory: str = SNAPSHOT_DIR, batch_size: int = SNAPSHOT_BATCH_SIZE):
+        self._logger = logger
+        self._snapshot_repository = snapshot_repository
+        self._directory = directory
+        self._batch_size = batch_size
+
+    def _read_state(self) -> Dict[str, datetime]:
+        path = os.path.join(self._directory, STATE_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as state_file:
+            return {table: datetime.fromisoformat(mark) for table, mark in json.load(state_file).items()}
+
+    def _write_state(self, state: Dict[str, datetime]) -> None:
+        path = os.path.join(self._directory, STATE_FILE)
+        with open(path + ".tmp", "w") as state_file:
+            json.dump({table: mark.isoformat() for table, mark in state.items()}, state_file, indent=2)
+        os.replace(path + ".tmp", path)
+
+    async def _export_table(self, table: str, model: Type[BaseModel], since: Optional[datetime], until: datetime, run_id: str) -> SnapshotTable:
+        columns = list(model.__table__.columns)
+        schema = pa.schema([(column.name, _arrow_type(column.type)) for column in columns])
+        created_at = [column.name for column in columns].index("created_at")
+
+        rows_written = 0
+        files: Dict[date, str] = {}
+        writer = None
+        try:
+            async for rows in self._snapshot_repository.stream_changes(model, since=since, until=until, batch_size=self._batch_size):
+                # rows come ordered by created_at, so each day partition is opened once and finished before the next
+                for day, day_rows in groupby(rows, key=lambda row: row[created_at].date()):
+                    if day not in files:
+                        if writer:
+                            await asyncio.to_thread(writer.close)
+                        partition = os.path.join(self._directory, table, f"day={day.isoformat()}")
+                        os.makedirs(partition, exist_ok=True)
+                        files[day] = os.path.join(partition, f"part-{run_id}.parquet.tmp")
+                        writer = pq.ParquetWriter(files[day], schema)
+                    day_rows = list(day_rows)
+                    await asyncio.to_thread(lambda: writer.write_batch(_record_batch(schema, day_rows)))
+                    rows_written += len(day_rows)
+            if writer:
+                await asyncio.to_thread(writer.close)
+        except BaseException:
+            if writer:
+                writer.close()
+            for path in files.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        # files only get their final name once the whole table is through, so readers never see half a run
+        for path in files.values():
+            os.replace(path, path[:-len(".tmp")])
+        return SnapshotTable(table=table, rows=rows_written, files=len(files), high_water_mark=until)
+
+    async def export(self) -> BaseResponse:
+        os.makedirs(self._directory, exist_ok=True)
+        lock_file = open(os.path.join(self._directory, LOCK_FILE), "w")
+        try:
+            if not _try_lock(lock_file):
+                self._logger.warning("snapshot export already running")
+                response = BaseResponse(status=False, message="a snapshot export is already running")
+                response._status_code = 409
+                return response
+
+            now = await self._snapshot_repository.current_time()
+            if now is None:
+                response = BaseResponse(status=False, message="could not read the database clock")
+                response._status_code = 500
+                return response
+            until = now - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+
+            state = self._read_state()
+            run_id = f"{until:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+            tables = []
+            for table, model in SNAPSHOT_TABLES.items():
+                since = state.get(table)
+                if since is not None and since >= until:
+                    tables.append(SnapshotTable(table=table, rows=0, files=0, high_water_mark=since))
+                    continue
+                self._logger.info(f"exporting {table} changed after {since} up to {until}")
+                try:
+                    exported = await self._export_table(table, model, since=since, until=until, run_id=run_id)
+                except (SQLAlchemyError, OSError, pa.ArrowException) as e:
+                    self._logger.error(f"snapshot export of {table} failed: {e}")
+                    response = BaseResponse(status=False, message=f"snapshot export of {table} failed")
+                    response._status_code = 500
+                    return response
+                # the mark moves per table, so a failure later on does not re-export tables that already finished
+                state[table] = until
+                self._write_state(state)
+                self._logger.info(f"exported {exported.rows} {table} rows into {exported.files} files")
+                tables.append(exported)
+        finally:
+            lock_file.close()
+
+        response = SnapshotReport(status=True, tables=tables)
+        response._status_code = 200
+        return response
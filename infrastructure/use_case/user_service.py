@@ -1,27 +1,33 @@
+import asyncio
 from uuid import UUID
 import uuid
 from logging import Logger
+from typing import Optional
 from domain.enums.role import Role
 
 from application.use_case.models.base_response import BaseResponse
 from application.use_case.models.user import CreateUser, UserResponse, GetResponse, ListUsers
 from application.use_case.user_service import UserService as DefaultUserService
 from domain.models import User
+from infrastructure.cache import MISSING, TTLCache
 from infrastructure.hashing import HashingService
+from infrastructure.pagination import decode_cursor
 from infrastructure.persistence.user_repo import UserRepository
 
 class UserService(DefaultUserService):
     _logger: Logger
     _user_repo: UserRepository
+    _auth_user_cache: TTLCache
 
-    def __init__(self, logger: Logger, user_repo: UserRepository):
+    def __init__(self, logger: Logger, user_repo: UserRepository, auth_user_cache: TTLCache):
         self._logger = logger
         self._user_repo = user_repo
+        self._auth_user_cache = auth_user_cache
 
-    def create_admin(self, user:CreateUser)-> BaseResponse:
+    async def create_admin(self, user:CreateUser)-> BaseResponse:
         self._logger.info(f"Creating new user {user.email}")
 
-        existing_user = self._user_repo.get_by_email(email=user.email)
+        existing_user = await self._user_repo.get_by_email(email=user.email)
         if existing_user:
             self._logger.warning(f"User {user.email} already exists")
             response = BaseResponse(status=False, message="User already exists")
@@ -34,7 +40,7 @@ class UserService(DefaultUserService):
             response._status_code = "400"
             return response
 
-        hash_salt, password_hash = HashingService().hash_password(user.password)
+        hash_salt, password_hash = await asyncio.to_thread(HashingService().hash_password, user.password)
         if user.username is None:
             user.username = str(user.email)
 
@@ -46,7 +52,7 @@ class UserService(DefaultUserService):
             hash_salt=hash_salt,
             role=Role.Admin
         )
-        user = self._user_repo.create_admin(user)
+        user = await self._user_repo.create_admin(user)
         if not user:
             self._logger.error(f"Failed to create new user")
             response = BaseResponse(status=False, message="Failed to create new user")
@@ -58,10 +64,10 @@ class UserService(DefaultUserService):
         return response
 
 
-    def create(self, user:CreateUser)-> BaseResponse:
+    async def create(self, user:CreateUser)-> BaseResponse:
         self._logger.info(f"Creating new user {user.email}")
 
-        existing_user = self._user_repo.get_by_email(email=user.email)
+        existing_user = await self._user_repo.get_by_email(email=user.email)
         if existing_user:
             self._logger.warning(f"User {user.email} already exists")
             response = BaseResponse(status=False, message="User already exists")
@@ -74,7 +80,7 @@ class UserService(DefaultUserService):
             response._status_code = "400"
             return response
 
-        hash_salt, password_hash = HashingService().hash_password(user.password)
+        hash_salt, password_hash = await asyncio.to_thread(HashingService().hash_password, user.password)
         if user.username is None:
             user.username = str(user.email)
 
@@ -86,7 +92,7 @@ class UserService(DefaultUserService):
             hash_salt=hash_salt,
             role=Role.Customer
         )
-        user = self._user_repo.create_admin(user)
+        user = await self._user_repo.create_admin(user)
         if not user:
             self._logger.error(f"Failed to create new user")
             response = BaseResponse(status=False, message="Failed to create new user")
@@ -98,8 +104,8 @@ class UserService(DefaultUserService):
         return response
 
 
-    def get(self, id: UUID) -> BaseResponse:
-        user_exist = self._user_repo.get(id=id)
+    async def get(self, id: UUID) -> BaseResponse:
+        user_exist = await self._user_repo.get(id=id)
         if not user_exist:
             self._logger.warning(f"User {id} does not exist")
             response = BaseResponse(status=False, message="User does not exist")
@@ -111,8 +117,25 @@ class UserService(DefaultUserService):
         return response
 
 
-    def get_by_email(self, email: str) -> BaseResponse:
-        user_exist = self._user_repo.get_by_email(email=email)
+    async def get_role(self, id: UUID) -> Optional[str]:
+        # every authenticated request lands here, each cache hit is a user lookup the database never sees
+        role = self._auth_user_cache.get(id)
+        if role is not MISSING:
+            return role
+        generation = self._auth_user_cache.generation
+        user_exist = await self._user_repo.get(id=id)
+        if not user_exist:
+            return None
+        self._auth_user_cache.set(id, user_exist.role.value, generation)
+        return user_exist.role.value
+
+
+    def invalidate_user(self, id: UUID) -> None:
+        self._auth_user_cache.invalidate(id)
+
+
+    async def get_by_email(self, email: str) -> BaseResponse:
+        user_exist = await self._user_repo.get_by_email(email=email)
         if not user_exist:
             self._logger.warning("User does not exist")
             response = BaseResponse(status=False, message="User does not exist")
@@ -124,26 +147,33 @@ class UserService(DefaultUserService):
         return response
 
 
-    def list(self) -> BaseResponse:
-        users = self._user_repo.list()
+    async def list(self, limit: int, cursor: Optional[str] = None) -> BaseResponse:
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            self._logger.warning(f"invalid user cursor {cursor}")
+            response = BaseResponse(status=False, message="invalid cursor")
+            response._status_code = 400
+            return response
+        users, next_cursor = await self._user_repo.list(limit=limit, after=after)
         user_responses = []
         for user in users:
             user_response = UserResponse(status=True, id=user.id, email=user.email, username=user.username, role=user.role.value)
             user_responses.append(user_response)
 
         self._logger.info(f"list of users fetched")
-        response = ListUsers(status=True, users=user_responses)
+        response = ListUsers(status=True, users=user_responses, next_cursor=next_cursor)
         response._status_code = "200"
         return response
 
-    def authenticate(self, email, password):
-        user = self._user_repo.get_by_email(email=email)
+    async def authenticate(self, email, password):
+        user = await self._user_repo.get_by_email(email=email)
         if not user:
             response = BaseResponse(status=False, message="Invalid email or password")
             response._status_code = "401"
             return response
 
-        if not HashingService().validate_password(password, user.password_hash, user.hash_salt):
+        if not await asyncio.to_thread(HashingService().validate_password, password, user.password_hash, user.hash_salt):
             response = BaseResponse(status=False, message="Invalid email or password")
             response._status_code = "401"
             return response
@@ -9,7 +9,11 @@ from api.controller.product_controller import router as product_router
 from api.controller.stock_entry_controller import router as stock_entry_router
 from api.controller.sales_controller import router as sales_router
 from api.controller.report_controller import router as report_router
+from api.controller.metrics_controller import router as metrics_router
 import jwt
+from infrastructure.database import engine, replica_engine
+from infrastructure.payment import close_clients
+from infrastructure.dependency import Container, dispatch_payment_outbox, handle_payment_event, sweep_expired_reservations, unit_of_work_scope
 from fastapi.staticfiles import StaticFiles
 import os
 
@@ -20,6 +24,41 @@ app = FastAPI()
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("shutdown")
+async def dispose_engine():
+    await engine.dispose()
+    if replica_engine is not engine:
+        await replica_engine.dispose()
+
+@app.on_event("startup")
+async def start_payment_events():
+    Container.payment_event_queue().start(handle_payment_event)
+
+@app.on_event("startup")
+async def start_payment_dispatcher():
+    Container.payment_dispatcher().start(dispatch_payment_outbox)
+
+@app.on_event("startup")
+async def start_reservation_sweeper():
+    Container.reservation_sweeper().start(sweep_expired_reservations)
+
+@app.on_event("shutdown")
+async def stop_reservation_sweeper():
+    await Container.reservation_sweeper().stop()
+
+@app.on_event("shutdown")
+async def stop_payment_dispatcher():
+    await Container.payment_dispatcher().stop()
+
+@app.on_event("shutdown")
+async def stop_payment_events():
+    await Container.payment_event_queue().stop()
+
+@app.on_event("shutdown")
+async def close_payment_client():
+    # the service is built lazily and refuses to start without a secret key, only close what was opened
+    await close_clients()
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     print(f"Request: {request.method} {request.url} {await request.body()}")
@@ -34,6 +73,11 @@ async def log_requests(request: Request, call_next):
     print(f"Response status: {response.status_code}")
     return response
 
+@app.middleware("http")
+async def unit_of_work(request: Request, call_next):
+    async with unit_of_work_scope():
+        return await call_next(request)
+
 @app.exception_handler(HTTPException)
 def exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
@@ -61,5 +105,6 @@ app.include_router(product_router, prefix="/product", tags=["Product"])
 app.include_router(stock_entry_router, prefix="/stock_entry", tags=["Stock Entry"])
 app.include_router(sales_router, prefix="/sales", tags=["Sales"])
 app.include_router(report_router, prefix="/report", tags=["Report"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
\ No newline at end of file
@@ -1,6 +1,8 @@
 // --- Configuration ---
 const API_BASE_URL = 'http://127.0.0.1:8000';
 const CREATE_SALE_ENDPOINT = `${API_BASE_URL}/sales`;
+const PAYMENT_POLL_INTERVAL_MS = 1000;
+const PAYMENT_POLL_ATTEMPTS = 60;
 const access_token = localStorage.getItem('access_token') || '';
 
 let cart = [];
@@ -116,16 +118,41 @@ async function createSales(){
 
         const salesResults = await Promise.all(salePromises);
         saleReference = salesResults[0].reference;
-        showMessage('Order created! Please verify payment','success');
         displayOrderSummary(salesResults);
 
         cartSection.classList.add('hidden');
         verificationSection.classList.remove('hidden');
         cart=[]; localStorage.removeItem('cart');
 
+        showMessage('Order created! Preparing payment...','info');
+        const payment = await waitForPayment(saleReference);
+        if(!payment.authorization_url){
+            // the gateway had this payment already and did not send its page again
+            showMessage('Order created! If you have completed payment, verify it here','success');
+            return;
+        }
+        showMessage('Order created! Complete payment, then verify it here','success');
+        window.open(payment.authorization_url,'_blank');
+
     }catch(err){ console.error(err); showMessage(`Error: ${err.message}`,'error'); checkoutBtn.disabled=false; }
 }
 
+// --- Payment Initialization ---
+// the sale is accepted before the gateway is called, so the checkout link arrives a moment later
+async function waitForPayment(reference){
+    for(let attempt=0; attempt<PAYMENT_POLL_ATTEMPTS; attempt++){
+        const resp = await fetch(`${API_BASE_URL}/sales/${reference}/payment`,{
+            headers:{ 'Authorization':`Bearer ${access_token}` }
+        });
+        const data = await resp.json();
+        if(!resp.ok) throw new Error(data.message||'Could not check payment status');
+        if(data.payment_status==='Initialized') return data;
+        if(data.payment_status==='Failed') throw new Error(data.message||'Payment could not be started');
+        await new Promise(resolve=>setTimeout(resolve,PAYMENT_POLL_INTERVAL_MS));
+    }
+    throw new Error('Payment is taking too long to start, please try again');
+}
+
 // --- Display Summary ---
 function displayOrderSummary(sales){
     let html='';
@@ -6,6 +6,7 @@ const PL_API = `${BASE_URL}/profit-loss`; // Requires year/month/day
 const SALES_STATUS_API = `${BASE_URL}/sales-status`; // No params
 const PERFORMANCE_API = `${BASE_URL}/product-performance`; // No params
 const LOW_STOCK_API = `${BASE_URL}/low-stock-alert`; // No params
+const TIMESERIES_API = `${BASE_URL}/timeseries`; // Requires start/end/bucket
 
 // --- DOM Elements ---
 const form = document.getElementById('report-form');
@@ -32,20 +33,39 @@ function formatRatio(successful, unsuccessful) {
     return `${((successful / total) * 100).toFixed(1)}%`;
 }
 
+function pad(value) {
+    return String(value).padStart(2, '0');
+}
+
+// one time series request covers the whole period: months of a year, or days of a month
+function timeseriesRange(year, month, day) {
+    if (month && day) {
+        const date = `${year}-${pad(month)}-${pad(day)}`;
+        return { start: date, end: date, bucket: 'day' };
+    }
+    if (month) {
+        const lastDay = new Date(year, month, 0).getDate();
+        return { start: `${year}-${pad(month)}-01`, end: `${year}-${pad(month)}-${pad(lastDay)}`, bucket: 'day' };
+    }
+    return { start: `${year}-01-01`, end: `${year}-12-31`, bucket: 'month' };
+}
+
 // --- CHART RENDERING ---
-function renderSalesChart(totalSales, periodStr) {
+function renderSalesChart(totalSales, periodStr, points) {
     const ctx = document.getElementById('salesChart')?.getContext('2d');
     if (!ctx) return;
 
     if (salesChartInstance) salesChartInstance.destroy();
 
+    const series = points?.length ? points : null;
+
     salesChartInstance = new Chart(ctx, {
         type: 'bar',
         data: {
-            labels: [periodStr || ''],
+            labels: series ? series.map(p => p.period_start) : [periodStr || ''],
             datasets: [{
                 label: `Total Sales (${periodStr || ''})`,
-                data: [totalSales],
+                data: series ? series.map(p => parseFloat(p.revenue) || 0) : [totalSales],
                 backgroundColor: 'rgba(79, 70, 229, 0.8)',
             }]
         },
@@ -102,6 +122,8 @@ async function fetchReport(year, month, day) {
     const token = localStorage.getItem('access_token') || '<YOUR_ACCESS_TOKEN>';
     const headers = { 'Authorization': `Bearer ${token}` };
     const dateQuery = `year=${year}${month ? `&month=${month}` : ''}${day ? `&day=${day}` : ''}`;
+    const range = timeseriesRange(year, month, day);
+    const timeseriesQuery = `start=${range.start}&end=${range.end}&bucket=${range.bucket}`;
 
     const fetchWithAuth = async (url) => {
         try {
@@ -113,15 +135,16 @@ async function fetchReport(year, month, day) {
         }
     };
 
-    const [sales, pl, salesStatus, performance, lowStock] = await Promise.all([
+    const [sales, pl, salesStatus, performance, lowStock, timeseries] = await Promise.all([
         fetchWithAuth(`${SALES_REPORT_API}?${dateQuery}`),
         fetchWithAuth(`${PL_API}?${dateQuery}`),
         fetchWithAuth(SALES_STATUS_API),
         fetchWithAuth(PERFORMANCE_API),
-        fetchWithAuth(LOW_STOCK_API)
+        fetchWithAuth(LOW_STOCK_API),
+        fetchWithAuth(`${TIMESERIES_API}?${timeseriesQuery}`)
     ]);
 
-    return { sales, pl, salesStatus, performance, lowStock };
+    return { sales, pl, salesStatus, performance, lowStock, timeseries };
 }
 
 // --- RENDERING & INITIALIZATION ---
@@ -138,7 +161,7 @@ form?.addEventListener('submit', async (event) => {
     generateBtn.disabled = true;
 
     try {
-        const { sales, pl, salesStatus, performance, lowStock } = await fetchReport(year, month, day);
+        const { sales, pl, salesStatus, performance, lowStock, timeseries } = await fetchReport(year, month, day);
 
         // --- KPIs ---
         const salesRatioEl = document.getElementById('sales-success-ratio');
@@ -164,7 +187,7 @@ form?.addEventListener('submit', async (event) => {
         if (lowestUnitsEl) lowestUnitsEl.textContent = performance.lowest_sold?.units_sold?.toLocaleString() || 'N/A';
 
         // --- Charts ---
-        renderSalesChart(parseFloat(String(sales.total_sales).replace(/[^0-9.]/g, '')) || 0, sales.period || '');
+        renderSalesChart(parseFloat(String(sales.total_sales).replace(/[^0-9.]/g, '')) || 0, sales.period || '', timeseries.points);
         renderProfitLossChart(
             parseFloat(String(pl.total_revenue).replace(/[^0-9.]/g, '')) || 0,
             parseFloat(String(pl.total_cost).replace(/[^0-9.]/g, '')) || 0,
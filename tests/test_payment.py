@@ -0,0 +1,224 @@
+"""
+    PaystackService against an in-process ASGI stand-in for the gateway:
+    retries, the no-retry rules for initialization, the circuit breaker and
+    transport timeouts. Nothing leaves the process.
+"""
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+
+from infrastructure import payment
+from infrastructure.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class StandIn:
+    """ASGI app answering from a script of (status, body) steps, the last step repeats"""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = []
+
+    async def __call__(self, scope, receive, send):
+        request = await receive()
+        self.calls.append((scope["method"], scope["path"], dict(scope["headers"]), request.get("body", b"")))
+        status, body = self.steps.pop(0) if len(self.steps) > 1 else self.steps[0]
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+
+class FlakyTransport(httpx.AsyncBaseTransport):
+    """raises the scripted transport errors first, then hands requests to the stand-in"""
+
+    def __init__(self, app: StandIn, *errors):
+        self._inner = httpx.ASGITransport(app=app)
+        self._errors = list(errors)
+        self.attempts = 0
+
+    async def handle_async_request(self, request):
+        self.attempts += 1
+        if self._errors:
+            raise self._errors.pop(0)("scripted", request=request)
+        return await self._inner.handle_async_request(request)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+INITIALIZED = (200, {"status": True, "data": {"authorization_url": "https://checkout.test/ac", "access_code": "ac", "reference": "ref"}})
+VERIFIED = (200, {"status": True, "data": {"status": "success", "amount": 1000}})
+BREAKER_RESET = 30
+
+
+@pytest.fixture(autouse=True)
+def fast_settings(monkeypatch):
+    monkeypatch.setenv("PAYSTACK_SECRET_KEY", "sk_test")
+    monkeypatch.setattr(payment, "PAYSTACK_BASE_URL", "http://paystack.test")
+    monkeypatch.setattr(payment, "PAYSTACK_MAX_RETRIES", 2)
+    monkeypatch.setattr(payment, "PAYSTACK_RETRY_BASE_DELAY", 0)
+    monkeypatch.setattr(payment, "PAYSTACK_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(payment, "PAYSTACK_BREAKER_RESET", BREAKER_RESET)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def make_service(clock):
+    services = []
+
+    def make(app: StandIn, *errors):
+        transport = FlakyTransport(app, *errors)
+        service = payment.PaystackService(logging.getLogger("test"), transport=transport, clock=clock)
+        services.append(service)
+        return service, transport
+
+    yield make
+    for service in services:
+        run(service.aclose())
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_verify_retries_server_errors_until_success(make_service):
+    app = StandIn((503, {}), (502, {}), VERIFIED)
+    service, _ = make_service(app)
+    assert run(service.verify_transaction("ref")) == VERIFIED[1]
+    assert len(app.calls) == 3
+    assert app.calls[0][:2] == ("GET", "/transaction/verify/ref")
+    assert app.calls[0][2][b"authorization"] == b"Bearer sk_test"
+
+
+def test_verify_gives_up_after_the_retry_budget(make_service):
+    app = StandIn((503, {}))
+    service, _ = make_service(app)
+    assert run(service.verify_transaction("ref")) is None
+    assert len(app.calls) == payment.PAYSTACK_MAX_RETRIES + 1
+
+
+def test_client_errors_are_not_retried(make_service):
+    app = StandIn((404, {"status": False}))
+    service, _ = make_service(app)
+    assert run(service.verify_transaction("ref")) is None
+    assert len(app.calls) == 1
+
+
+def test_initialize_is_not_retried_after_a_server_error(make_service):
+    app = StandIn((500, {}), INITIALIZED)
+    service, _ = make_service(app)
+    assert run(service.initialize_transaction(email="a@b.c", amount_in_kobo=1000, reference="ref")) is None
+    assert len(app.calls) == 1
+
+
+def test_initialize_reports_a_duplicate_reference(make_service):
+    app = StandIn((400, {"status": False, "message": "Duplicate Transaction Reference"}))
+    service, _ = make_service(app)
+    with pytest.raises(payment.DuplicateReference):
+        run(service.initialize_transaction(email="a@b.c", amount_in_kobo=1000, reference="ref"))
+    assert len(app.calls) == 1
+
+
+def test_initialize_is_retried_when_rate_limited(make_service):
+    app = StandIn((429, {}), INITIALIZED)
+    service, _ = make_service(app)
+    assert run(service.initialize_transaction(email="a@b.c", amount_in_kobo=1000, reference="ref")) == INITIALIZED[1]
+    assert len(app.calls) == 2
+    assert json.loads(app.calls[-1][3]) == {"email": "a@b.c", "amount": 1000, "reference": "ref"}
+
+
+def test_initialize_is_retried_when_the_request_was_never_sent(make_service):
+    app = StandIn(INITIALIZED)
+    service, transport = make_service(app, httpx.ConnectError, httpx.ConnectTimeout)
+    assert run(service.initialize_transaction(email="a@b.c", amount_in_kobo=1000, reference="ref")) == INITIALIZED[1]
+    assert transport.attempts == 3
+    assert len(app.calls) == 1
+
+
+def test_initialize_is_not_retried_after_a_read_timeout(make_service):
+    app = StandIn(INITIALIZED)
+    service, transport = make_service(app, httpx.ReadTimeout)
+    assert run(service.initialize_transaction(email="a@b.c", amount_in_kobo=1000, reference="ref")) is None
+    assert transport.attempts == 1
+
+
+def test_verify_is_retried_after_a_read_timeout(make_service):
+    app = StandIn(VERIFIED)
+    service, transport = make_service(app, httpx.ReadTimeout)
+    assert run(service.verify_transaction("ref")) == VERIFIED[1]
+    assert transport.attempts == 2
+
+
+def test_breaker_opens_and_rejects_without_calling_the_gateway(make_service, clock):
+    app = StandIn((503, {}))
+    service, _ = make_service(app)
+    assert run(service.verify_transaction("ref")) is None
+    assert service._breaker.state == OPEN
+    calls = len(app.calls)
+
+    app.steps = [VERIFIED]
+    clock.now += BREAKER_RESET - 1
+    assert run(service.verify_transaction("ref")) is None
+    assert len(app.calls) == calls
+    assert service._breaker.rejections.value >= 1
+
+
+def test_breaker_closes_after_a_successful_trial(make_service, clock):
+    app = StandIn((503, {}))
+    service, _ = make_service(app)
+    run(service.verify_transaction("ref"))
+    assert service._breaker.state == OPEN
+
+    clock.now += BREAKER_RESET
+    assert service._breaker.state == HALF_OPEN
+    app.steps = [VERIFIED]
+    assert run(service.verify_transaction("ref")) == VERIFIED[1]
+    assert service._breaker.state == CLOSED
+
+
+def test_breaker_reopens_when_the_trial_fails(make_service, clock):
+    app = StandIn((503, {}))
+    service, _ = make_service(app)
+    run(service.verify_transaction("ref"))
+    clock.now += BREAKER_RESET
+    calls = len(app.calls)
+
+    assert run(service.verify_transaction("ref")) is None
+    # the failed trial reopens the breaker, so the retries that follow are rejected locally
+    assert len(app.calls) == calls + 1
+    assert service._breaker.state == OPEN
+
+
+def test_half_open_lets_a_single_trial_through(clock):
+    breaker = CircuitBreaker("test-trial", failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def test_close_clients_closes_only_what_was_opened(make_service, monkeypatch):
+    monkeypatch.delenv("PAYSTACK_SECRET_KEY")
+    with pytest.raises(ValueError):
+        payment.PaystackService(logging.getLogger("test"))
+    assert payment.OPEN_CLIENTS == []
+
+    monkeypatch.setenv("PAYSTACK_SECRET_KEY", "sk_test")
+    service, _ = make_service(StandIn(VERIFIED))
+    assert payment.OPEN_CLIENTS == [service._client]
+    run(payment.close_clients())
+    assert service._client.is_closed
+    assert payment.OPEN_CLIENTS == []
@@ -0,0 +1,137 @@
+"""
+    Seeds a MySQL database, runs every report and rollup query and checks
+    with EXPLAIN that the large tables are read through the indexes added for
+    them. Point TEST_DATABASE_URL at a scratch mysql+aiomysql database to run
+    it: its tables are dropped and recreated. Skipped otherwise.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import random
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL.startswith("mysql"), reason="TEST_DATABASE_URL is not set to a MySQL database")
+
+PRODUCTS = 40
+BATCHES_PER_PRODUCT = 10
+SALES = 4000
+DAYS = 730
+LOW_STOCK_THRESHOLD = 10
+
+# (label, table, index); None accepts any index but still rejects a scan without one
+EXPECTED = [
+    ("total sales", "daily_sales_summary", "PRIMARY"),
+    ("profit and loss", "daily_sales_summary", "PRIMARY"),
+    ("timeseries by day", "daily_sales_summary", "PRIMARY"),
+    ("product performance", "daily_product_sales_summary", "ix_daily_product_sales_summary_product_ordered"),
+    ("low stock", "stock_entries", "ix_stock_entries_product_id_added_date"),
+    ("rollup rebuild", "sale_items", "ix_sale_items_sale_id_cost_price"),
+    ("rollup rebuild", "sales", None),
+]
+
+
+async def seed(engine, today: datetime.date) -> None:
+    from domain.models import Base, Product, Sale, SaleItem, StockEntry, User
+
+    rng = random.Random(7)
+    now = datetime.datetime.combine(today, datetime.time(12))
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+        user_id = uuid.uuid4()
+        await connection.execute(User.__table__.insert(), [{"id": user_id, "email": "report@test", "hash_salt": "x", "password_hash": "x", "role": "Customer"}])
+
+        products = [{"id": uuid.uuid4(), "name": f"product {n}"} for n in range(PRODUCTS)]
+        await connection.execute(Product.__table__.insert(), products)
+
+        batches = defaultdict(list)
+        stock_rows = []
+        for product in products:
+            for n in range(BATCHES_PER_PRODUCT):
+                cost = Decimal(rng.randint(100, 500))
+                row = {
+                    "id": uuid.uuid4(), "product_id": product["id"], "cost_price": cost, "selling_price": cost * Decimal("1.3"),
+                    "quantity": 100, "remaining_quantity": rng.randint(0, 100), "added_date": now - datetime.timedelta(days=DAYS - n * DAYS // BATCHES_PER_PRODUCT),
+                }
+                stock_rows.append(row)
+                batches[product["id"]].append(row)
+        await connection.execute(StockEntry.__table__.insert(), stock_rows)
+
+        sale_rows, item_rows = [], []
+        for n in range(SALES):
+            sale_date = now - datetime.timedelta(days=rng.randrange(DAYS), minutes=rng.randrange(600))
+            paid = rng.random() < 0.8
+            sale = {
+                "id": uuid.uuid4(), "customer_id": user_id, "sale_date": sale_date, "paid": paid, "payment_reference": f"ref-{n}",
+                "cancelled_at": None if paid or rng.random() < 0.5 else sale_date + datetime.timedelta(hours=1), "total_amount": Decimal(0),
+            }
+            for product in rng.sample(products, 2):
+                batch = rng.choice(batches[product["id"]])
+                quantity = rng.randint(1, 5)
+                item_rows.append({
+                    "id": uuid.uuid4(), "sale_id": sale["id"], "product_id": product["id"], "stock_entry_id": batch["id"],
+                    "quantity": quantity, "sale_price": batch["selling_price"], "cost_price": batch["cost_price"],
+                })
+                sale["total_amount"] += batch["selling_price"] * quantity
+            sale_rows.append(sale)
+        await connection.execute(Sale.__table__.insert(), sale_rows)
+        await connection.execute(SaleItem.__table__.insert(), item_rows)
+
+
+async def collect_plans():
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from infrastructure.persistence.report_repo import ReportRepository
+    from infrastructure.persistence.sales_summary_repo import SalesSummaryRepository
+    from infrastructure.query_plans import CHECKED_TABLES, StatementCapture, explain, run_report_queries
+    from infrastructure.unit_of_work import UnitOfWork
+
+    logger = logging.getLogger("test")
+    today = datetime.date.today()
+    engine = create_async_engine(TEST_DATABASE_URL)
+    try:
+        await seed(engine, today)
+        unit_of_work = UnitOfWork(async_sessionmaker(bind=engine, expire_on_commit=False))
+        reports, sales_summary = ReportRepository(logger, unit_of_work), SalesSummaryRepository(logger, unit_of_work)
+        async with unit_of_work.transaction():
+            assert await sales_summary.rebuild(today - datetime.timedelta(days=DAYS + 1), today + datetime.timedelta(days=1))
+        await unit_of_work.close()
+
+        async with engine.connect() as connection:
+            for table in CHECKED_TABLES:
+                await connection.exec_driver_sql(f"ANALYZE TABLE {table}")
+
+        with StatementCapture(engine) as capture:
+            await run_report_queries(capture, reports, sales_summary, unit_of_work, LOW_STOCK_THRESHOLD, today)
+        await unit_of_work.close()
+
+        async with engine.connect() as connection:
+            return await explain(connection, capture.statements)
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plans():
+    plans = defaultdict(list)
+    for label, row in asyncio.run(collect_plans()):
+        plans[label].append(row)
+    return plans
+
+
+@pytest.mark.parametrize("label,table,index", EXPECTED)
+def test_report_query_reads_through_its_index(plans, label, table, index):
+    rows = [row for row in plans[label] if row["table"] == table]
+    assert rows, f"{label} never read {table}"
+    for row in rows:
+        assert row["key"] is not None, f"{label} scans {table} without an index: {row}"
+        if index is not None:
+            assert row["key"] == index, f"{label} reads {table} through {row['key']} instead of {index}"